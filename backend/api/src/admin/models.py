@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 from core.fields import Id
 from omni_models.domain import WorkerKind
+from typing import Optional
 from datetime import datetime
 class User(BaseModel):
     email: str = Id(description="The email address of the user")
@@ -31,7 +32,27 @@ class User(BaseModel):
 class CacheItem(BaseModel):
     key: str = Id(description="The key of the cache item")
     created_at: datetime = Field(..., description="The date and time the cache item was created")
+    kind: Optional[str] = Field(None, description="Whether the item is a memoized value or a cached function")
+    size: Optional[int] = Field(None, description="The number of entries held in memory for a cached function")
+    hits: int = Field(0, description="The number of calls answered from memory")
+    disk_hits: int = Field(0, description="The number of calls answered from the disk cache")
+    stale_hits: int = Field(0, description="The number of calls answered with an expired entry while it was refreshed")
+    misses: int = Field(0, description="The number of calls that computed the value")
+    evictions: int = Field(0, description="The number of entries dropped to respect the maximum size")
+    computations: int = Field(0, description="The number of times the value was computed, including background refreshes")
+    average_latency_ms: float = Field(0, description="The average time to compute the value, in milliseconds")
+    max_latency_ms: float = Field(0, description="The longest time to compute the value, in milliseconds")
     
+class TimesheetPartition(BaseModel):
+    key: str = Id(description="The key of the timesheet partition")
+    state: str = Field(..., description="The hydration state of the partition (cold, loading or warm)")
+    after: datetime = Field(..., description="The first moment covered by the partition")
+    before: datetime = Field(..., description="The last moment covered by the partition")
+    loaded_at: Optional[datetime] = Field(None, description="The date and time the partition was loaded")
+    error: Optional[str] = Field(None, description="The error raised by the last load attempt")
+    memory_bytes: Optional[int] = Field(None, description="The bytes the month takes in the memory cache")
+    memory_raw_bytes: Optional[int] = Field(None, description="The bytes the month would take as a plain frame")
+
 class Inconsistency(BaseModel):
     kind: str = Field(..., description="The kind of inconsistency")
     entity_kind: str = Field(..., description="The entity that is inconsistent")
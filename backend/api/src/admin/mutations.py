@@ -1,7 +1,8 @@
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import date, datetime
 from omni_utils.decorators.cache import forget
 from omni_shared import globals
+from omni_models.analytics.revenue_tracking import evaluator
 
 class Mutations(BaseModel):
     @staticmethod
@@ -28,12 +29,21 @@ class Mutations(BaseModel):
     @staticmethod
     def invalidate_timesheet_cache(after: datetime, before: datetime):
         try:
-            globals.omni_datasets.timesheets.memory.invalidate(after, before)
+            globals.omni_datasets.timesheets.invalidate(after, before)
             return True
         except Exception as e:
             print(f"Error invalidating timesheet cache: {str(e)}")
             return False
     
+    @staticmethod
+    def rebuild_revenue_snapshots(after: date = None, before: date = None):
+        try:
+            evaluator.rebuild(after, before)
+            return True
+        except Exception as e:
+            print(f"Error rebuilding revenue snapshots: {str(e)}")
+            return False
+    
     @staticmethod
     def force_update_globals():
         try:
@@ -2,7 +2,7 @@ from ariadne import QueryType, ObjectType
 from core.decorators import collection
 from omni_shared import globals
 from omni_utils.decorators import cache
-from .models import User, CacheItem, Inconsistency
+from .models import User, CacheItem, Inconsistency, TimesheetPartition
 
 query = QueryType()
 admin = ObjectType("Admin")
@@ -65,7 +65,7 @@ def resolve_admin_inconsistencies(obj, info):
 @collection
 def resolve_admin_cache_items(obj, info):
     all_cache_items = cache.list_cache()
-    return [CacheItem(key=item["key"], created_at=item["created_at"]) for item in all_cache_items]
+    return [CacheItem(**item) for item in all_cache_items]
 
 @admin.field("cacheItem")
 def resolve_admin_cache_item(obj, info, key: str):
@@ -73,4 +73,19 @@ def resolve_admin_cache_item(obj, info, key: str):
     item = next((item for item in all_cache_items if item["key"] == key), None)
     if item is None:   
         return None
-    return CacheItem(key=item["key"], created_at=item["created_at"])
+    return CacheItem(**item)
+
+
+@admin.field("timesheetPartitions")
+@collection
+def resolve_admin_timesheet_partitions(obj, info):
+    partitions = globals.omni_datasets.timesheets.list_partitions()
+    return [TimesheetPartition(**partition) for partition in partitions]
+
+@admin.field("timesheetPartition")
+def resolve_admin_timesheet_partition(obj, info, key: str):
+    partitions = globals.omni_datasets.timesheets.list_partitions()
+    partition = next((partition for partition in partitions if partition["key"] == key), None)
+    if partition is None:
+        return None
+    return TimesheetPartition(**partition)
@@ -1,9 +1,9 @@
-from .models import User, CacheItem, Inconsistency
+from .models import User, CacheItem, Inconsistency, TimesheetPartition
 from core.generator import generate_schema
 from .mutations import Mutations
 
 
 def init():
-    types = [User, CacheItem, Inconsistency]
+    types = [User, CacheItem, Inconsistency, TimesheetPartition]
     schema = generate_schema(types, "Admin", include_base_types=False, mutation_classes=[Mutations])
     return schema
@@ -2,7 +2,8 @@ from ariadne import QueryType, ObjectType
 from .models import Client, Sponsor, Case, Project
 from core.decorators import collection
 from omni_shared import globals
-from timesheet.resolvers import compute_timesheet, build_fields_map
+from timesheet.resolvers import build_fields_map
+from timesheet.service import compute_timesheet_of
 query = QueryType()
 engagements = ObjectType("Engagements")
 client = ObjectType("Client")
@@ -98,26 +99,15 @@ def resolve_engagements_project(obj, info, id: str = None, slug: str = None):
 
 @client.field("timesheet")
 def resolve_client_timesheet(obj, info, slug: str = None, filters = None):
-    if filters is None:
-        filters = []
-        
-    client_filters = [
-        {
-            'field': 'ClientName',
-            'selected_values': [obj['name']]
-        }
-    ] + filters
-    
     map = build_fields_map(info)
-    result = compute_timesheet(map, slug, client_filters)
+    result = compute_timesheet_of(info, map, slug, 'ClientName', obj['name'], filters)
     model_dump = result.model_dump()
     return model_dump
 
 @client.field("activeCases")
 @collection
 def resolve_client_active_cases(obj, info):
-    source = globals.omni_models.cases.get_all().values()
-    source = filter(lambda case: case.client_id == obj["id"], source)
+    source = globals.omni_models.cases.get_by_client_id(obj["id"])
     return [
         Case.from_domain(case) 
         for case in source
@@ -127,34 +117,14 @@ def resolve_client_active_cases(obj, info):
     
 @sponsor.field("timesheet")
 def resolve_sponsor_timesheet(obj, info, slug: str = None, filters = None):
-    if filters is None:
-        filters = []
-        
-    client_filters = [
-        {
-            'field': 'Sponsor',
-            'selected_values': [obj['name']]
-        }
-    ] + filters
-    
     map = build_fields_map(info)
-    result = compute_timesheet(map, slug, client_filters)
+    result = compute_timesheet_of(info, map, slug, 'Sponsor', obj['name'], filters)
     model_dump = result.model_dump()
     return model_dump
 
 @case.field("timesheet")
 def resolve_case_timesheet(obj, info, slug: str = None, filters = None):
-    if filters is None:
-        filters = []
-        
-    case_filters = [
-        {
-            'field': 'CaseTitle',
-            'selected_values': [obj['title']]
-        }
-    ] + filters
-        
     map = build_fields_map(info)
-    result = compute_timesheet(map, slug, case_filters)
+    result = compute_timesheet_of(info, map, slug, 'CaseTitle', obj['title'], filters)
     model_dump = result.model_dump()
     return model_dump
\ No newline at end of file
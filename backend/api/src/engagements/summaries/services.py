@@ -100,7 +100,8 @@ def compute_allocation(start_date=None, end_date=None, filters=None):
     df, result = globals.omni_datasets.apply_filters(
         globals.omni_datasets.timesheets,
         timesheet.data,
-        filters
+        filters,
+        version=timesheet.version
     )
 
     # Define kind mappings
@@ -189,7 +190,8 @@ def compute_consulting_hours(start_date=None, end_date=None, filters=None):
     df, result = globals.omni_datasets.apply_filters(
         globals.omni_datasets.timesheets,
         timesheet.data,
-        filters
+        filters,
+        version=timesheet.version
     )
 
     # Filter only consulting hours
@@ -5,7 +5,8 @@ from omni_shared import globals
 
 from engagements.models import Client
 
-from timesheet.resolvers import compute_timesheet, build_fields_map
+from timesheet.resolvers import build_fields_map
+from timesheet.service import compute_timesheet_of
 
 query = QueryType()
 offer = ObjectType("Offer")
@@ -49,18 +50,8 @@ def resolve_marketing_and_sales_active_deals(obj, info):
 
 @offer.field("timesheet")
 def resolve_offer_timesheet(obj, info, slug: str = None, filters = None):
-    if filters is None:
-        filters = []
-        
-    client_filters = [
-        {
-            'field': 'ProductsOrServices',
-            'selected_values': [obj['name']]
-        }
-    ] + filters
-    
     map = build_fields_map(info)
-    result = compute_timesheet(map, slug, client_filters)
+    result = compute_timesheet_of(info, map, slug, 'ProductsOrServices', obj['name'], filters)
     model_dump = result.model_dump()
     print(model_dump)
     return model_dump
@@ -1,6 +1,6 @@
 from ariadne import QueryType, ObjectType
 from .models import AccountManager, ConsultantOrEngineer
-from timesheet.service import compute_timesheet
+from timesheet.service import compute_timesheet_of
 from utils.fields import build_fields_map
 
 from omni_shared import globals
@@ -20,35 +20,15 @@ def resolve_team(*_):
 
 @account_manager.field("timesheet")
 def resolve_account_manager_timesheet(obj, info, slug: str = None, filters = None):
-    if filters is None:
-        filters = []
-        
-    client_filters = [
-        {
-            'field': 'AccountManagerName',
-            'selected_values': [obj['name']]
-        }
-    ] + filters
-    
     map = build_fields_map(info)
-    result = compute_timesheet(map, slug, client_filters)
+    result = compute_timesheet_of(info, map, slug, 'AccountManagerName', obj['name'], filters)
     model_dump = result.model_dump()
     return model_dump
 
 @consultant_or_engineer.field("timesheet")
 def resolve_consultant_or_engineer_timesheet(obj, info, slug: str = None, filters = None):
-    if filters is None:
-        filters = []
-        
-    client_filters = [
-        {
-            'field': 'WorkerName',
-            'selected_values': [obj['name']]
-        }
-    ] + filters
-    
     map = build_fields_map(info)
-    result = compute_timesheet(map, slug, client_filters)
+    result = compute_timesheet_of(info, map, slug, 'WorkerName', obj['name'], filters)
     model_dump = result.model_dump()
     return model_dump
 
@@ -0,0 +1,322 @@
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .models import (
+    TimesheetSummary,
+    NamedTimesheetSummary,
+    TitledTimesheetSummary,
+    DateTimesheetSummary,
+    WeekTimesheetSummary,
+    WeeklyHours,
+)
+
+# Suffix of the average/std-dev fields -> column whose groups they describe
+DIMENSIONS = {
+    'day': 'Date',
+    'worker': 'WorkerSlug',
+    'client': 'ClientId',
+    'case': 'CaseId',
+    'sponsor': 'Sponsor',
+    'account_manager': 'AccountManagerSlug',
+    'week': 'Week',
+}
+
+UNIQUE_FIELDS = {
+    'unique_clients': 'ClientId',
+    'unique_workers': 'WorkerSlug',
+    'unique_cases': 'CaseId',
+    'unique_working_days': 'Date',
+    'unique_sponsors': 'Sponsor',
+    'unique_account_managers': 'AccountManagerSlug',
+    'unique_weeks': 'Week',
+}
+
+KIND_FIELDS = {
+    'total_squad_hours': 'Squad',
+    'total_consulting_hours': 'Consulting',
+    'total_internal_hours': 'Internal',
+    'total_hands_on_hours': 'HandsOn',
+}
+
+# Kind -> (key in the GraphQL field map, key in the result)
+KINDS = {
+    'Internal': ('internal', 'internal'),
+    'Consulting': ('consulting', 'consulting'),
+    'Squad': ('squad', 'squad'),
+    'HandsOn': ('handsOn', 'hands_on'),
+}
+
+SUMMARY_FIELDS = set(TimesheetSummary.model_fields)
+
+Key = Tuple[Any, ...]
+
+
+def _snake_case(name: str) -> str:
+    return re.sub(r'(?<!^)(?=[A-Z])', '_', name).lower()
+
+
+def _requested(map: Optional[Dict]) -> Set[str]:
+    """The summary statistics selected in a field map (all of them when there is no map)"""
+    if not map:
+        return set(SUMMARY_FIELDS)
+    return {_snake_case(name) for name in map} & SUMMARY_FIELDS
+
+
+def _value(value: Any) -> float:
+    if pd.isna(value) or np.isinf(value):
+        return 0.0
+    return float(value)
+
+
+class TimesheetAggregator:
+    """
+    Computes timesheet summaries as grouping sets over a single frame. Every
+    level of the requested breakdown (e.g. by worker, then by kind within each
+    worker) is aggregated for all of its groups at once, with one groupby per
+    statistic family, and only the statistics present in the GraphQL field
+    map are computed.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        # Constant leading key, so the whole frame is a grouping set like any other
+        self.root = np.zeros(len(df), dtype=np.int8)
+
+    def _by(self, keys: List[str]) -> list:
+        return [self.root] + [self.df[key] for key in keys]
+
+    @staticmethod
+    def _key(index_value, depth: int) -> Key:
+        if depth == 1:
+            return ()
+        return tuple(index_value[1:])
+
+    def _stats(self, keys: List[str], fields: Set[str]) -> Dict[Key, Dict[str, Any]]:
+        """The requested statistics of every group of `keys`"""
+        hours = self.df['TimeInHs']
+        by = self._by(keys)
+        depth = len(by)
+        levels = list(range(depth))
+
+        stats: Dict[Key, Dict[str, Any]] = {}
+        base = hours.groupby(by).agg(['sum', 'size', 'std'])
+        for index_value, row in base.iterrows():
+            total_hours = float(row['sum'])
+            size = int(row['size'])
+            stats[self._key(index_value, depth)] = {
+                'total_entries': size,
+                'total_hours': total_hours,
+                'average_hours_per_entry': total_hours / size if size > 0 else 0.0,
+                'std_dev_hours_per_entry': 0.0 if pd.isna(row['std']) else float(row['std']),
+            }
+
+        columns = {
+            column
+            for field, column in UNIQUE_FIELDS.items()
+            if field in fields
+        } | {
+            column
+            for suffix, column in DIMENSIONS.items()
+            if f'average_hours_per_{suffix}' in fields or f'std_dev_hours_per_{suffix}' in fields
+        }
+        if 'weekly_hours' in fields:
+            columns.add('Week')
+
+        for column in columns:
+            groups = hours.groupby(by + [self.df[column]]).agg(['sum', 'mean', 'std'])
+            per_parent = groups.groupby(level=levels)
+
+            for index_value, count in per_parent.size().items():
+                stats[self._key(index_value if depth > 1 else (index_value,), depth)][('unique', column)] = int(count)
+
+            # Statistics of the first group, as summarize() always reported them
+            for index_value, row in per_parent.head(1).iterrows():
+                stats[self._key(index_value[:-1], depth)][('first', column)] = row
+
+            if column == 'Week' and 'weekly_hours' in fields:
+                for index_value, value in groups['sum'].items():
+                    stats[self._key(index_value[:-1], depth)].setdefault('weekly_hours', []).append(
+                        WeeklyHours(week=index_value[-1], hours=float(value))
+                    )
+
+        for field, column in UNIQUE_FIELDS.items():
+            if field in fields:
+                for values in stats.values():
+                    values[field] = values.get(('unique', column), 0)
+
+        for suffix, column in DIMENSIONS.items():
+            for aggregation, prefix in (('mean', 'average'), ('std', 'std_dev')):
+                field = f'{prefix}_hours_per_{suffix}'
+                if field in fields:
+                    for values in stats.values():
+                        first = values.get(('first', column))
+                        values[field] = 0.0 if first is None else _value(first[aggregation])
+
+        if fields & KIND_FIELDS.keys():
+            kind_fields = {kind: field for field, kind in KIND_FIELDS.items()}
+            for values in stats.values():
+                values.update({field: 0.0 for field in KIND_FIELDS})
+            for index_value, value in hours.groupby(by + [self.df['Kind']]).sum().items():
+                field = kind_fields.get(index_value[-1])
+                if field:
+                    stats[self._key(index_value[:-1], depth)][field] = float(value or 0.0)
+
+        return {
+            key: {
+                field: value
+                for field, value in values.items()
+                if isinstance(field, str) and field in fields
+            }
+            for key, values in stats.items()
+        }
+
+    def summary(self, map: Optional[Dict] = None) -> TimesheetSummary:
+        if len(self.df) == 0:
+            return TimesheetSummary()
+        return self.summaries(map)[()]
+
+    def summaries(self, map: Optional[Dict] = None, parents: List[str] = None) -> Dict[Key, TimesheetSummary]:
+        """The summary of every group of `parents`"""
+        if len(self.df) == 0:
+            return {}
+        return {
+            key: TimesheetSummary(**values)
+            for key, values in self._stats(parents or [], _requested(map)).items()
+        }
+
+    def by_kind(self, map: Dict, parents: List[str] = None) -> Dict[Key, Dict[str, TimesheetSummary]]:
+        parents = parents or []
+        result: Dict[Key, Dict[str, TimesheetSummary]] = {}
+        if len(self.df) == 0:
+            return result
+
+        requested = {kind: map[map_key] for kind, (map_key, _) in KINDS.items() if map_key in map}
+        if not requested:
+            return result
+
+        fields = set().union(*(_requested(kind_map) for kind_map in requested.values()))
+        stats = self._stats(parents + ['Kind'], fields)
+
+        for key, values in stats.items():
+            parent, kind = key[:-1], key[-1]
+            if kind not in requested:
+                continue
+            label = KINDS[kind][1]
+            result.setdefault(parent, {})[label] = TimesheetSummary(**values)
+
+        # Same order as the kinds are listed
+        order = {label: i for i, (_, label) in enumerate(KINDS.values())}
+        return {
+            parent: dict(sorted(kinds.items(), key=lambda item: order[item[0]]))
+            for parent, kinds in result.items()
+        }
+
+    def by_group(
+        self,
+        column: str,
+        name_key: str = "name",
+        summary_class: type = NamedTimesheetSummary,
+        map: Dict = None,
+        parents: List[str] = None,
+    ) -> Dict[Key, List[TimesheetSummary]]:
+        """The summaries of each `column` value, for every group of `parents`"""
+        parents = parents or []
+        result: Dict[Key, List[TimesheetSummary]] = {}
+        if len(self.df) == 0:
+            return result
+
+        keys = parents + [column]
+        stats = self._stats(keys, _requested(map))
+        summaries: Dict[Key, TimesheetSummary] = {}
+        for key, values in stats.items():
+            summaries[key] = summary_class(**{**values, name_key: key[-1]})
+
+        # Breakdowns that are requested are lists (or dicts) for every group, even when empty
+        for summary in summaries.values():
+            if map and 'byKind' in map:
+                summary.by_kind = {}
+            if column != 'Week' and map and 'byWeek' in map:
+                summary.by_week = []
+            if column == 'CaseTitle' and map and 'workersByTrackingProject' in map:
+                summary.workers_by_tracking_project = []
+            if column == 'CaseTitle' and map and 'byWorker' in map:
+                summary.by_worker = []
+
+        if map and 'byKind' in map:
+            for key, by_kind in self.by_kind(map['byKind'], keys).items():
+                summaries[key].by_kind = by_kind
+
+        if column != 'Week' and map and 'byWeek' in map:
+            for key, by_week in self.by_week(map['byWeek'], keys).items():
+                summaries[key].by_week = by_week
+
+        if column == 'CaseTitle' and map and 'workers' in map:
+            workers = self.df.groupby(self._by(keys))['WorkerName'].unique()
+            for index_value, values in workers.items():
+                summaries[self._key(index_value, len(keys) + 1)].workers = values.tolist()
+
+        if column == 'CaseTitle' and map and 'workersByTrackingProject' in map:
+            projects = self.df.groupby(self._by(keys) + [self.df['ProjectId']])['WorkerName'].unique()
+            for index_value, values in projects.items():
+                summary = summaries[self._key(index_value[:-1], len(keys) + 1)]
+                summary.workers_by_tracking_project.append({
+                    'project_id': index_value[-1],
+                    'workers': sorted(set(values)),
+                })
+
+        if column == 'CaseTitle' and map and 'byWorker' in map:
+            for key, by_worker in self.by_group('WorkerName', map=map['byWorker'], parents=keys).items():
+                summaries[key].by_worker = by_worker
+
+        for key, summary in summaries.items():
+            result.setdefault(key[:-1], []).append(summary)
+
+        return {
+            parent: sorted(group, key=lambda x: x.total_hours, reverse=True)
+            for parent, group in result.items()
+        }
+
+    def by_week(self, map: Dict, parents: List[str] = None) -> Dict[Key, List[WeekTimesheetSummary]]:
+        return {
+            parent: sorted(summaries, key=lambda x: datetime.strptime(x.week.split(' - ')[0], '%d/%m'))
+            for parent, summaries in self.by_group(
+                'Week', name_key="week", summary_class=WeekTimesheetSummary, map=map, parents=parents
+            ).items()
+        }
+
+    def groups(self, column: str, name_key: str, summary_class: type, map: Dict) -> List[TimesheetSummary]:
+        """The top-level summaries of `column`"""
+        return self.grouped(column, name_key, summary_class, map).get((), [])
+
+    def grouped(
+        self,
+        column: str,
+        name_key: str,
+        summary_class: type,
+        map: Dict,
+        parents: List[str] = None,
+    ) -> Dict[Key, List[TimesheetSummary]]:
+        """The summaries of `column` within every group of `parents`"""
+        if column == 'Week':
+            return self.by_week(map, parents)
+        return self.by_group(column, name_key, summary_class, map, parents)
+
+    def kinds(self, map: Dict) -> Dict[str, TimesheetSummary]:
+        return self.by_kind(map).get((), {})
+
+
+# GraphQL field -> (response key, column, name key, summary class)
+GROUPINGS = {
+    'byWorker': ('by_worker', 'WorkerName', 'name', NamedTimesheetSummary),
+    'byClient': ('by_client', 'ClientName', 'name', NamedTimesheetSummary),
+    'byCase': ('by_case', 'CaseTitle', 'title', TitledTimesheetSummary),
+    'bySponsor': ('by_sponsor', 'Sponsor', 'name', NamedTimesheetSummary),
+    'byAccountManager': ('by_account_manager', 'AccountManagerName', 'name', NamedTimesheetSummary),
+    'byDate': ('by_date', 'Date', 'date', DateTimesheetSummary),
+    'byWeek': ('by_week', 'Week', 'week', WeekTimesheetSummary),
+    'byOffer': ('by_offer', 'ProductsOrServices', 'name', NamedTimesheetSummary),
+}
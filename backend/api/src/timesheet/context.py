@@ -0,0 +1,121 @@
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import pandas as pd
+
+from omni_models.omnidatasets import SLUG_FIELDS
+from omni_shared import globals
+
+# Attribute (or key) of the GraphQL context value holding the request's TimesheetContext
+CONTEXT_KEY = 'timesheet_context'
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def normalize_filters(filters: Optional[List[Dict]]) -> Tuple:
+    """
+    Cache key of a filter list. `apply_filters` only reads the first filter
+    of each field and visits the fields in the dataset's own order, so
+    filters that differ only in that respect share a key.
+    """
+    selected = {}
+    for filter_item in filters or []:
+        field = filter_item['field']
+        if field in selected:
+            continue
+        values = filter_item['selected_values'] if 'selected_values' in filter_item else filter_item['selectedValues']
+        selected[field] = _freeze(values)
+    return tuple(sorted((field, values) for field, values in selected.items() if values))
+
+
+def fields_key(map: Dict) -> Hashable:
+    return _freeze(map)
+
+
+def in_list(info) -> bool:
+    """Whether the field is resolved for an item of a list, i.e. once per sibling"""
+    path = info.path.prev
+    while path is not None:
+        if isinstance(path.key, int):
+            return True
+        path = path.prev
+    return False
+
+
+class TimesheetContext:
+    """
+    What the timesheet resolvers of one GraphQL request have already worked
+    out: the dataset behind each slug, the frames left by each set of
+    filters, the timesheets built from them and the timesheets of every
+    group of a column computed at once for sibling list items.
+    """
+
+    def __init__(self):
+        self.slices: Dict[str, Tuple[Any, Any, Any]] = {}
+        self.filtered: Dict[Tuple, Tuple[pd.DataFrame, Dict]] = {}
+        self.timesheets: Dict[Tuple, Any] = {}
+        self.partitions: Dict[Tuple, Dict[Tuple, Any]] = {}
+
+    def slice(self, slug: str):
+        """The dataset, its source and its dates for `slug`"""
+        if slug not in self.slices:
+            self.slices[slug] = (
+                globals.omni_datasets.get_by_slug(slug),
+                globals.omni_datasets.get_dataset_source_by_slug(slug),
+                globals.omni_datasets.get_dates(slug),
+            )
+        return self.slices[slug]
+
+    def filter(self, slug: str, filters: Optional[List[Dict]]) -> Tuple[pd.DataFrame, Dict]:
+        """`apply_filters` over the dataset of `slug`, once per set of filters"""
+        key = (slug, normalize_filters(filters))
+        if key not in self.filtered:
+            dataset, source, _ = self.slice(slug)
+            self.filtered[key] = globals.omni_datasets.apply_filters(source, dataset.data, filters, version=dataset.version)
+        return self.filtered[key]
+
+    def partition(self, slug: str, field: str, filters: Optional[List[Dict]]) -> Optional[pd.DataFrame]:
+        """
+        The frame left by `filters` when, for each value `v` of `field`, its
+        rows are exactly what adding a `field = v` filter would keep; None
+        when that does not hold (a slug of one entity equal to the name of
+        another) or `field` is not filterable.
+        """
+        _, source, _ = self.slice(slug)
+        if field not in source.get_filterable_fields():
+            return None
+
+        df, _ = self.filter(slug, [item for item in filters or [] if item['field'] != field])
+        if field not in df.columns:
+            return None
+
+        slug_field = SLUG_FIELDS.get(field)
+        if slug_field and slug_field in df.columns:
+            names = df[field]
+            slugs = df[slug_field]
+            other = slugs[slugs.notna() & (slugs != names)]
+            if other.isin(names.dropna().unique()).any():
+                return None
+
+        return df
+
+
+def get_context(info) -> TimesheetContext:
+    """The TimesheetContext of the request `info` belongs to"""
+    context_value = info.context
+    if context_value is None:
+        return TimesheetContext()
+
+    if isinstance(context_value, dict):
+        return context_value.setdefault(CONTEXT_KEY, TimesheetContext())
+
+    context = getattr(context_value, CONTEXT_KEY, None)
+    if context is None:
+        context = TimesheetContext()
+        setattr(context_value, CONTEXT_KEY, context)
+    return context
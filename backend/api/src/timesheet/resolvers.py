@@ -2,11 +2,12 @@ from utils.fields import build_fields_map
 from ariadne import QueryType
 
 from .service import compute_timesheet
+from .context import get_context
 
 query = QueryType()
 
 @query.field("timesheet")
 def resolve_timesheet(_, info, slug: str, filters = None):
     map = build_fields_map(info)
-    result = compute_timesheet(map, slug, filters)
+    result = compute_timesheet(map, slug, filters, get_context(info))
     return result.model_dump() 
\ No newline at end of file
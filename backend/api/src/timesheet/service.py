@@ -1,218 +1,16 @@
-from datetime import datetime
 import pandas as pd
-import numpy as np
 from typing import Dict, Any, List
 
-from omni_shared import globals
 from utils.business_calendar import compute_business_calendar
 
 from .models import (
     TimesheetBusinessDay,
     TimesheetBusinessCalendar,
     TimesheetAppointment,
-    TimesheetSummary,
-    NamedTimesheetSummary,
-    TitledTimesheetSummary,
-    DateTimesheetSummary,
-    WeekTimesheetSummary,
-    WeeklyHours,
     Timesheet
 )
-
-def summarize(df: pd.DataFrame) -> TimesheetSummary:
-    if len(df) == 0:
-        return TimesheetSummary()
-        
-    # Perform groupby operations once
-    group_operations = {
-        "date": df.groupby("Date")["TimeInHs"],
-        "worker": df.groupby("WorkerSlug")["TimeInHs"],
-        "client": df.groupby("ClientId")["TimeInHs"],
-        "case": df.groupby("CaseId")["TimeInHs"],
-        "sponsor": df.groupby("Sponsor")["TimeInHs"],
-        "account_manager": df.groupby("AccountManagerSlug")["TimeInHs"],
-        "week": df.groupby("Week")["TimeInHs"]
-    }
-
-    group_results = {k: g.agg(['sum', 'mean', 'std']) for k, g in group_operations.items()}
-
-    # Calculate statistics
-    total_hours = float(df["TimeInHs"].sum())
-    average_hours_per_entry = total_hours / len(df) if len(df) > 0 else 0.0
-
-    weekly_summary = group_operations['week'].sum().reset_index()
-    weeks = []
-    for _, row in weekly_summary.iterrows():
-        weeks.append(WeeklyHours(
-            week=row['Week'],
-            hours=float(row['TimeInHs'])
-        ))
-
-    # Extract scalar values from Series
-    def get_agg_value(group: str, agg: str, default: float = 0.0) -> float:
-        try:
-            value = group_results[group][agg]
-            if pd.isna(value.iloc[0]) or np.isinf(value.iloc[0]) or pd.isna(float(value.iloc[0])):
-                return default
-            return float(value.iloc[0])
-        except (KeyError, IndexError, ValueError, TypeError):
-            return default
-
-    return TimesheetSummary(
-        total_entries=len(df),
-        total_hours=total_hours,
-        unique_clients=df["ClientId"].nunique(),
-        unique_workers=df["WorkerSlug"].nunique(),
-        unique_cases=df["CaseId"].nunique(),
-        unique_working_days=df["Date"].nunique(),
-        unique_sponsors=df["Sponsor"].nunique(),
-        unique_account_managers=df["AccountManagerSlug"].nunique(),
-        unique_weeks=df["Week"].nunique(),
-        average_hours_per_entry=average_hours_per_entry,
-        std_dev_hours_per_entry=float(df["TimeInHs"].std()) if not pd.isna(df["TimeInHs"].std()) else 0.0,
-        average_hours_per_day=get_agg_value("date", "mean"),
-        std_dev_hours_per_day=get_agg_value("date", "std"),
-        average_hours_per_worker=get_agg_value("worker", "mean"),
-        std_dev_hours_per_worker=get_agg_value("worker", "std"),
-        average_hours_per_client=get_agg_value("client", "mean"),
-        std_dev_hours_per_client=get_agg_value("client", "std"),
-        average_hours_per_case=get_agg_value("case", "mean"),
-        std_dev_hours_per_case=get_agg_value("case", "std"),
-        average_hours_per_sponsor=get_agg_value("sponsor", "mean"),
-        std_dev_hours_per_sponsor=get_agg_value("sponsor", "std"),
-        average_hours_per_account_manager=get_agg_value("account_manager", "mean"),
-        std_dev_hours_per_account_manager=get_agg_value("account_manager", "std"),
-        average_hours_per_week=get_agg_value("week", "mean"),
-        std_dev_hours_per_week=get_agg_value("week", "std"),
-        total_squad_hours=float(df[df['Kind'] == 'Squad']['TimeInHs'].sum() or 0.0),
-        total_consulting_hours=float(df[df['Kind'] == 'Consulting']['TimeInHs'].sum() or 0.0),
-        total_internal_hours=float(df[df['Kind'] == 'Internal']['TimeInHs'].sum() or 0.0),
-        total_hands_on_hours=float(df[df['Kind'] == 'HandsOn']['TimeInHs'].sum() or 0.0),
-        weekly_hours=weeks
-    )
-
-def summarize_by_kind(df: pd.DataFrame, map: Dict) -> Dict[str, TimesheetSummary]:
-    if len(df) == 0:
-        return {}
-
-    kinds = ['Internal', 'Consulting', 'Squad', 'HandsOn']
-    summary_by_kind = {}
-
-    for kind in kinds:
-        kind_in_map = 'handsOn' if kind == 'HandsOn' else kind.lower()
-        if kind_in_map in map:
-            kind_map = map[kind_in_map]
-            df_kind = df[df['Kind'] == kind]
-
-            if len(df_kind) == 0:
-                continue
-
-            if kind == 'HandsOn':
-                label = 'hands_on'
-            else:
-                label = kind.lower()
-
-            s = summarize(df_kind)
-
-            if 'byWorker' in kind_map:
-                s.by_worker = summarize_by_worker(df_kind, kind_map['byWorker'])
-
-            summary_by_kind[label] = s
-
-    return summary_by_kind
-
-def summarize_by_group(
-    df: pd.DataFrame, 
-    group_column: str, 
-    name_key: str = "name", 
-    summary_class: type = NamedTimesheetSummary,
-    map: Dict = None
-) -> List[NamedTimesheetSummary]:
-    if len(df) == 0:
-        return []
-
-    summaries = []
-    for group_value, group_df in df.groupby(group_column):
-        source_summary = summarize(group_df)
-        source_summary_as_dict = source_summary.model_dump()
-        source_summary_as_dict[name_key] = group_value
-        
-        # Calculate kind hours before creating the model
-        kind_hours = {}
-        for kind in ['Squad', 'Consulting', 'Internal', 'HandsOn']:
-            kind_df = group_df[group_df['Kind'] == kind]
-            hours = float(kind_df['TimeInHs'].sum() or 0.0)
-            kind_key = f"total_{kind.lower()}_hours"
-            if kind == 'HandsOn':
-                kind_key = "total_hands_on_hours"
-            kind_hours[kind_key] = hours
-            
-        # Merge all dictionaries
-        summary_dict = {**source_summary_as_dict, **kind_hours}
-        summary = summary_class(**summary_dict)
-
-        if map and 'byKind' in map:
-            summary.by_kind = summarize_by_kind(group_df, map['byKind'])
-        
-        if group_column != 'Week' and map and 'byWeek' in map:
-            summary.by_week = summarize_by_week(group_df, map['byWeek'])
-
-        # if group_column == 'CaseTitle' and 'caseDetails' in map:
-        #     details_obj = globals.omni_models.cases.get_by_title(group_value)
-        #     summary.case_details = build_case_dictionary(map['caseDetails'], details_obj) if details_obj else {}
-        
-        if group_column == 'CaseTitle' and 'workers' in map:
-            summary.workers = group_df['WorkerName'].unique().tolist()
-
-        if group_column == 'CaseTitle' and 'workersByTrackingProject' in map:
-            wdf = group_df[group_df['CaseTitle'] == group_value]
-            workersByTrackingProject = wdf.groupby('ProjectId')['WorkerName'].agg(list).reset_index()
-            summary.workers_by_tracking_project = [
-                {
-                    'project_id': row['ProjectId'],
-                    'workers': sorted(set(row['WorkerName']))
-                }   
-                for _, row in workersByTrackingProject.iterrows()
-            ]
-            
-        if group_column == 'CaseTitle' and 'byWorker' in map:
-            summary.by_worker = summarize_by_worker(group_df, map['byWorker'])
-
-        summaries.append(summary)
-
-    return sorted(summaries, key=lambda x: x.total_hours, reverse=True)
-
-def summarize_by_worker(df: pd.DataFrame, map: Dict) -> List[NamedTimesheetSummary]:
-    return summarize_by_group(df, 'WorkerName', summary_class=NamedTimesheetSummary, map=map)
-
-def summarize_by_client(df: pd.DataFrame, map: Dict) -> List[NamedTimesheetSummary]:
-    return summarize_by_group(df, 'ClientName', summary_class=NamedTimesheetSummary, map=map)
-
-def summarize_by_case(df: pd.DataFrame, map: Dict) -> List[TitledTimesheetSummary]:
-    return summarize_by_group(df, 'CaseTitle', name_key="title", summary_class=TitledTimesheetSummary, map=map)
-
-def summarize_by_sponsor(df: pd.DataFrame, map: Dict) -> List[NamedTimesheetSummary]:
-    return summarize_by_group(df, 'Sponsor', summary_class=NamedTimesheetSummary, map=map)
-
-def summarize_by_account_manager(df: pd.DataFrame, map: Dict) -> List[NamedTimesheetSummary]:
-    return summarize_by_group(df, 'AccountManagerName', summary_class=NamedTimesheetSummary, map=map)
-
-def summarize_by_date(df: pd.DataFrame, map: Dict) -> List[DateTimesheetSummary]:
-    return summarize_by_group(df, 'Date', name_key="date", summary_class=DateTimesheetSummary, map=map)
-
-def summarize_by_week(df: pd.DataFrame, map: Dict) -> List[WeekTimesheetSummary]:
-    if len(df) == 0:
-        return []
-
-    summaries = summarize_by_group(df, 'Week', name_key="week", summary_class=WeekTimesheetSummary, map=map)
-    
-    # Sort the summaries based on the 'week' key
-    sorted_summaries = sorted(summaries, key=lambda x: datetime.strptime(x.week.split(' - ')[0], '%d/%m'))
-    
-    return sorted_summaries
-
-def summarize_by_offer(df: pd.DataFrame, map: Dict) -> List[NamedTimesheetSummary]:
-    return summarize_by_group(df, 'ProductsOrServices', name_key="name", summary_class=NamedTimesheetSummary, map=map)
+from .aggregation import TimesheetAggregator, GROUPINGS
+from .context import TimesheetContext, get_context, in_list, normalize_filters, fields_key
 
 def get_appointments(df: pd.DataFrame) -> List[TimesheetAppointment]:
     appointments = []
@@ -239,22 +37,31 @@ def get_appointments(df: pd.DataFrame) -> List[TimesheetAppointment]:
         appointments.append(TimesheetAppointment(**appointment_dict))
     return appointments
 
-def compute_timesheet(map: Dict, slug: str, filters = None) -> Timesheet:
+def _business_calendar(dates) -> TimesheetBusinessCalendar:
+    calendar = compute_business_calendar(dates[0], dates[1])
+    return TimesheetBusinessCalendar(
+        days=[TimesheetBusinessDay(**day) for day in calendar['days']],
+        total_business_days=calendar['total_business_days'],
+        total_holidays=calendar['total_holidays']
+    )
+
+def _timeslug(slug: str) -> str:
     if not slug.startswith('timesheet-'):
         slug = f'timesheet-{slug}'
+    return slug
 
-    requested_fields = map.keys()
+def compute_timesheet(map: Dict, slug: str, filters = None, context: TimesheetContext = None) -> Timesheet:
+    slug = _timeslug(slug)
+    context = context or TimesheetContext()
 
-    timesheet = globals.omni_datasets.get_by_slug(slug)
-    source = globals.omni_datasets.get_dataset_source_by_slug(slug)
-    dates = globals.omni_datasets.get_dates(slug)
-    df = timesheet.data
+    cache_key = (slug, normalize_filters(filters), fields_key(map))
+    if cache_key in context.timesheets:
+        return context.timesheets[cache_key]
 
-    df, result = globals.omni_datasets.apply_filters(
-        source,
-        df,
-        filters
-    )
+    requested_fields = map.keys()
+
+    _, _, dates = context.slice(slug)
+    df, result = context.filter(slug, filters)
     
     response_dict = {
         'slug': slug,
@@ -263,62 +70,112 @@ def compute_timesheet(map: Dict, slug: str, filters = None) -> Timesheet:
     
     
     
-    # Check if any field other than the specific summary fields is requested
-    base_fields = set(requested_fields) - {
-        'byKind', 'byWorker', 'byClient', 'byCase', 'bySponsor', 
-        'byAccountManager', 'byDate', 'byWeek', 'byOffer'
-    }
-    
+    # All requested summaries and breakdowns are aggregated over the filtered frame at once
+    aggregator = TimesheetAggregator(df)
+
     # Base summary
     if "summary" in requested_fields:
-        response_dict['summary'] = summarize(df)
-    
-        
+        response_dict['summary'] = aggregator.summary(map['summary'])
+
     if 'businessCalendar' in requested_fields:
-        calendar = compute_business_calendar(dates[0], dates[1])
-        response_dict['business_calendar'] = TimesheetBusinessCalendar(
-            days=[TimesheetBusinessDay(**day) for day in calendar['days']],
-            total_business_days=calendar['total_business_days'],
-            total_holidays=calendar['total_holidays']
-        )
+        response_dict['business_calendar'] = _business_calendar(dates)
 
     # By kind
     if 'byKind' in requested_fields:
-        response_dict['by_kind'] = summarize_by_kind(df, map['byKind'])
+        response_dict['by_kind'] = aggregator.kinds(map['byKind'])
 
-    # By worker
-    if 'byWorker' in requested_fields:
-        response_dict['by_worker'] = summarize_by_worker(df, map['byWorker'])
+    # By worker, client, case, sponsor, account manager, date, week and offer
+    for field, (key, column, name_key, summary_class) in GROUPINGS.items():
+        if field in requested_fields:
+            response_dict[key] = aggregator.groups(column, name_key, summary_class, map[field])
 
-    # By client
-    if 'byClient' in requested_fields:
-        response_dict['by_client'] = summarize_by_client(df, map['byClient'])
+    if 'appointments' in requested_fields:
+        response_dict['appointments'] = get_appointments(df)
+        
 
-    # By case
-    if 'byCase' in requested_fields:
-        response_dict['by_case'] = summarize_by_case(df, map['byCase'])
+    timesheet = Timesheet(**response_dict)
+    context.timesheets[cache_key] = timesheet
+    return timesheet
+
+def _compute_partitioned_timesheets(map: Dict, slug: str, field: str, filters, context: TimesheetContext) -> Dict[Any, Dict]:
+    """
+    The timesheet fields of every value of `field` (all but the filterable
+    fields, which are filtered for each value), aggregated over the frame left by
+    `filters` grouped by `field` rather than once per value.
+    """
+    df = context.partition(slug, field, filters)
+    if df is None or len(df) == 0:
+        return {}
 
-    # By sponsor
-    if 'bySponsor' in requested_fields:
-        response_dict['by_sponsor'] = summarize_by_sponsor(df, map['bySponsor'])
+    requested_fields = map.keys()
+    _, _, dates = context.slice(slug)
+    aggregator = TimesheetAggregator(df)
+    parents = [field]
 
-    # By account manager
-    if 'byAccountManager' in requested_fields:
-        response_dict['by_account_manager'] = summarize_by_account_manager(df, map['byAccountManager'])
+    responses: Dict[Any, Dict] = {
+        value: {'slug': slug}
+        for value in df[field].dropna().unique()
+    }
 
-    # By date
-    if 'byDate' in requested_fields:
-        response_dict['by_date'] = summarize_by_date(df, map['byDate'])
+    if 'summary' in requested_fields:
+        for parent, summary in aggregator.summaries(map['summary'], parents).items():
+            responses[parent[0]]['summary'] = summary
 
-    # By week
-    if 'byWeek' in requested_fields:
-        response_dict['by_week'] = summarize_by_week(df, map['byWeek'])
-    
-    if 'byOffer' in requested_fields:
-        response_dict['by_offer'] = summarize_by_offer(df, map['byOffer'])
-        
-    if 'appointments' in requested_fields:
-        response_dict['appointments'] = get_appointments(df)
-        
+    if 'businessCalendar' in requested_fields:
+        calendar = _business_calendar(dates)
+        for response in responses.values():
+            response['business_calendar'] = calendar
+
+    if 'byKind' in requested_fields:
+        for response in responses.values():
+            response['by_kind'] = {}
+        for parent, by_kind in aggregator.by_kind(map['byKind'], parents).items():
+            responses[parent[0]]['by_kind'] = by_kind
+
+    for field_name, (key, column, name_key, summary_class) in GROUPINGS.items():
+        if field_name in requested_fields:
+            for response in responses.values():
+                response[key] = []
+            for parent, groups in aggregator.grouped(column, name_key, summary_class, map[field_name], parents).items():
+                responses[parent[0]][key] = groups
 
-    return Timesheet(**response_dict) 
+    if 'appointments' in requested_fields:
+        for value, rows in df.groupby(df[field], sort=False).indices.items():
+            responses[value]['appointments'] = get_appointments(df.iloc[rows])
+
+    return responses
+
+def compute_timesheet_of(info, map: Dict, slug: str, field: str, value: Any, filters = None) -> Timesheet:
+    """
+    The timesheet of the rows whose `field` is `value` (on top of `filters`),
+    as resolved for an entity. When the entity is an item of a list, the
+    timesheets of all the values of `field` are computed together, once per
+    request, and each sibling picks its own.
+    """
+    filters = filters or []
+    scoped_filters = [{'field': field, 'selected_values': [value]}] + filters
+    context = get_context(info)
+
+    if slug is None or not in_list(info):
+        return compute_timesheet(map, slug, scoped_filters, context)
+
+    slug = _timeslug(slug)
+    key = (slug, normalize_filters(scoped_filters), fields_key(map))
+    if key in context.timesheets:
+        return context.timesheets[key]
+
+    partition_key = (slug, field, normalize_filters([item for item in filters if item['field'] != field]), fields_key(map))
+    if partition_key not in context.partitions:
+        context.partitions[partition_key] = _compute_partitioned_timesheets(map, slug, field, filters, context)
+
+    response_dict = context.partitions[partition_key].get(value)
+    if response_dict is None:
+        return compute_timesheet(map, slug, scoped_filters, context)
+
+    if 'filterableFields' in map:
+        _, result = context.filter(slug, scoped_filters)
+        response_dict = {**response_dict, 'filterable_fields': result['filterable_fields']}
+
+    timesheet = Timesheet(**response_dict)
+    context.timesheets[key] = timesheet
+    return timesheet
@@ -0,0 +1,17 @@
+import os
+import sys
+import tempfile
+
+BACKEND = os.path.join(os.path.dirname(__file__), '..', '..')
+
+# Lets the tests run from a checkout where the packages are not pip-installed
+sys.path.insert(0, os.path.join(BACKEND, 'api', 'src'))
+for package in ('models', 'utils', 'shared'):
+    sys.path.insert(0, os.path.join(BACKEND, package, 'src'))
+
+# omni_shared.globals builds the datasets on import: it needs an API key, must
+# not prefetch the timesheet and creates its cache directories in the working
+# directory, so the tests run from a scratch one
+os.environ.setdefault('EVERHOUR_API_KEY', 'test')
+os.environ.setdefault('TIMESHEET_PREFETCH', 'false')
+os.chdir(tempfile.mkdtemp(prefix='omni-api-tests-'))
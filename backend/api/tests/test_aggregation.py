@@ -0,0 +1,119 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+from timesheet.aggregation import TimesheetAggregator, GROUPINGS
+from timesheet.models import NamedTimesheetSummary, TimesheetSummary
+
+ROWS = [
+    # Date, WorkerName, ClientName, Kind, Week, TimeInHs
+    (date(2024, 1, 15), 'Bruno', 'Acme', 'Internal', '14/01 - 20/01', 2.0),
+    (date(2024, 1, 16), 'Bruno', 'Globex', 'HandsOn', '14/01 - 20/01', 5.0),
+    (date(2024, 1, 16), 'Carla', 'Globex', 'Consulting', '14/01 - 20/01', 0.5),
+    (date(2024, 1, 8), 'Ana', 'Acme', 'Squad', '07/01 - 13/01', 4.0),
+    (date(2024, 1, 9), 'Ana', 'Acme', 'Squad', '07/01 - 13/01', 3.0),
+    (date(2024, 1, 9), 'Ana', 'Globex', 'Consulting', '07/01 - 13/01', 1.0),
+]
+
+
+@pytest.fixture
+def df() -> pd.DataFrame:
+    df = pd.DataFrame(ROWS, columns=['Date', 'WorkerName', 'ClientName', 'Kind', 'Week', 'TimeInHs'])
+    df['WorkerSlug'] = df['WorkerName'].str.lower()
+    df['ClientId'] = df['ClientName'].map({'Acme': 1, 'Globex': 2})
+    df['CaseId'] = df['ClientName'] + '-case'
+    df['CaseTitle'] = df['ClientName'] + ' case'
+    df['Sponsor'] = 'Sponsor'
+    df['AccountManagerSlug'] = 'am'
+    df['AccountManagerName'] = 'AM'
+    df['ProductsOrServices'] = 'Offer'
+    df['ProjectId'] = 'p-' + df['ClientName']
+    return df
+
+
+def test_summary(df):
+    summary = TimesheetAggregator(df).summary()
+
+    assert summary.total_entries == 6
+    assert summary.total_hours == pytest.approx(15.5)
+    assert summary.unique_workers == 3
+    assert summary.unique_clients == 2
+    assert summary.unique_working_days == 4
+    assert summary.unique_weeks == 2
+    assert summary.average_hours_per_entry == pytest.approx(15.5 / 6)
+    assert summary.std_dev_hours_per_entry == pytest.approx(df['TimeInHs'].std())
+    assert summary.total_squad_hours == pytest.approx(7.0)
+    assert summary.total_consulting_hours == pytest.approx(1.5)
+    assert summary.total_internal_hours == pytest.approx(2.0)
+    assert summary.total_hands_on_hours == pytest.approx(5.0)
+
+
+def test_summary_of_an_empty_frame(df):
+    assert TimesheetAggregator(df.iloc[0:0]).summary() == TimesheetSummary()
+
+
+def test_only_requested_fields_are_computed(df):
+    summary = TimesheetAggregator(df).summary({'totalHours': {}, 'uniqueClients': {}})
+
+    assert summary.total_hours == pytest.approx(15.5)
+    assert summary.unique_clients == 2
+    assert summary.total_entries == 0
+    assert summary.unique_workers == 0
+
+
+def test_groups_are_sorted_by_hours(df):
+    by_worker = TimesheetAggregator(df).groups('WorkerName', 'name', NamedTimesheetSummary, {'totalHours': {}, 'totalEntries': {}})
+
+    assert [(s.name, s.total_hours, s.total_entries) for s in by_worker] == [
+        ('Ana', 8.0, 3),
+        ('Bruno', 7.0, 2),
+        ('Carla', 0.5, 1),
+    ]
+
+
+def test_kinds(df):
+    kinds = TimesheetAggregator(df).kinds({'squad': {'totalHours': {}}, 'handsOn': {'totalHours': {}}})
+
+    assert list(kinds) == ['squad', 'hands_on']
+    assert kinds['squad'].total_hours == pytest.approx(7.0)
+    assert kinds['hands_on'].total_hours == pytest.approx(5.0)
+
+
+def test_nested_breakdowns_match_filtered_frames(df):
+    map = {'totalHours': {}, 'byKind': {'consulting': {'totalHours': {}, 'totalEntries': {}}}, 'byWeek': {'totalHours': {}}}
+    by_client = TimesheetAggregator(df).groups('ClientName', 'name', NamedTimesheetSummary, map)
+
+    for summary in by_client:
+        client = df[df['ClientName'] == summary.name]
+        consulting = client[client['Kind'] == 'Consulting']
+        if len(consulting) > 0:
+            assert summary.by_kind['consulting'].total_hours == pytest.approx(consulting['TimeInHs'].sum())
+            assert summary.by_kind['consulting'].total_entries == len(consulting)
+        else:
+            assert summary.by_kind == {}
+        assert {week.week: week.total_hours for week in summary.by_week} == pytest.approx(
+            client.groupby('Week')['TimeInHs'].sum().to_dict()
+        )
+
+
+def test_weeks_are_sorted_by_their_first_day(df):
+    by_week = TimesheetAggregator(df).by_week({'totalHours': {}}).get(())
+    assert [summary.week for summary in by_week] == ['07/01 - 13/01', '14/01 - 20/01']
+    assert [summary.total_hours for summary in by_week] == pytest.approx([8.0, 7.5])
+
+
+def test_summaries_per_parent_group(df):
+    summaries = TimesheetAggregator(df).summaries({'totalHours': {}}, ['WorkerName'])
+
+    assert {key: summary.total_hours for key, summary in summaries.items()} == pytest.approx({
+        ('Ana',): 8.0,
+        ('Bruno',): 7.0,
+        ('Carla',): 0.5,
+    })
+
+
+def test_workers_by_case(df):
+    by_case = TimesheetAggregator(df).groups('CaseTitle', 'title', GROUPINGS['byCase'][3], {'totalHours': {}, 'workers': {}})
+    workers = {summary.title: sorted(summary.workers) for summary in by_case}
+
+    assert workers == {'Acme case': ['Ana', 'Bruno'], 'Globex case': ['Ana', 'Bruno', 'Carla']}
@@ -6,7 +6,7 @@ from pydantic import BaseModel
 from omni_models.analytics.revenue_tracking import RevenueTracking
 
 from omni_shared import globals
-from omni_models.analytics.revenue_tracking import compute_revenue_tracking
+from omni_models.analytics.revenue_tracking import evaluator
 from omni_models.analytics import forecast_types
 
 
@@ -116,15 +116,16 @@ class ForecastRevenueTrackings(BaseModel):
     same_day_three_months_ago: RevenueTracking
     
     def __init__(self, forecast_dates: RevenueForecastDates, filters: Dict[str, Any]):
-        super().__init__(
-            date_of_interest=compute_revenue_tracking(forecast_dates.in_analysis, filters=filters),
-            last_day_of_last_month=compute_revenue_tracking(forecast_dates.last_day_of_one_month_ago, filters=filters),
-            last_day_of_two_months_ago=compute_revenue_tracking(forecast_dates.last_day_of_two_months_ago, filters=filters),
-            last_day_of_three_months_ago=compute_revenue_tracking(forecast_dates.last_day_of_three_months_ago, filters=filters),
-            same_day_last_month=compute_revenue_tracking(forecast_dates.same_day_one_month_ago, filters=filters),
-            same_day_two_months_ago=compute_revenue_tracking(forecast_dates.same_day_two_months_ago, filters=filters),
-            same_day_three_months_ago=compute_revenue_tracking(forecast_dates.same_day_three_months_ago, filters=filters)
-        )
+        # The same-day and last-day trackings of a month are cut from one snapshot of it
+        super().__init__(**evaluator.trackings({
+            'date_of_interest': forecast_dates.in_analysis,
+            'last_day_of_last_month': forecast_dates.last_day_of_one_month_ago,
+            'last_day_of_two_months_ago': forecast_dates.last_day_of_two_months_ago,
+            'last_day_of_three_months_ago': forecast_dates.last_day_of_three_months_ago,
+            'same_day_last_month': forecast_dates.same_day_one_month_ago,
+            'same_day_two_months_ago': forecast_dates.same_day_two_months_ago,
+            'same_day_three_months_ago': forecast_dates.same_day_three_months_ago,
+        }, filters))
 
 def merge_filterable_fields(analysis_lists):
     filterable_fields = []
@@ -0,0 +1,194 @@
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import weakref
+from datetime import date
+from pathlib import Path
+from typing import Any, Hashable, Optional, Tuple
+
+import pandas as pd
+
+from omni_shared import globals
+
+# Bumped whenever the computation or the stored structure changes, so older snapshots are ignored
+SNAPSHOT_FORMAT = 2
+
+# Timesheet columns a revenue tracking reads (directly or through the filters)
+TIMESHEET_COLUMNS = [
+    'Date', 'Kind', 'ProjectId', 'WorkerName', 'WorkerSlug', 'TimeInHs', 'Revenue',
+    'AccountManagerName', 'AccountManagerSlug', 'ClientName', 'ClientSlug',
+    'CaseTitle', 'CaseSlug', 'Sponsor', 'ProductsOrServices',
+]
+
+
+def _digest(value: Any) -> str:
+    return hashlib.blake2b(repr(value).encode(), digest_size=16).hexdigest()
+
+
+def is_closed(year: int, month: int, today: date = None) -> bool:
+    """Whether the month is over, so its timesheet no longer receives appointments"""
+    today = today or date.today()
+    return (year, month) < (today.year, today.month)
+
+
+class RevenueSnapshotStore:
+    """
+    Immutable revenue trackings of closed months, pickled to a local
+    directory. A snapshot is keyed by its day, account manager and filters
+    plus the version of the data it was computed from: the version of the
+    month's timesheet (see `RevenueTrackingEvaluator.month_version`) and a
+    digest of the cases, clients and workers. Any change to them leads to a
+    different key, so a stale snapshot is never read.
+    """
+
+    def __init__(self, directory: str = None):
+        self.directory = Path(directory or os.getenv('REVENUE_SNAPSHOTS_DIR', 'revenue_snapshots'))
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._timesheet_versions = weakref.WeakKeyDictionary()
+        self._models_version: Optional[Tuple[Tuple[int, ...], str]] = None
+        self._lock = threading.Lock()
+
+    def timesheet_version(self, timesheet) -> str:
+        """Digest of the columns of a month snapshot that revenue trackings read"""
+        with self._lock:
+            version = self._timesheet_versions.get(timesheet)
+        if version is not None:
+            return version
+
+        df = timesheet.data
+        columns = [column for column in TIMESHEET_COLUMNS if column in df.columns]
+        hashes = pd.util.hash_pandas_object(df[columns].astype(object), index=False) if len(df) > 0 else pd.Series([], dtype='uint64')
+        version = hashlib.blake2b(
+            ','.join(columns).encode() + hashes.to_numpy().tobytes(),
+            digest_size=16
+        ).hexdigest()
+
+        with self._lock:
+            self._timesheet_versions[timesheet] = version
+        return version
+
+    def models_version(self) -> str:
+        """Digest of the cases (contracts and projects), clients and workers"""
+        cases = globals.omni_models.cases.get_all()
+        clients = globals.omni_models.clients.get_all()
+        workers = globals.omni_models.workers.get_all()
+
+        # The repositories replace their dictionaries when they reload
+        identity = (id(cases), id(clients), id(workers))
+        with self._lock:
+            if self._models_version is not None and self._models_version[0] == identity:
+                return self._models_version[1]
+
+        version = _digest((
+            sorted(
+                (
+                    str(case.id), case.slug, case.title, case.is_active, case.pre_contracted_value,
+                    case.client_id, case.sponsor, case.start_of_contract, case.end_of_contract,
+                    [project.model_dump_json() for project in case.tracker_info or []],
+                )
+                for case in cases.values()
+            ),
+            sorted(
+                (
+                    client.id, client.name, client.slug,
+                    client.account_manager.name if client.account_manager else None,
+                )
+                for client in clients.values()
+            ),
+            sorted((str(worker.name), str(worker.slug)) for worker in workers.values()),
+        ))
+
+        with self._lock:
+            self._models_version = (identity, version)
+        return version
+
+    def key(self, day: date, account_manager_name_or_slug, filters, timesheet_version: str) -> str:
+        """
+        `<identity>-<version>`: the identity names the tracking (day, account
+        manager and filters), the version the data it was computed from.
+        """
+        identity = _digest((
+            day.isoformat(),
+            account_manager_name_or_slug,
+            self._freeze(filters),
+        ))
+        version = _digest((
+            SNAPSHOT_FORMAT,
+            timesheet_version,
+            self.models_version(),
+        ))
+        return f"{identity}-{version}"
+
+    @staticmethod
+    def _freeze(value: Any) -> Hashable:
+        if isinstance(value, dict):
+            return tuple(sorted((k, RevenueSnapshotStore._freeze(v)) for k, v in value.items()))
+        if isinstance(value, (list, tuple)):
+            return tuple(RevenueSnapshotStore._freeze(v) for v in value)
+        return value
+
+    def _path(self, day: date, key: str) -> Path:
+        return self.directory / f"{day.year}-{day.month:02d}" / f"{key}.snapshot"
+
+    def get(self, day: date, key: str) -> Optional[Any]:
+        path = self._path(day, key)
+        if not path.is_file():
+            return None
+        try:
+            with open(path, 'rb') as file:
+                return pickle.load(file)
+        except Exception as ex:
+            self.logger.warning(f"Unable to read revenue snapshot {path}: {ex}")
+            return None
+
+    def put(self, day: date, key: str, value: Any):
+        path = self._path(day, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                pickle.dump(value, file)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._prune(path)
+
+    def _prune(self, path: Path):
+        """Removes the other versions of the tracking stored at `path`, which can no longer be read"""
+        identity = path.stem.split('-')[0]
+        for other in path.parent.glob('*.snapshot'):
+            if other != path and other.stem.split('-')[0] == identity:
+                try:
+                    other.unlink()
+                except FileNotFoundError:
+                    pass
+
+    def months(self):
+        """The (year, month) of the months with stored snapshots"""
+        if not self.directory.is_dir():
+            return []
+        return sorted(
+            (int(entry.name[:4]), int(entry.name[5:]))
+            for entry in self.directory.iterdir()
+            if entry.is_dir()
+        )
+
+    def drop(self, after: date = None, before: date = None) -> int:
+        """Removes the snapshots of the months touching [after, before]; all of them by default"""
+        removed = 0
+        for year, month in self.months():
+            if after is not None and (year, month) < (after.year, after.month):
+                continue
+            if before is not None and (year, month) > (before.year, before.month):
+                continue
+            directory = self.directory / f"{year}-{month:02d}"
+            for path in directory.glob('*.snapshot'):
+                path.unlink()
+                removed += 1
+        self.logger.info(f"Removed {removed} revenue snapshots")
+        return removed
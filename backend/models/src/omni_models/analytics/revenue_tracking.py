@@ -1,13 +1,22 @@
 import calendar
+import itertools
+import logging
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from omni_shared import globals
 
 from datetime import date, datetime, timedelta
+from omni_utils.decorators.cache import cache, forget
 from omni_utils.helpers.slug import slugify
 from omni_models.domain.cases import Case
+from omni_models.analytics.revenue_snapshots import RevenueSnapshotStore, is_closed
 from omni_utils.helpers.dates import get_first_day_of_month, get_last_day_of_month
+import numpy as np
 import pandas as pd
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
 INTERNAL_KIND = "Internal"
 PROJECT_KINDS = ["consulting", "handsOn", "squad"]
@@ -141,6 +150,93 @@ class RevenueTrackingBase(BaseModel):
     monthly: RevenueTrackingMonthly
     daily: List[RevenueTrackingDaily]
 
+class RevenueTrackingEntry(NamedTuple):
+    item: BaseModel
+    # Account manager, client, sponsor, case and project above the item, as far as they go
+    parents: Tuple[BaseModel, ...]
+
+class RevenueTrackingTable:
+    """
+    One revenue tracking tree flattened into a table per level, each mapping
+    a name (a title, for cases) to its entries in tree order.
+    """
+
+    def __init__(self, data: RevenueTrackingBase):
+        self.account_managers: Dict[str, List[RevenueTrackingEntry]] = {}
+        self.clients: Dict[str, List[RevenueTrackingEntry]] = {}
+        self.sponsors: Dict[str, List[RevenueTrackingEntry]] = {}
+        self.cases: Dict[str, List[RevenueTrackingEntry]] = {}
+        self.projects: Dict[str, List[RevenueTrackingEntry]] = {}
+        self.workers: Dict[str, List[RevenueTrackingEntry]] = {}
+        # Every project, in tree order, for the totals by kind
+        self.all_projects: List[RevenueTrackingEntry] = []
+
+        for account_manager in data.monthly.by_account_manager:
+            self._add(self.account_managers, account_manager.name, account_manager, ())
+            for client in account_manager.by_client:
+                self._add(self.clients, client.name, client, (account_manager,))
+                for sponsor in client.by_sponsor:
+                    self._add(self.sponsors, sponsor.name, sponsor, (account_manager, client))
+                    for case in sponsor.by_case:
+                        self._add(self.cases, case.title, case, (account_manager, client, sponsor))
+                        for project in case.by_project:
+                            entry = self._add(self.projects, project.name, project, (account_manager, client, sponsor, case))
+                            self.all_projects.append(entry)
+                            if hasattr(project, 'by_worker') and project.by_worker:
+                                for worker in project.by_worker:
+                                    self._add(self.workers, worker.name, worker, entry.parents + (project,))
+
+    @staticmethod
+    def _add(table: Dict[str, List[RevenueTrackingEntry]], name: str, item: BaseModel, parents: tuple) -> RevenueTrackingEntry:
+        entry = RevenueTrackingEntry(item, parents)
+        table.setdefault(name, []).append(entry)
+        return entry
+
+    @staticmethod
+    def total(entries: List[RevenueTrackingEntry], field: str, kind: str = None) -> float:
+        """Sum of `field` over the entries (projects of `kind` only, when given)"""
+        return sum(
+            getattr(entry.item, field)
+            for entry in entries
+            if kind is None or entry.item.kind == kind
+        )
+
+class RevenueTrackingIndex:
+    """
+    The pre-contracted and regular trees of a revenue tracking, flattened
+    once so the summary builders look their entities up instead of walking
+    both trees again for each of them.
+    """
+
+    def __init__(self, pre_contracted: RevenueTrackingBase, regular: RevenueTrackingBase):
+        self.pre_contracted = RevenueTrackingTable(pre_contracted)
+        self.regular = RevenueTrackingTable(regular)
+
+    @staticmethod
+    def of(pre_contracted: RevenueTrackingBase, regular: RevenueTrackingBase, index: 'RevenueTrackingIndex' = None) -> 'RevenueTrackingIndex':
+        return index or RevenueTrackingIndex(pre_contracted, regular)
+
+    @property
+    def tables(self) -> List[RevenueTrackingTable]:
+        return [self.pre_contracted, self.regular]
+
+    def names(self, level: str) -> List[str]:
+        """Sorted names of the entries of `level` in either tree"""
+        return sorted(set(
+            name
+            for table in self.tables
+            for name in getattr(table, level)
+        ))
+
+    def children(self, level: str, name: str, attribute: str, key: str = 'name') -> List[str]:
+        """Sorted names of the children (`attribute`) of the `level` entries named `name`"""
+        return sorted(set(
+            getattr(child, key)
+            for table in self.tables
+            for entry in getattr(table, level).get(name, [])
+            for child in getattr(entry.item, attribute)
+        ))
+
 class RevenueTrackingAccountManagerSummary(BaseModel):
     name: str
     slug: str
@@ -152,54 +248,24 @@ class RevenueTrackingAccountManagerSummary(BaseModel):
     consulting_fee_new: float
     hands_on_fee: float
     squad_fee: float
-    
+
     @staticmethod
-    def build(account_manager_name, pre_contracted: RevenueTrackingBase, regular: RevenueTrackingBase):
-        pre_contracted_fee = sum(
-            account_manager.fee
-            for account_manager in pre_contracted.monthly.by_account_manager
-            if account_manager.name == account_manager_name
-        )
-        regular_fee = sum(
-            account_manager.fee
-            for account_manager in regular.monthly.by_account_manager
-            if account_manager.name == account_manager_name
-        )
-        
-        total_consulting_fee = sum(
-            account_manager.consulting_fee
-            for account_manager in regular.monthly.by_account_manager
-            if account_manager.name == account_manager_name
-        ) 
-        
-        total_consulting_fee_new = sum(
-            account_manager.consulting_fee_new
-            for account_manager in regular.monthly.by_account_manager
-            if account_manager.name == account_manager_name
-        )
-        
-        total_consulting_pre_fee = sum(
-            account_manager.consulting_pre_fee
-            for account_manager in pre_contracted.monthly.by_account_manager
-            if account_manager.name == account_manager_name
-        ) + sum(
-            account_manager.consulting_pre_fee
-            for account_manager in regular.monthly.by_account_manager
-            if account_manager.name == account_manager_name
-        )
-        
-        total_hands_on_fee = sum(
-            account_manager.hands_on_fee
-            for account_manager in pre_contracted.monthly.by_account_manager
-            if account_manager.name == account_manager_name
-        )
-        total_squad_fee = sum(
-            account_manager.squad_fee
-            for account_manager in pre_contracted.monthly.by_account_manager
-            if account_manager.name == account_manager_name
-        )
+    def build(account_manager_name, pre_contracted: RevenueTrackingBase, regular: RevenueTrackingBase, index: RevenueTrackingIndex = None):
+        index = RevenueTrackingIndex.of(pre_contracted, regular, index)
+        pre = index.pre_contracted.account_managers.get(account_manager_name, [])
+        reg = index.regular.account_managers.get(account_manager_name, [])
+        total = RevenueTrackingTable.total
+
+        pre_contracted_fee = total(pre, 'fee')
+        regular_fee = total(reg, 'fee')
+        total_consulting_fee = total(reg, 'consulting_fee')
+        total_consulting_fee_new = total(reg, 'consulting_fee_new')
+        total_consulting_pre_fee = total(pre, 'consulting_pre_fee') + total(reg, 'consulting_pre_fee')
+        total_hands_on_fee = total(pre, 'hands_on_fee')
+        total_squad_fee = total(pre, 'squad_fee')
+
         account_manager = globals.omni_models.workers.get_by_name(account_manager_name)
-        
+
         return RevenueTrackingAccountManagerSummary(
             name=account_manager_name,
             slug=account_manager.slug if account_manager else None,
@@ -212,19 +278,16 @@ class RevenueTrackingAccountManagerSummary(BaseModel):
             hands_on_fee=total_hands_on_fee,
             squad_fee=total_squad_fee,
         )
-    
+
     @staticmethod
-    def build_list(pre_contracted: RevenueTrackingBase, regular: RevenueTrackingBase):
-        account_managers_names = sorted(set(    
-            account_manager.name
-            for account_manager in pre_contracted.monthly.by_account_manager + regular.monthly.by_account_manager
-        ))
-        
+    def build_list(pre_contracted: RevenueTrackingBase, regular: RevenueTrackingBase, index: RevenueTrackingIndex = None):
+        index = RevenueTrackingIndex.of(pre_contracted, regular, index)
+
         return [
-            RevenueTrackingAccountManagerSummary.build(account_manager_name, pre_contracted, regular) 
-            for account_manager_name in account_managers_names
+            RevenueTrackingAccountManagerSummary.build(account_manager_name, pre_contracted, regular, index)
+            for account_manager_name in index.names('account_managers')
         ]
-        
+
 class RevenueTrackingProjectSummary(BaseModel):
     name: str
     case_title: str
@@ -239,7 +302,7 @@ class RevenueTrackingProjectSummary(BaseModel):
     consulting_fee_new: float
     hands_on_fee: float
     squad_fee: float
-    
+
     def get_fee(self, kind):
         if kind == "consulting":
             return self.consulting_fee
@@ -251,109 +314,26 @@ class RevenueTrackingProjectSummary(BaseModel):
             return self.squad_fee
         else:
             return 0
-        
+
     @staticmethod
-    def build(project_name, pre_contracted: RevenueTrackingBase, regular: RevenueTrackingBase):
-        pre_contracted_fee = sum(
-            project.fee
-            for account_manager in pre_contracted.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            for case in sponsor.by_case
-            for project in case.by_project
-            if project.name == project_name
-        )
-        
-        regular_fee = sum(
-            project.fee
-            for account_manager in regular.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            for case in sponsor.by_case
-            for project in case.by_project
-            if project.name == project_name
-        )
-        
-        total_consulting_fee = sum(
-            project.fee
-            for account_manager in regular.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            for case in sponsor.by_case
-            for project in case.by_project
-            if project.name == project_name and project.kind == "consulting"
-        )
-        
-        total_consulting_fee_new = sum(
-            project.fee
-            for account_manager in regular.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            for case in sponsor.by_case
-            for project in case.by_project
-            if project.name == project_name and project.kind == "consulting"
-        )
-        
-        total_consulting_hours = sum(
-            project.hours
-            for account_manager in regular.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            for case in sponsor.by_case
-            for project in case.by_project
-            if project.name == project_name and project.kind == "consulting"
-        )
-        
-        total_consulting_pre_hours = sum(
-            project.hours
-            for account_manager in pre_contracted.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            for case in sponsor.by_case
-            for project in case.by_project
-            if project.name == project_name and project.kind == "consulting"
-        )
-        
-        total_consulting_pre_fee = sum(
-            project.fee
-            for account_manager in pre_contracted.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            for case in sponsor.by_case
-            for project in case.by_project
-            if project.name == project_name and project.kind == "consulting"
-        ) + sum(
-            project.fee
-            for account_manager in regular.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            for case in sponsor.by_case
-            for project in case.by_project
-            if project.name == project_name and project.kind == "consulting"
-        )
-        
-        total_hands_on_fee = sum(
-            project.fee
-            for account_manager in pre_contracted.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            for case in sponsor.by_case
-            for project in case.by_project
-            if project.name == project_name and project.kind == "handsOn"
-        )
-        
-        total_squad_fee = sum(
-            project.fee
-            for account_manager in pre_contracted.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            for case in sponsor.by_case
-            for project in case.by_project
-            if project.name == project_name and project.kind == "squad"
-        )
-        
+    def build(project_name, pre_contracted: RevenueTrackingBase, regular: RevenueTrackingBase, index: RevenueTrackingIndex = None):
+        index = RevenueTrackingIndex.of(pre_contracted, regular, index)
+        pre = index.pre_contracted.projects.get(project_name, [])
+        reg = index.regular.projects.get(project_name, [])
+        total = RevenueTrackingTable.total
+
+        pre_contracted_fee = total(pre, 'fee')
+        regular_fee = total(reg, 'fee')
+        total_consulting_fee = total(reg, 'fee', "consulting")
+        total_consulting_fee_new = total(reg, 'fee', "consulting")
+        total_consulting_hours = total(reg, 'hours', "consulting")
+        total_consulting_pre_hours = total(pre, 'hours', "consulting")
+        total_consulting_pre_fee = total(pre, 'fee', "consulting") + total(reg, 'fee', "consulting")
+        total_hands_on_fee = total(pre, 'fee', "handsOn")
+        total_squad_fee = total(pre, 'fee', "squad")
+
         case = globals.omni_models.cases.get_by_everhour_project_name(project_name)
-        
+
         return RevenueTrackingProjectSummary(
             name=project_name,
             case_title=case.title,
@@ -368,31 +348,22 @@ class RevenueTrackingProjectSummary(BaseModel):
             consulting_fee_new=total_consulting_fee_new,
             hands_on_fee=total_hands_on_fee,
             squad_fee=total_squad_fee,
-        )   
-        
+        )
+
     @staticmethod
-    def build_list(pre_contracted: RevenueTrackingBase, regular: RevenueTrackingBase, case_title = None):
-        def get_projects(data: RevenueTrackingBase):
-            projects = set()
-            for account_manager in data.monthly.by_account_manager:
-                for client in account_manager.by_client:
-                    for sponsor in client.by_sponsor:
-                        for case in sponsor.by_case:
-                            if case_title is None or case.title == case_title:
-                                for project in case.by_project:
-                                    projects.add(project.name)
-            return projects
-            
-        # Combine projects from both sources
-        project_names = sorted(
-            get_projects(pre_contracted) | get_projects(regular)
+    def build_list(pre_contracted: RevenueTrackingBase, regular: RevenueTrackingBase, case_title = None, index: RevenueTrackingIndex = None):
+        index = RevenueTrackingIndex.of(pre_contracted, regular, index)
+        project_names = (
+            index.names('projects')
+            if case_title is None
+            else index.children('cases', case_title, 'by_project')
         )
-        
+
         return [
-            RevenueTrackingProjectSummary.build(project_name, pre_contracted, regular)
+            RevenueTrackingProjectSummary.build(project_name, pre_contracted, regular, index)
             for project_name in project_names
         ]
-        
+
 class RevenueTrackingCaseSummary(BaseModel):
     title: str
     slug: str
@@ -406,9 +377,9 @@ class RevenueTrackingCaseSummary(BaseModel):
     consulting_fee_new: float
     hands_on_fee: float
     squad_fee: float
-    
+
     by_project: list[RevenueTrackingProjectSummary]
-    
+
     def get_fee(self, kind):
         if kind == "consulting":
             return self.consulting_fee
@@ -420,99 +391,27 @@ class RevenueTrackingCaseSummary(BaseModel):
             return self.squad_fee
         else:
             return 0
-    
+
     @staticmethod
-    def build(case_title, pre_contracted: RevenueTrackingBase, regular: RevenueTrackingBase):
-        pre_contracted_fee = sum(
-            case.fee
-            for account_manager in pre_contracted.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            for case in sponsor.by_case
-            if case.title == case_title
-        )
-        regular_fee = sum(
-            case.fee
-            for account_manager in regular.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            for case in sponsor.by_case
-            if case.title == case_title
-        )
-        
-        total_consulting_fee = sum(
-            case.consulting_fee
-            for account_manager in regular.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            for case in sponsor.by_case
-            if case.title == case_title
-        )
-        
-        total_consulting_fee_new = sum(
-            case.consulting_fee_new
-            for account_manager in regular.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            for case in sponsor.by_case
-            if case.title == case_title
-        )
-        
-        total_consulting_hours = sum(
-            case.consulting_hours
-            for account_manager in regular.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            for case in sponsor.by_case
-            if case.title == case_title
-        )
-        
-        total_consulting_pre_hours = sum(
-            case.consulting_pre_hours
-            for account_manager in pre_contracted.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            for case in sponsor.by_case
-            if case.title == case_title
-        )
-            
-        total_consulting_pre_fee = sum(
-            case.consulting_pre_fee
-            for account_manager in pre_contracted.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            for case in sponsor.by_case
-            if case.title == case_title
-        ) + sum(
-            case.consulting_pre_fee
-            for account_manager in regular.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            for case in sponsor.by_case
-            if case.title == case_title
-        )
-        
-        total_hands_on_fee = sum(
-            case.hands_on_fee
-            for account_manager in pre_contracted.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            for case in sponsor.by_case
-            if case.title == case_title
-        )
-        
-        total_squad_fee = sum(
-            case.squad_fee
-            for account_manager in pre_contracted.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            for case in sponsor.by_case
-            if case.title == case_title
-        )
-        
-        by_project = RevenueTrackingProjectSummary.build_list(pre_contracted, regular, case_title)
+    def build(case_title, pre_contracted: RevenueTrackingBase, regular: RevenueTrackingBase, index: RevenueTrackingIndex = None):
+        index = RevenueTrackingIndex.of(pre_contracted, regular, index)
+        pre = index.pre_contracted.cases.get(case_title, [])
+        reg = index.regular.cases.get(case_title, [])
+        total = RevenueTrackingTable.total
+
+        pre_contracted_fee = total(pre, 'fee')
+        regular_fee = total(reg, 'fee')
+        total_consulting_fee = total(reg, 'consulting_fee')
+        total_consulting_fee_new = total(reg, 'consulting_fee_new')
+        total_consulting_hours = total(reg, 'consulting_hours')
+        total_consulting_pre_hours = total(pre, 'consulting_pre_hours')
+        total_consulting_pre_fee = total(pre, 'consulting_pre_fee') + total(reg, 'consulting_pre_fee')
+        total_hands_on_fee = total(pre, 'hands_on_fee')
+        total_squad_fee = total(pre, 'squad_fee')
+
+        by_project = RevenueTrackingProjectSummary.build_list(pre_contracted, regular, case_title, index)
         case = globals.omni_models.cases.get_by_title(case_title)
-        
+
         return RevenueTrackingCaseSummary(
             title=case_title,
             slug=case.slug,
@@ -528,23 +427,21 @@ class RevenueTrackingCaseSummary(BaseModel):
             squad_fee=total_squad_fee,
             by_project=by_project
         )
-        
+
     @staticmethod
-    def build_list(pre_contracted: RevenueTrackingBase, regular: RevenueTrackingBase, sponsor_name = None):
-        case_titles = sorted(set(
-            case.title
-            for account_manager in pre_contracted.monthly.by_account_manager + regular.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            for case in sponsor.by_case
-            if sponsor_name is None or sponsor.name == sponsor_name
-        ))
-        
+    def build_list(pre_contracted: RevenueTrackingBase, regular: RevenueTrackingBase, sponsor_name = None, index: RevenueTrackingIndex = None):
+        index = RevenueTrackingIndex.of(pre_contracted, regular, index)
+        case_titles = (
+            index.names('cases')
+            if sponsor_name is None
+            else index.children('sponsors', sponsor_name, 'by_case', key='title')
+        )
+
         return [
-            RevenueTrackingCaseSummary.build(case_title, pre_contracted, regular)
+            RevenueTrackingCaseSummary.build(case_title, pre_contracted, regular, index)
             for case_title in case_titles
         ]
-        
+
 class RevenueTrackingSponsorSummary(BaseModel):
     name: str
     slug: str
@@ -559,7 +456,7 @@ class RevenueTrackingSponsorSummary(BaseModel):
     hands_on_fee: float
     squad_fee: float
     by_case: list[RevenueTrackingCaseSummary]
-    
+
     def get_fee(self, kind):
         if kind == "consulting":
             return self.consulting_fee
@@ -571,87 +468,26 @@ class RevenueTrackingSponsorSummary(BaseModel):
             return self.squad_fee
         else:
             return 0
-    
+
     @staticmethod
-    def build(sponsor_name, pre_contracted: RevenueTrackingBase, regular: RevenueTrackingBase):
-        pre_contracted_fee = sum(
-            sponsor.fee
-            for account_manager in pre_contracted.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            if sponsor.name == sponsor_name
-        )
-        regular_fee = sum(
-            sponsor.fee
-            for account_manager in regular.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            if sponsor.name == sponsor_name
-        )
-        
-        total_consulting_fee = sum(
-            sponsor.consulting_fee
-            for account_manager in regular.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            if sponsor.name == sponsor_name
-        )
-        
-        total_consulting_fee_new = sum(
-            sponsor.consulting_fee_new
-            for account_manager in regular.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            if sponsor.name == sponsor_name
-        )
-        
-        total_consulting_hours = sum(
-            sponsor.consulting_hours
-            for account_manager in regular.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            if sponsor.name == sponsor_name
-        )
-        
-        total_consulting_pre_hours = sum(
-            sponsor.consulting_pre_hours
-            for account_manager in pre_contracted.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            if sponsor.name == sponsor_name
-        )
-            
-        total_consulting_pre_fee = sum(
-            sponsor.consulting_pre_fee
-            for account_manager in pre_contracted.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            if sponsor.name == sponsor_name
-        ) + sum(
-            sponsor.consulting_pre_fee
-            for account_manager in regular.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            if sponsor.name == sponsor_name
-        )
-        
-        total_hands_on_fee = sum(
-            sponsor.hands_on_fee
-            for account_manager in pre_contracted.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            if sponsor.name == sponsor_name
-        )
-        total_squad_fee = sum(
-            sponsor.squad_fee
-            for account_manager in pre_contracted.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            if sponsor.name == sponsor_name
-        )
-        
-        by_case = RevenueTrackingCaseSummary.build_list(pre_contracted, regular, sponsor_name)
-        
+    def build(sponsor_name, pre_contracted: RevenueTrackingBase, regular: RevenueTrackingBase, index: RevenueTrackingIndex = None):
+        index = RevenueTrackingIndex.of(pre_contracted, regular, index)
+        pre = index.pre_contracted.sponsors.get(sponsor_name, [])
+        reg = index.regular.sponsors.get(sponsor_name, [])
+        total = RevenueTrackingTable.total
+
+        pre_contracted_fee = total(pre, 'fee')
+        regular_fee = total(reg, 'fee')
+        total_consulting_fee = total(reg, 'consulting_fee')
+        total_consulting_fee_new = total(reg, 'consulting_fee_new')
+        total_consulting_hours = total(reg, 'consulting_hours')
+        total_consulting_pre_hours = total(pre, 'consulting_pre_hours')
+        total_consulting_pre_fee = total(pre, 'consulting_pre_fee') + total(reg, 'consulting_pre_fee')
+        total_hands_on_fee = total(pre, 'hands_on_fee')
+        total_squad_fee = total(pre, 'squad_fee')
+
+        by_case = RevenueTrackingCaseSummary.build_list(pre_contracted, regular, sponsor_name, index)
+
         return RevenueTrackingSponsorSummary(
             name=sponsor_name,
             slug=slugify(sponsor_name),
@@ -667,19 +503,18 @@ class RevenueTrackingSponsorSummary(BaseModel):
             squad_fee=total_squad_fee,
             by_case=by_case
         )
-    
+
     @staticmethod
-    def build_list(pre_contracted, regular, client_name = None):
-        sponsors_names = sorted(set(
-            sponsor.name
-            for account_manager in pre_contracted.monthly.by_account_manager + regular.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            if client_name is None or client.name == client_name
-        ))
-        
+    def build_list(pre_contracted, regular, client_name = None, index: RevenueTrackingIndex = None):
+        index = RevenueTrackingIndex.of(pre_contracted, regular, index)
+        sponsors_names = (
+            index.names('sponsors')
+            if client_name is None
+            else index.children('clients', client_name, 'by_sponsor')
+        )
+
         return [
-            RevenueTrackingSponsorSummary.build(sponsor_name, pre_contracted, regular)
+            RevenueTrackingSponsorSummary.build(sponsor_name, pre_contracted, regular, index)
             for sponsor_name in sponsors_names
         ]
 
@@ -698,7 +533,7 @@ class RevenueTrackingClientSummary(BaseModel):
     hands_on_fee: float
     squad_fee: float
     by_sponsor: list[RevenueTrackingSponsorSummary]
-    
+
     def get_fee(self, kind):
         if kind == "consulting":
             return self.consulting_fee
@@ -710,79 +545,27 @@ class RevenueTrackingClientSummary(BaseModel):
             return self.squad_fee
         else:
             return 0
-    
+
     @staticmethod
-    def build(client_name, pre_contracted: RevenueTrackingBase, regular: RevenueTrackingBase):
-        pre_contracted_fee = sum(
-            client.fee
-            for account_manager in pre_contracted.monthly.by_account_manager
-            for client in account_manager.by_client
-            if client.name == client_name
-        )
-        
-        regular_fee = sum(
-            client.fee
-            for account_manager in regular.monthly.by_account_manager
-            for client in account_manager.by_client
-            if client.name == client_name
-        )
-        
-        total_consulting_fee = sum(
-            client.consulting_fee
-            for account_manager in regular.monthly.by_account_manager
-            for client in account_manager.by_client
-            if client.name == client_name
-        )
-        
-        total_consulting_fee_new = sum(
-            client.consulting_fee_new
-            for account_manager in regular.monthly.by_account_manager
-            for client in account_manager.by_client
-            if client.name == client_name
-        )
-        
-        total_consulting_hours = sum(
-            client.consulting_hours
-            for account_manager in regular.monthly.by_account_manager
-            for client in account_manager.by_client
-            if client.name == client_name
-        )
-        
-        total_consulting_pre_hours = sum(
-            client.consulting_pre_hours
-            for account_manager in pre_contracted.monthly.by_account_manager
-            for client in account_manager.by_client
-            if client.name == client_name
-        )
+    def build(client_name, pre_contracted: RevenueTrackingBase, regular: RevenueTrackingBase, index: RevenueTrackingIndex = None):
+        index = RevenueTrackingIndex.of(pre_contracted, regular, index)
+        pre = index.pre_contracted.clients.get(client_name, [])
+        reg = index.regular.clients.get(client_name, [])
+        total = RevenueTrackingTable.total
+
+        pre_contracted_fee = total(pre, 'fee')
+        regular_fee = total(reg, 'fee')
+        total_consulting_fee = total(reg, 'consulting_fee')
+        total_consulting_fee_new = total(reg, 'consulting_fee_new')
+        total_consulting_hours = total(reg, 'consulting_hours')
+        total_consulting_pre_hours = total(pre, 'consulting_pre_hours')
+        total_consulting_pre_fee = total(pre, 'consulting_pre_fee') + total(reg, 'consulting_pre_fee')
+        total_hands_on_fee = total(pre, 'hands_on_fee')
+        total_squad_fee = total(pre, 'squad_fee')
 
-        total_consulting_pre_fee = sum(
-            client.consulting_pre_fee
-            for account_manager in pre_contracted.monthly.by_account_manager
-            for client in account_manager.by_client
-            if client.name == client_name
-        ) + sum(
-            client.consulting_pre_fee
-            for account_manager in regular.monthly.by_account_manager
-            for client in account_manager.by_client
-            if client.name == client_name
-        )
-        
-        total_hands_on_fee = sum(
-            client.hands_on_fee
-            for account_manager in pre_contracted.monthly.by_account_manager
-            for client in account_manager.by_client
-            if client.name == client_name
-        )
-        
-        total_squad_fee = sum(
-            client.squad_fee
-            for account_manager in pre_contracted.monthly.by_account_manager
-            for client in account_manager.by_client
-            if client.name == client_name
-        )
         client = globals.omni_models.clients.get_by_name(client_name)
-        by_sponsor = RevenueTrackingSponsorSummary.build_list(pre_contracted, regular, client_name)
-        
+        by_sponsor = RevenueTrackingSponsorSummary.build_list(pre_contracted, regular, client_name, index)
+
         return RevenueTrackingClientSummary(
             name=client_name,
             slug=client.slug if client else None,
@@ -798,20 +581,16 @@ class RevenueTrackingClientSummary(BaseModel):
             squad_fee=total_squad_fee,
             by_sponsor=by_sponsor
         )
-    
+
     @staticmethod
-    def build_list(pre_contracted: RevenueTrackingBase, regular: RevenueTrackingBase):
-        clients_names = sorted(set(
-            client.name
-            for account_manager in pre_contracted.monthly.by_account_manager + regular.monthly.by_account_manager
-            for client in account_manager.by_client
-        ))
-        
+    def build_list(pre_contracted: RevenueTrackingBase, regular: RevenueTrackingBase, index: RevenueTrackingIndex = None):
+        index = RevenueTrackingIndex.of(pre_contracted, regular, index)
+
         return [
-            RevenueTrackingClientSummary.build(client_name, pre_contracted, regular)
-            for client_name in clients_names
+            RevenueTrackingClientSummary.build(client_name, pre_contracted, regular, index)
+            for client_name in index.names('clients')
         ]
-    
+
 class RevenueTrackingKindSummary(BaseModel):
     name: str
     pre_contracted: float
@@ -819,26 +598,11 @@ class RevenueTrackingKindSummary(BaseModel):
     total: float
 
     @staticmethod
-    def build(kind, pre_contracted: RevenueTrackingBase, regular: RevenueTrackingBase):
-        pre_contracted_fee = sum(
-            project.fee
-            for account_manager in pre_contracted.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            for case in sponsor.by_case
-            for project in case.by_project
-            if project.kind == kind
-        )
-        regular_fee = sum(
-            project.fee
-            for account_manager in regular.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            for case in sponsor.by_case
-            for project in case.by_project
-            if project.kind == kind
-        )
-        
+    def build(kind, pre_contracted: RevenueTrackingBase, regular: RevenueTrackingBase, index: RevenueTrackingIndex = None):
+        index = RevenueTrackingIndex.of(pre_contracted, regular, index)
+        pre_contracted_fee = RevenueTrackingTable.total(index.pre_contracted.all_projects, 'fee', kind)
+        regular_fee = RevenueTrackingTable.total(index.regular.all_projects, 'fee', kind)
+
         return RevenueTrackingKindSummary(
             name=kind,
             pre_contracted=pre_contracted_fee,
@@ -847,59 +611,36 @@ class RevenueTrackingKindSummary(BaseModel):
         )
 
     @staticmethod
-    def build_list(pre_contracted, regular):
+    def build_list(pre_contracted, regular, index: RevenueTrackingIndex = None):
+        index = RevenueTrackingIndex.of(pre_contracted, regular, index)
         return [
-            RevenueTrackingKindSummary.build(kind, pre_contracted, regular)
+            RevenueTrackingKindSummary.build(kind, pre_contracted, regular, index)
             for kind in PROJECT_KINDS
         ]
-        
+
 class RevenueTrackingConsultantSummary(BaseModel):
     name: str
     slug: str
     consulting_fee: float
     consulting_hours: float
     consulting_pre_hours: float
-    
+
     @staticmethod
-    def build(consultant_name, pre_contracted: RevenueTrackingBase, regular: RevenueTrackingBase):
-        consulting_fee = sum(
-            worker.fee
-            for account_manager in regular.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            for case in sponsor.by_case
-            for project in case.by_project
-            if hasattr(project, 'by_worker') and project.by_worker
-            for worker in project.by_worker
-            if worker.name == consultant_name
-        )
-        
-        consulting_hours = sum(
-            worker.hours
-            for account_manager in regular.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            for case in sponsor.by_case
-            for project in case.by_project
-            if hasattr(project, 'by_worker') and project.by_worker
-            for worker in project.by_worker
-            if worker.name == consultant_name
-        )
-        
-        consulting_pre_hours = sum(
-            worker.hours
-            for account_manager in pre_contracted.monthly.by_account_manager
-            for client in account_manager.by_client
-            for sponsor in client.by_sponsor
-            for case in sponsor.by_case
-            for project in case.by_project
-            if hasattr(project, 'by_worker') and project.by_worker and project.kind == "consulting"
-            for worker in project.by_worker
-            if worker.name == consultant_name
+    def build(consultant_name, pre_contracted: RevenueTrackingBase, regular: RevenueTrackingBase, index: RevenueTrackingIndex = None):
+        index = RevenueTrackingIndex.of(pre_contracted, regular, index)
+        pre = index.pre_contracted.workers.get(consultant_name, [])
+        reg = index.regular.workers.get(consultant_name, [])
+
+        consulting_fee = RevenueTrackingTable.total(reg, 'fee')
+        consulting_hours = RevenueTrackingTable.total(reg, 'hours')
+        # The project is the last parent of a worker
+        consulting_pre_hours = RevenueTrackingTable.total(
+            [entry for entry in pre if entry.parents[-1].kind == "consulting"],
+            'hours'
         )
-        
+
         consultant = globals.omni_models.workers.get_by_name(consultant_name)
-       
+
         return RevenueTrackingConsultantSummary(
             name=consultant_name,
             slug=consultant.slug if consultant else "NA",
@@ -907,32 +648,23 @@ class RevenueTrackingConsultantSummary(BaseModel):
             consulting_hours=consulting_hours,
             consulting_pre_hours=consulting_pre_hours,
         )
-        
+
     @staticmethod
-    def build_list(pre_contracted, regular):
-        consultant_names = set()
-        
-        # Collect consultant names safely checking for by_worker
-        for data in [regular, pre_contracted]:
-            for account_manager in data.monthly.by_account_manager:
-                for client in account_manager.by_client:
-                    for sponsor in client.by_sponsor:
-                        for case in sponsor.by_case:
-                            for project in case.by_project:
-                                if hasattr(project, 'by_worker') and project.by_worker:
-                                    for worker in project.by_worker:
-                                        consultant_names.add(worker.name)
-        
+    def build_list(pre_contracted, regular, index: RevenueTrackingIndex = None):
+        index = RevenueTrackingIndex.of(pre_contracted, regular, index)
+
+        consultant_names = set(index.regular.workers) | set(index.pre_contracted.workers)
+
         return [
-            RevenueTrackingConsultantSummary.build(consultant_name, pre_contracted, regular)
-            for consultant_name in consultant_names
+            RevenueTrackingConsultantSummary.build(consultant_name, pre_contracted, regular, index)
+            for consultant_name in sorted(consultant_names)
         ]
-        
+
 class RevenueTrackingByModeSummary(BaseModel):
     pre_contracted: float
     regular: float
     total: float
-    
+
     @staticmethod
     def build(pre_contracted: RevenueTrackingBase, regular: RevenueTrackingBase):
         return RevenueTrackingByModeSummary(
@@ -940,7 +672,7 @@ class RevenueTrackingByModeSummary(BaseModel):
             regular=regular.monthly.total,
             total=pre_contracted.monthly.total + regular.monthly.total
         )
-    
+
 class RevenueTrackingSummaries(BaseModel):
     by_account_manager: List[RevenueTrackingAccountManagerSummary]
     by_client: List[RevenueTrackingClientSummary]
@@ -949,16 +681,18 @@ class RevenueTrackingSummaries(BaseModel):
     by_consultant: List[RevenueTrackingConsultantSummary]
     by_mode: RevenueTrackingByModeSummary
 
-def compute_summaries(pre_contracted, regular) -> RevenueTrackingSummaries: 
+def compute_summaries(pre_contracted, regular) -> RevenueTrackingSummaries:
 
     by_mode = RevenueTrackingByModeSummary.build(pre_contracted, regular)
-    
+    # Both trees are walked once; every builder reads from the index
+    index = RevenueTrackingIndex(pre_contracted, regular)
+
     return RevenueTrackingSummaries(
-        by_account_manager=RevenueTrackingAccountManagerSummary.build_list(pre_contracted, regular),
-        by_client=RevenueTrackingClientSummary.build_list(pre_contracted, regular),
-        by_sponsor=RevenueTrackingSponsorSummary.build_list(pre_contracted, regular),
-        by_kind=RevenueTrackingKindSummary.build_list(pre_contracted, regular),
-        by_consultant=RevenueTrackingConsultantSummary.build_list(pre_contracted, regular),
+        by_account_manager=RevenueTrackingAccountManagerSummary.build_list(pre_contracted, regular, index),
+        by_client=RevenueTrackingClientSummary.build_list(pre_contracted, regular, index),
+        by_sponsor=RevenueTrackingSponsorSummary.build_list(pre_contracted, regular, index=index),
+        by_kind=RevenueTrackingKindSummary.build_list(pre_contracted, regular, index),
+        by_consultant=RevenueTrackingConsultantSummary.build_list(pre_contracted, regular, index),
         by_mode=by_mode,
     )
     
@@ -973,6 +707,145 @@ class RevenueTracking(BaseModel):
     total: float
     filterable_fields: List[dict]
 
+class ProjectTimesheets:
+    """
+    A timesheet grouped once by project, so the rows of a project are picked
+    by position instead of comparing the whole frame against each id, and
+    the totals of every project, and of every worker within it, come from a
+    single aggregation.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self._projects = df.groupby("ProjectId", sort=False).indices if len(df) > 0 else {}
+        self._project_totals = None
+        self._worker_totals = None
+
+    def __len__(self):
+        return len(self.df)
+
+    def project(self, project_id) -> pd.DataFrame:
+        """The rows of the project, as `df[df["ProjectId"] == project_id]` would select them"""
+        if len(self.df) == 0:
+            return pd.DataFrame()
+        rows = self._projects.get(project_id)
+        if rows is None:
+            return self.df.iloc[0:0]
+        return self.df.iloc[rows]
+
+    def rows(self, project_id) -> np.ndarray:
+        """Positions of the rows of the project"""
+        return self._projects.get(project_id, np.empty(0, dtype=np.intp))
+
+    def _totals(self):
+        columns = [column for column in ("TimeInHs", "Revenue") if column in self.df.columns]
+        self._project_totals = {}
+        self._worker_totals = {}
+        if len(self.df) == 0:
+            return
+
+        by_project = self.df.groupby("ProjectId", sort=False)[columns].sum()
+        for project_id, values in zip(by_project.index, by_project.itertuples(index=False)):
+            self._project_totals[project_id] = dict(zip(columns, values))
+
+        by_worker = self.df.groupby(["ProjectId", "WorkerName"], sort=False)[columns].sum()
+        for (project_id, worker_name), values in zip(by_worker.index, by_worker.itertuples(index=False)):
+            self._worker_totals.setdefault(project_id, {})[worker_name] = dict(zip(columns, values))
+
+    def total(self, project_id, column: str = "TimeInHs") -> float:
+        """Sum of `column` over the rows of the project (0 without rows)"""
+        if self._project_totals is None:
+            self._totals()
+        return self._project_totals.get(project_id, {}).get(column, 0)
+
+    def worker_totals(self, project_id) -> Dict[str, Dict[str, float]]:
+        """Hours (and revenue) of each worker with rows on the project"""
+        if self._worker_totals is None:
+            self._totals()
+        return self._worker_totals.get(project_id, {})
+
+    def values(self, column: str) -> np.ndarray:
+        """The column as floats, missing values as 0 (as sums treat them)"""
+        return self.df[column].to_numpy(dtype=float, na_value=0.0)
+
+    def days(self, first_day) -> np.ndarray:
+        """Days from `first_day` to the date of each row; -1 for rows without a date"""
+        dates = pd.to_datetime(self.df["Date"], errors="coerce").dt.normalize()
+        days = (dates - pd.Timestamp(first_day).normalize()).dt.days
+        return days.to_numpy(dtype=float, na_value=-1).astype(np.int64)
+
+    def first_date(self):
+        """The first known date of the timesheet, or None"""
+        if len(self.df) == 0 or "Date" not in self.df.columns:
+            return None
+        dates = self.df["Date"]
+        dates = dates[dates.notna()]
+        return dates.iloc[0] if len(dates) > 0 else None
+
+
+def _daily_values(timesheet: ProjectTimesheets, projects: List[tuple], first_day, daily: List[RevenueTrackingDaily]):
+    """
+    Adds the hours and revenue of the consulting `projects` ((id, fee) pairs,
+    a project counted as often as it is listed) into the `daily` records, one
+    bincount over the day of each of their rows. Without a revenue column the
+    fee of each project is spread over its rows by their share of its hours.
+    """
+    if len(timesheet) == 0 or "Date" not in timesheet.df.columns or not projects:
+        return
+
+    rows = [timesheet.rows(project_id) for project_id, _ in projects]
+    positions = np.concatenate(rows)
+    if len(positions) == 0:
+        return
+
+    hours = timesheet.values("TimeInHs")[positions]
+    if "Revenue" in timesheet.df.columns:
+        fees = timesheet.values("Revenue")[positions]
+    else:
+        lengths = [len(project_rows) for project_rows in rows]
+        totals = np.array([timesheet.total(project_id) for project_id, _ in projects], dtype=float)
+        project_fees = np.array([fee or 0 for _, fee in projects], dtype=float)
+        weights = np.divide(project_fees, totals, out=np.zeros_like(totals), where=totals > 0)
+        fees = hours * np.repeat(weights, lengths)
+
+    days = timesheet.days(first_day)[positions]
+    inside = (days >= 0) & (days < len(daily))
+    days = days[inside]
+
+    counts = np.bincount(days, minlength=len(daily))
+    hours_by_day = np.bincount(days, weights=hours[inside], minlength=len(daily))
+    fees_by_day = np.bincount(days, weights=fees[inside], minlength=len(daily))
+
+    for day_index in np.flatnonzero(counts):
+        daily[day_index].total_consulting_hours += float(hours_by_day[day_index])
+        daily[day_index].total_consulting_fee += float(fees_by_day[day_index])
+
+
+def _case_hierarchy(active_cases: List[Case]):
+    """
+    Client name and account manager of each active case, looked up once,
+    and the cases of each (client name, sponsor) in their original order.
+    """
+    clients = globals.omni_models.clients
+
+    case_clients = []
+    for case in active_cases:
+        client = clients.get_by_id(case.client_id) if case.client_id else None
+        account_manager_name = client.account_manager.name if client and client.account_manager else None
+        case_clients.append((case, case.find_client_name(clients), account_manager_name))
+
+    client_names_by_account_manager = {}
+    sponsors_by_client = {}
+    cases_by_client_and_sponsor = {}
+    for case, client_name, account_manager_name in case_clients:
+        if account_manager_name is not None:
+            client_names_by_account_manager.setdefault(account_manager_name, set()).add(client_name)
+        sponsors_by_client.setdefault(client_name, set()).add(case.sponsor if case.sponsor else NA_VALUE)
+        cases_by_client_and_sponsor.setdefault((client_name, case.sponsor), []).append(case)
+
+    return client_names_by_account_manager, sponsors_by_client, cases_by_client_and_sponsor
+
+
 def _compute_revenue_tracking_base(df: pd.DataFrame, date_of_interest: date, process_project, account_manager_name_or_slug: str = None):
     first_day_of_month = get_first_day_of_month(date_of_interest)
     last_day_of_month = get_last_day_of_month(date_of_interest)
@@ -985,27 +858,6 @@ def _compute_revenue_tracking_base(df: pd.DataFrame, date_of_interest: date, pro
         ))
         current_day = current_day + timedelta(days=1)
         
-    def update_daily_values(project_df, project_fee, daily_records):
-        if len(project_df) > 0 and "Date" in project_df.columns:
-            daily_data = project_df.groupby("Date").agg({
-                "TimeInHs": "sum",
-                "Revenue": "sum" if "Revenue" in project_df.columns else None
-            }).reset_index()
-            
-            for _, row in daily_data.iterrows():
-                date_value = row["Date"].date() if hasattr(row["Date"], 'date') else row["Date"]
-                first_day = first_day_of_month.date() if hasattr(first_day_of_month, 'date') else first_day_of_month
-                day_index = (date_value - first_day).days
-                if 0 <= day_index < len(daily_records):
-                    daily_records[day_index].total_consulting_hours += row["TimeInHs"]
-                    if "Revenue" in row:
-                        daily_records[day_index].total_consulting_fee += row["Revenue"]
-                    elif project_fee:
-                        # Distribute fixed fee proportionally to hours
-                        total_hours = project_df["TimeInHs"].sum()
-                        if total_hours > 0:
-                            daily_records[day_index].total_consulting_fee += (project_fee * row["TimeInHs"] / total_hours)
-        
     pro_rata_info = RevenueTrackingProRataInfo(by_kind=[])
         
     df = df[df["Kind"] != INTERNAL_KIND] if len(df) > 0 else df
@@ -1016,8 +868,6 @@ def _compute_revenue_tracking_base(df: pd.DataFrame, date_of_interest: date, pro
             df_ = df[df["AccountManagerSlug"] == account_manager_name_or_slug]
         df = df_
         
-    case_ids = sorted(set(df["CaseId"].unique())) if len(df) > 0 else []
-    active_cases = [globals.omni_models.cases.get_by_id(case_id) for case_id in case_ids]
     doi = date_of_interest.date() if hasattr(date_of_interest, 'date') else date_of_interest
     active_cases = [
         case
@@ -1031,63 +881,48 @@ def _compute_revenue_tracking_base(df: pd.DataFrame, date_of_interest: date, pro
         )
     ]
     
-    account_managers = sorted(set(
-        client.account_manager.name
-        for case in active_cases
-        if case.client_id
-        for client in [globals.omni_models.clients.get_by_id(case.client_id)]
-        if client and client.account_manager
-    ))
+    client_names_by_account_manager, sponsors_by_client, cases_by_client_and_sponsor = _case_hierarchy(active_cases)
+    timesheet = ProjectTimesheets(df)
+    # Consulting projects (id, fee) whose rows go into the daily values
+    daily_projects = []
     
     by_account_manager = []
-    for account_manager_name in account_managers:
+    for account_manager_name in sorted(client_names_by_account_manager):
         by_client = []
         
-        client_names = sorted(set(
-            case.find_client_name(globals.omni_models.clients)
-            for case in active_cases
-            if case.client_id
-            and globals.omni_models.clients.get_by_id(case.client_id).account_manager
-            and globals.omni_models.clients.get_by_id(case.client_id).account_manager.name == account_manager_name
-        ))
+        client_names = sorted(client_names_by_account_manager[account_manager_name])
         
         for client_name in client_names:
-            sponsors_names = sorted(set(
-                case.sponsor if case.sponsor else NA_VALUE
-                for case in active_cases
-                if case.find_client_name(globals.omni_models.clients) == client_name
-            ))
+            sponsors_names = sorted(sponsors_by_client[client_name])
             
             by_sponsor = []
             for sponsor_name in sponsors_names:
                 by_case = []
-                for case in active_cases:
-                    if case.find_client_name(globals.omni_models.clients) == client_name and case.sponsor == sponsor_name:
-                        by_project = []
-                        for project in case.tracker_info:
-                            project_data = process_project(date_of_interest, case, project, df, pro_rata_info)
-                            if project_data:
-                                by_project.append(project_data)
-                                if project.kind == "consulting":
-                                    project_df = df[df["ProjectId"] == project.id] if len(df) > 0 else pd.DataFrame()
-                                    update_daily_values(project_df, project_data.fee, daily)
+                for case in cases_by_client_and_sponsor.get((client_name, sponsor_name), []):
+                    by_project = []
+                    for project in case.tracker_info:
+                        project_data = process_project(date_of_interest, case, project, timesheet, pro_rata_info)
+                        if project_data:
+                            by_project.append(project_data)
+                            if project.kind == "consulting":
+                                daily_projects.append((project.id, project_data.fee))
                     
-                        if len(by_project) > 0:
-                            case_ = RevenueTrackingCase(
-                                title=case.title,
-                                slug=case.slug,
-                                fee=sum(project.fee for project in by_project),
-                                consulting_hours=sum(project.hours for project in by_project if project.kind == "consulting"),
-                                consulting_fee=sum(project.fee for project in by_project if project.kind == "consulting"),
-                                consulting_fee_new=sum(project.fee for project in by_project if project.kind == "consulting" and case.start_of_contract and case.start_of_contract.year == date_of_interest.year and case.start_of_contract.month == date_of_interest.month),
-                                consulting_pre_hours=sum(project.hours for project in by_project if project.kind == "consulting" and project.fixed),
-                                consulting_pre_fee=sum(project.fee for project in by_project if project.kind == "consulting" and project.fixed),
-                                hands_on_fee=sum(project.fee for project in by_project if project.kind == "handsOn"),
-                                squad_fee=sum(project.fee for project in by_project if project.kind == "squad"),
-                                by_project=sorted(by_project, key=lambda x: x.name),
-                                partial=any(hasattr(project, 'partial') and project.partial for project in by_project)
-                            )
-                            by_case.append(case_)
+                    if len(by_project) > 0:
+                        case_ = RevenueTrackingCase(
+                            title=case.title,
+                            slug=case.slug,
+                            fee=sum(project.fee for project in by_project),
+                            consulting_hours=sum(project.hours for project in by_project if project.kind == "consulting"),
+                            consulting_fee=sum(project.fee for project in by_project if project.kind == "consulting"),
+                            consulting_fee_new=sum(project.fee for project in by_project if project.kind == "consulting" and case.start_of_contract and case.start_of_contract.year == date_of_interest.year and case.start_of_contract.month == date_of_interest.month),
+                            consulting_pre_hours=sum(project.hours for project in by_project if project.kind == "consulting" and project.fixed),
+                            consulting_pre_fee=sum(project.fee for project in by_project if project.kind == "consulting" and project.fixed),
+                            hands_on_fee=sum(project.fee for project in by_project if project.kind == "handsOn"),
+                            squad_fee=sum(project.fee for project in by_project if project.kind == "squad"),
+                            by_project=sorted(by_project, key=lambda x: x.name),
+                            partial=any(hasattr(project, 'partial') and project.partial for project in by_project)
+                        )
+                        by_case.append(case_)
                 
                 if len(by_case) > 0:
                     sponsor_ = RevenueTrackingSponsor(
@@ -1141,6 +976,8 @@ def _compute_revenue_tracking_base(df: pd.DataFrame, date_of_interest: date, pro
             )
             by_account_manager.append(account_manager_)
             
+    _daily_values(timesheet, daily_projects, first_day_of_month, daily)
+    
     monthly = RevenueTrackingMonthly(
         total=sum(account_manager.fee for account_manager in by_account_manager),
         total_consulting_fee=sum(account_manager.consulting_fee for account_manager in by_account_manager),
@@ -1156,27 +993,28 @@ def _compute_revenue_tracking_base(df: pd.DataFrame, date_of_interest: date, pro
     return RevenueTrackingBase(monthly=monthly, daily=daily), pro_rata_info
 
 def compute_regular_revenue_tracking(df: pd.DataFrame, date_of_interest: date, account_manager_name_or_slug: str = None):
-    def process_project(date_of_interest: date, _, project, timesheet_df, pro_rata_info):
+    def process_project(date_of_interest: date, _, project, timesheet: ProjectTimesheets, pro_rata_info):
         if project.rate and project.rate.rate:
-            project_df = timesheet_df[timesheet_df["ProjectId"] == project.id] if len(timesheet_df) > 0 else pd.DataFrame()
+            project_df = timesheet.project(project.id)
             if len(project_df) > 0:
                 by_worker = []
+                worker_totals = timesheet.worker_totals(project.id)
                 for worker_name in project_df["WorkerName"].unique():
-                    worker_df = project_df[project_df["WorkerName"] == worker_name]
+                    totals = worker_totals.get(worker_name, {})
                     worker = globals.omni_models.workers.get_by_name(worker_name)
                     by_worker.append(RevenueTrackingWorker(
                         name=worker_name,
                         slug=worker.slug if worker else None,
-                        hours=worker_df["TimeInHs"].sum(),
-                        fee=worker_df["Revenue"].sum()
+                        hours=totals.get("TimeInHs", 0),
+                        fee=totals.get("Revenue", 0)
                     ))
                     
                 return RevenueTrackingProject(
                     kind=project.kind,
                     name=project.name,
                     rate=project.rate.rate / 100,
-                    hours=project_df["TimeInHs"].sum(),
-                    fee=project_df["Revenue"].sum(),
+                    hours=timesheet.total(project.id, "TimeInHs"),
+                    fee=timesheet.total(project.id, "Revenue"),
                     fixed=False,
                     by_worker=by_worker
                 )
@@ -1186,8 +1024,8 @@ def compute_regular_revenue_tracking(df: pd.DataFrame, date_of_interest: date, a
     return _compute_revenue_tracking_base(df, date_of_interest, process_project, account_manager_name_or_slug)[0]
 
 def compute_pre_contracted_revenue_tracking(df: pd.DataFrame, date_of_interest: date, account_manager_name_or_slug: str = None):
-    def process_project(date_of_interest: date, case: Case, project, timesheet_df: pd.DataFrame, pro_rata_info):
-        project_df = timesheet_df[timesheet_df["ProjectId"] == project.id] if len(timesheet_df) > 0 else pd.DataFrame()
+    def process_project(date_of_interest: date, case: Case, project, timesheet: ProjectTimesheets, pro_rata_info):
+        project_df = timesheet.project(project.id)
         result = None
         
         created_at = project.created_at.date() if hasattr(project.created_at, 'date') else project.created_at
@@ -1204,10 +1042,10 @@ def compute_pre_contracted_revenue_tracking(df: pd.DataFrame, date_of_interest:
                 if not case.start_of_contract:
                     print(f'--> {project.name} has no start or end of contract')
                 
-                if len(timesheet_df) == 0 or "Date" not in timesheet_df.columns or timesheet_df["Date"].isna().all():
+                d = timesheet.first_date()
+                if d is None:
                     return None
                     
-                d = timesheet_df[timesheet_df["Date"].notna()]["Date"].iloc[0]
                 m = d.month
                 y = d.year
                 
@@ -1243,7 +1081,7 @@ def compute_pre_contracted_revenue_tracking(df: pd.DataFrame, date_of_interest:
                     kind=project.kind,
                     name=project.name,
                     fee=fee,
-                    hours=project_df["TimeInHs"].sum() if len(project_df) > 0 else 0,
+                    hours=timesheet.total(project.id),
                     fixed=True
                 )
             elif case.pre_contracted_value:
@@ -1271,12 +1109,10 @@ def compute_pre_contracted_revenue_tracking(df: pd.DataFrame, date_of_interest:
                     kind=project.kind,
                     name=project.name,
                     fee=fee,
-                    hours=project_df["TimeInHs"].sum() if len(project_df) > 0 else 0,
+                    hours=timesheet.total(project.id),
                     fixed=True
                 )
             else:
-                project_df = timesheet_df[timesheet_df["ProjectId"] == project.id] if len(timesheet_df) > 0 else pd.DataFrame()
-                    
                 partial = False
                 fee = project.billing.fee / 100
                 partial_fee = 0
@@ -1291,7 +1127,10 @@ def compute_pre_contracted_revenue_tracking(df: pd.DataFrame, date_of_interest:
                         client_name = client.name
                         account_manager_name = client.account_manager.name if client.account_manager else "N/A"
                         
-                    workers_hours = project_df.groupby("WorkerName")["TimeInHs"].sum().reset_index() if len(project_df) > 0 else pd.DataFrame()
+                    workers_hours = sorted(
+                        (worker_name, totals["TimeInHs"])
+                        for worker_name, totals in timesheet.worker_totals(project.id).items()
+                    )
                     number_of_workers = len(workers_hours)
                     
                     if project.budget:
@@ -1308,7 +1147,7 @@ def compute_pre_contracted_revenue_tracking(df: pd.DataFrame, date_of_interest:
                         fee_per_worker = fee / number_of_workers
                         hourly_fee = fee_per_worker / 160
                         
-                        for worker_name, hours in workers_hours.values:
+                        for worker_name, hours in workers_hours:
                             if hours < 140:
                                 partial = True
                                 partial_fee += hourly_fee * hours
@@ -1436,21 +1275,21 @@ def compute_pre_contracted_revenue_tracking(df: pd.DataFrame, date_of_interest:
                     kind=project.kind,
                     name=project.name,
                     fee=partial_fee if partial else fee,
-                    hours=project_df["TimeInHs"].sum() if len(project_df) > 0 else 0,
+                    hours=timesheet.total(project.id),
                     partial=partial,
                     fixed=True
                 )
                 
         if result and len(project_df) > 0:
             by_worker = []
+            worker_totals = timesheet.worker_totals(project.id)
             for worker_name in project_df["WorkerName"].unique():
                 worker_name = worker_name if worker_name else "N/A"
-                worker_df = project_df[project_df["WorkerName"] == worker_name]
                 worker = globals.omni_models.workers.get_by_name(worker_name)
                 by_worker.append(RevenueTrackingWorker(
                     name=worker_name,
                     slug=worker.slug if worker else None,
-                    hours=worker_df["TimeInHs"].sum()
+                    hours=worker_totals.get(worker_name, {}).get("TimeInHs", 0)
                 ))
             result.by_worker = by_worker
                 
@@ -1471,15 +1310,18 @@ def compute_revenue_tracking(
     if isinstance(date_of_interest, str):
         date_of_interest = date.fromisoformat(date_of_interest)
     
-    year = date_of_interest.year
-    month = date_of_interest.month
+    if is_closed(date_of_interest.year, date_of_interest.month):
+        return evaluator.tracking(date_of_interest, account_manager_name_or_slug, filters)
     
     s = datetime.combine(date(date_of_interest.year, date_of_interest.month, 1), datetime.min.time())
     e = datetime.combine(date_of_interest, datetime.max.time())
     
     timesheet = globals.omni_datasets.timesheets.get(s, e)
-    df = timesheet.data
     
+    return _compute_revenue_tracking(timesheet.data, date_of_interest, account_manager_name_or_slug, filters)
+
+def _compute_revenue_tracking(df: pd.DataFrame, date_of_interest: date, account_manager_name_or_slug: str = None, filters = None) -> RevenueTracking:
+    """The revenue tracking of `date_of_interest` from the timesheet of its month up to that day"""
     if len(df) != 0:
         df = df[df["Kind"] != "Internal"]
     
@@ -1489,6 +1331,10 @@ def compute_revenue_tracking(
         filters
     )
     
+    return _revenue_tracking_of(df, date_of_interest, account_manager_name_or_slug, result["filterable_fields"])
+
+def _revenue_tracking_of(df: pd.DataFrame, date_of_interest: date, account_manager_name_or_slug, filterable_fields) -> RevenueTracking:
+    """The revenue tracking of `date_of_interest` from the filtered timesheet rows of its month up to that day"""
     pre_contracted_computation = compute_pre_contracted_revenue_tracking(df, date_of_interest, account_manager_name_or_slug)
     pre_contracted = pre_contracted_computation[0]
     pro_rata_info = pre_contracted_computation[1]
@@ -1498,13 +1344,184 @@ def compute_revenue_tracking(
     summaries = compute_summaries(pre_contracted, regular)
     
     return RevenueTracking(
-        year=year,
-        month=month,
+        year=date_of_interest.year,
+        month=date_of_interest.month,
         day=date_of_interest.day,
         pre_contracted=pre_contracted,
         pro_rata_info=pro_rata_info,
         regular=regular,
         summaries=summaries,
         total=summaries.by_mode.pre_contracted + summaries.by_mode.regular,
-        filterable_fields=result["filterable_fields"]
+        filterable_fields=filterable_fields
     )
+
+
+class RevenueTrackingEvaluator:
+    """
+    Evaluates revenue trackings from month snapshots: the timesheet of a
+    month is read once, its billable rows are kept with their filter index,
+    and the tracking of any of its days filters the rows up to that day
+    through that index. Independent trackings run concurrently and
+    results are kept per (day, account manager, filters, snapshot), so
+    overlapping evaluations (e.g. forecasts of nearby days) reuse them.
+    Trackings of closed months are also materialized in a
+    `RevenueSnapshotStore` and read back from it while their data is
+    unchanged; a month stored complete on disk is served from it without
+    loading its timesheet.
+    """
+
+    def __init__(self, max_workers: int = None, store: RevenueSnapshotStore = None):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.store = store or RevenueSnapshotStore()
+        self.max_workers = max_workers or int(os.getenv('REVENUE_TRACKING_WORKERS', '4'))
+        self._versions = weakref.WeakKeyDictionary()
+        self._snapshots = weakref.WeakValueDictionary()
+        self._billable = weakref.WeakKeyDictionary()
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="revenue-tracking")
+
+    @staticmethod
+    def _as_date(value) -> date:
+        if isinstance(value, str):
+            return date.fromisoformat(value)
+        return value.date() if isinstance(value, datetime) else value
+
+    def month(self, date_of_interest: date):
+        """The timesheet of the whole month of `date_of_interest` and its snapshot version"""
+        s = datetime.combine(date(date_of_interest.year, date_of_interest.month, 1), datetime.min.time())
+        e = datetime.combine(
+            date(date_of_interest.year, date_of_interest.month, calendar.monthrange(date_of_interest.year, date_of_interest.month)[1]),
+            datetime.max.time()
+        )
+        timesheet = globals.omni_datasets.timesheets.get(s, e)
+        with self._lock:
+            version = self._versions.get(timesheet)
+            if version is None:
+                version = next(self._counter)
+                self._versions[timesheet] = version
+                self._snapshots[version] = timesheet
+        return timesheet, version
+
+    def month_version(self, date_of_interest: date) -> str:
+        """
+        Version of the timesheet of a closed month: that of its partition
+        when it is stored complete on disk, read without loading the month;
+        otherwise the month is loaded (which may store it) and digested.
+        """
+        timesheets = globals.omni_datasets.timesheets
+        version = timesheets.partition_version(date_of_interest.year, date_of_interest.month)
+        if version is None:
+            timesheet, _ = self.month(date_of_interest)
+            version = (
+                timesheets.partition_version(date_of_interest.year, date_of_interest.month)
+                or self.store.timesheet_version(timesheet)
+            )
+        return version
+
+    def tracking(self, date_of_interest, account_manager_name_or_slug: str = None, filters = None) -> RevenueTracking:
+        date_of_interest = self._as_date(date_of_interest or date.today())
+        if is_closed(date_of_interest.year, date_of_interest.month):
+            version = self.month_version(date_of_interest)
+            return self._snapshot(date_of_interest, account_manager_name_or_slug, filters, version, self.store.models_version())
+
+        timesheet, version = self.month(date_of_interest)
+        return self._tracking(date_of_interest, account_manager_name_or_slug, filters, version, self.store.models_version())
+
+    @cache(max_size=256)
+    def _tracking(self, date_of_interest: date, account_manager_name_or_slug, filters, version: int, models_version: str) -> RevenueTracking:
+        # The snapshot is alive: `month` returned it to the caller
+        timesheet = self._snapshots[version]
+        return self._compute(timesheet, date_of_interest, account_manager_name_or_slug, filters)
+
+    @cache(max_size=256)
+    def _snapshot(self, date_of_interest: date, account_manager_name_or_slug, filters, version: str, models_version: str) -> RevenueTracking:
+        """The tracking of a day of a closed month, read from the store or computed and stored"""
+        key = self.store.key(date_of_interest, account_manager_name_or_slug, filters, version)
+        tracking = self.store.get(date_of_interest, key)
+        if tracking is None:
+            timesheet, _ = self.month(date_of_interest)
+            tracking = self._compute(timesheet, date_of_interest, account_manager_name_or_slug, filters)
+            self.store.put(date_of_interest, key, tracking)
+        return tracking
+
+    def billable(self, timesheet) -> pd.DataFrame:
+        """The rows of a month snapshot revenue trackings read (Internal hours are not billed), kept while it lives"""
+        with self._lock:
+            df = self._billable.get(timesheet)
+        if df is None:
+            df = timesheet.data
+            if len(df) > 0:
+                df = df[df["Kind"] != "Internal"]
+            with self._lock:
+                df = self._billable.setdefault(timesheet, df)
+        return df
+
+    def _compute(self, timesheet, date_of_interest: date, account_manager_name_or_slug, filters) -> RevenueTracking:
+        # The days are cut as a row mask of the month frame, so every day
+        # reuses the filter index of the month instead of indexing its own frame
+        df = self.billable(timesheet)
+        rows = (df["Date"] <= date_of_interest).to_numpy(dtype=bool) if len(df) > 0 else None
+        df, result = globals.omni_datasets.apply_filters(
+            globals.omni_datasets.timesheets,
+            df,
+            filters,
+            rows,
+            ('billable', timesheet.version) if timesheet.version is not None else None
+        )
+        return _revenue_tracking_of(df, date_of_interest, account_manager_name_or_slug, result["filterable_fields"])
+
+    def rebuild(self, after: datetime = None, before: datetime = None) -> int:
+        """
+        Drops the snapshots of the closed months touching [after, before] (all
+        of them by default) and computes their month-end trackings again, from
+        the timesheet fetched anew.
+        """
+        after = self._as_date(after) if after else None
+        before = self._as_date(before) if before else None
+        months = [
+            (year, month)
+            for year, month in self.store.months()
+            if (after is None or (year, month) >= (after.year, after.month))
+            and (before is None or (year, month) <= (before.year, before.month))
+        ]
+        if after is not None and before is not None:
+            year, month = after.year, after.month
+            while (year, month) <= (before.year, before.month):
+                if (year, month) not in months:
+                    months.append((year, month))
+                year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+        timesheets = globals.omni_datasets.timesheets
+        timesheets.invalidate(
+            datetime.combine(after, datetime.min.time()) if after else None,
+            datetime.combine(before, datetime.max.time()) if before else None,
+        )
+        forget(type(timesheets)._read.cache_name)
+
+        self.store.drop(after, before)
+        forget(RevenueTrackingEvaluator._tracking.cache_name)
+        forget(RevenueTrackingEvaluator._snapshot.cache_name)
+
+        rebuilt = self.trackings({
+            f"{year}-{month:02d}": date(year, month, calendar.monthrange(year, month)[1])
+            for year, month in sorted(months)
+            if is_closed(year, month)
+        })
+        return len(rebuilt)
+
+    def trackings(self, dates: Dict[str, date], filters = None) -> Dict[str, RevenueTracking]:
+        """The trackings of several days, keyed as `dates`, computed concurrently"""
+        start_time = datetime.now()
+        futures = {
+            name: self._executor.submit(self.tracking, date_of_interest, filters=filters)
+            for name, date_of_interest in dates.items()
+        }
+        result = {name: future.result() for name, future in futures.items()}
+
+        elapsed_time = datetime.now() - start_time
+        self.logger.info(f"Time to evaluate {len(dates)} revenue trackings: {elapsed_time.total_seconds():.2f} seconds")
+        return result
+
+
+evaluator = RevenueTrackingEvaluator()
@@ -11,14 +11,15 @@ def compute_week_review(date_of_interest, filters=None):
     if isinstance(date_of_interest, str):
         date_of_interest = datetime.strptime(date_of_interest, '%Y-%m-%d')
     
-    df = globals.omni_datasets.timesheets.get_last_six_weeks(date_of_interest).data
+    timesheet = globals.omni_datasets.timesheets.get_last_six_weeks(date_of_interest)
     start, _ = Weeks.get_week_dates(date_of_interest)
 
     # Compose filterable_fields and apply filters
     df, result = globals.omni_datasets.apply_filters(
         globals.omni_datasets.timesheets,
-        df,
-        filters
+        timesheet.data,
+        filters,
+        version=timesheet.version
     )
     
     week_days = ['sunday', 'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday']
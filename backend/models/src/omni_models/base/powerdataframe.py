@@ -8,6 +8,8 @@ class PowerDataFrame:
     def __init__(self, data, source_columns: list[str] = None):
         self.data = PowerDataFrame.__transform_column_names(data)
         self.create_at = datetime.now()
+        # Identifies the rows of `data` when they come from a cache, so their indexes outlive the frame
+        self.version = None
         self.__source_columns = source_columns or ['Id', 'Name', 'Url']
         self.__mergeable_data = None
 
@@ -23,7 +25,9 @@ class PowerDataFrame:
             else:
                 return name[0].upper() + name[1:] if name else name
 
-        df.columns = [transform_name(col) for col in df.columns]
+        names = [transform_name(col) for col in df.columns]
+        if names != list(df.columns):
+            df.columns = names
         return df
 
     def filter_by(self, by,
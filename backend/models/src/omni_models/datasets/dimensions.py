@@ -0,0 +1,38 @@
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class DimensionTable:
+    """
+    Attributes of a dimension (a project, a worker, ...) keyed by a column of a
+    fact frame. `lookup` runs once per distinct key and returns the attributes
+    of that key (missing ones fall back to the defaults in `columns`); the
+    resulting small table is attached to every row by positional `take`, so the
+    join is linear in the number of rows.
+    """
+
+    def __init__(self, key: str, columns: Dict[str, Any], lookup: Callable[[Any], Optional[Dict[str, Any]]]):
+        self.key = key
+        self.columns = columns
+        self.lookup = lookup
+
+    def take(self, df: pd.DataFrame) -> Dict[str, pd.Series]:
+        """One object column per dimension attribute, aligned with the rows of `df`"""
+        codes, uniques = pd.factorize(df[self.key], sort=False)
+        rows = [self.lookup(key) or {} for key in uniques]
+
+        result = {}
+        for column, default in self.columns.items():
+            # The extra slot holds the default for rows whose key is missing (code -1)
+            table = np.empty(len(rows) + 1, dtype=object)
+            for i, row in enumerate(rows):
+                table[i] = row.get(column, default)
+            table[-1] = default
+            result[column] = pd.Series(table.take(codes), index=df.index, dtype=object)
+
+        return result
+
+    def join(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df.assign(**self.take(df))
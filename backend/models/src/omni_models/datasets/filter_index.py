@@ -0,0 +1,100 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class FieldIndex:
+    """
+    Dictionary of the distinct values of one column and the code of each row,
+    from which selections become boolean row bitmaps without comparing the
+    values of the frame again.
+    """
+
+    def __init__(self, values: pd.Series):
+        self.values = values
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        self.codes = codes
+        self.uniques = uniques
+        # Missing values (None, NaN, ...) are told apart from each other, as `isin` does
+        self.missing = np.flatnonzero(codes < 0)
+        self._options: Optional[List[Any]] = None
+
+    def rows(self, selected_values: List[Any]) -> np.ndarray:
+        """Bitmap of the rows whose value is one of `selected_values`"""
+        table = np.zeros(len(self.uniques) + 1, dtype=bool)
+        table[:-1] = pd.Index(self.uniques).isin(selected_values)
+        bitmap = table[self.codes]
+
+        if len(self.missing) > 0 and any(pd.isna(value) for value in selected_values if np.ndim(value) == 0):
+            bitmap[self.missing] |= self.values.iloc[self.missing].isin(selected_values).to_numpy()
+        return bitmap
+
+    def options(self, bitmap: Optional[np.ndarray] = None) -> List[Any]:
+        """Sorted distinct values (None excluded) of the rows set in `bitmap`, all rows by default"""
+        if bitmap is None and self._options is not None:
+            return self._options
+
+        if bitmap is None:
+            present = np.ones(len(self.uniques), dtype=bool)
+            missing = self.missing
+        else:
+            present = np.bincount(self.codes[bitmap] + 1, minlength=len(self.uniques) + 1)[1:] > 0
+            missing = self.missing[bitmap[self.missing]]
+
+        values = np.asarray(self.uniques, dtype=object)[present].tolist()
+        if len(missing) > 0:
+            values += [value for value in self.values.iloc[missing].unique().tolist() if value is not None]
+
+        options = sorted(values)
+        if bitmap is None:
+            self._options = options
+        return options
+
+
+class FilterIndex:
+    """`FieldIndex`es of a frame, built the first time each field is filtered or listed"""
+
+    def __init__(self, df: pd.DataFrame):
+        self.length = len(df)
+        self._df = df
+        self._fields: Dict[str, FieldIndex] = {}
+        self._lock = threading.Lock()
+
+    def field(self, name: str) -> FieldIndex:
+        with self._lock:
+            index = self._fields.get(name)
+            if index is None:
+                index = FieldIndex(self._df[name])
+                self._fields[name] = index
+            return index
+
+
+class FilterIndexes:
+    """
+    The `FilterIndex`es of the most recently filtered frame versions. A
+    version names the rows of a frame (e.g. the cache entries it was read
+    from), so every frame holding the same rows shares one index; frames
+    without a version get an index of their own, for one filtering only.
+    """
+
+    def __init__(self, max_size: int = 32):
+        self.max_size = max_size
+        self._indexes: "OrderedDict[Hashable, FilterIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, df: pd.DataFrame, version: Optional[Hashable] = None) -> FilterIndex:
+        if version is None:
+            return FilterIndex(df)
+
+        with self._lock:
+            index = self._indexes.get(version)
+            if index is None or index.length != len(df):
+                index = FilterIndex(df)
+                self._indexes[version] = index
+            self._indexes.move_to_end(version)
+            while len(self._indexes) > self.max_size:
+                self._indexes.popitem(last=False)
+            return index
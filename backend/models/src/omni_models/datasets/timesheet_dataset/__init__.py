@@ -1,4 +1,5 @@
 from .main import TimesheetDataset
 from .models.memory_cache import TimesheetMemoryCache
+from .models.hydration import TimesheetHydrator, PartitionState
 
-__all__ = ['TimesheetDataset', 'TimesheetMemoryCache'] 
\ No newline at end of file
+__all__ = ['TimesheetDataset', 'TimesheetMemoryCache', 'TimesheetHydrator', 'PartitionState']
\ No newline at end of file
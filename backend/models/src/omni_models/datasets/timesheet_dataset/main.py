@@ -1,13 +1,17 @@
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
 import os
 from pathlib import Path
 
-from omni_utils.decorators.cache import cache
+from omni_utils.decorators.cache import cache, forget
 from omni_models.base.powerdataframe import SummarizablePowerDataFrame
 from omni_models.datasets.omni_dataset import OmniDataset
+from omni_models.datasets.dimensions import DimensionTable
 from omni_utils.helpers.weeks import Weeks
 from omni_utils.helpers.slug import slugify
 from omni_models.omnimodels import OmniModels
@@ -16,12 +20,56 @@ import calendar
 
 from .models.memory_cache import TimesheetMemoryCache
 from .models.disk_cache import TimesheetDiskCache
+from .models.hydration import TimesheetHydrator
+
+PARTITION_MONTHS = ['jan', 'fev', 'mar', 'abr', 'mai', 'jun', 'jul', 'ago', 'set', 'out', 'nov', 'dez']
+
+WORKER_COLUMNS = {
+    'worker_name': None,
+    'worker_slug': None,
+    'worker_omni_url': None,
+    'worker': None,
+}
+
+PROJECT_COLUMNS = {
+    'billing_type': None,
+    'billing_fee': None,
+    'case_id': "N/A",
+    'case_title': "N/A",
+    'case_slug': "N/A",
+    'sponsor': "N/A",
+    'case_omni_url': "N/A",
+    'client_id': "N/A",
+    'client_name': "N/A",
+    'client_slug': "N/A",
+    'client_omni_url': "N/A",
+    'client': "N/A",
+    'account_manager_name': "N/A",
+    'account_manager_slug': "N/A",
+    'sponsor_slug': slugify("N/A"),
+    'products_or_services': "N/A",
+}
+
+# Order in which the enrichment columns are appended to the appointments
+ENRICHED_COLUMNS = [
+    'billing_type', 'billing_fee',
+    'worker_name', 'worker_slug', 'worker_omni_url', 'worker',
+    'case_id', 'case_title', 'case_slug', 'sponsor', 'case_omni_url',
+    'client_id', 'client_name', 'client_slug', 'client_omni_url', 'client',
+    'account_manager_name', 'account_manager_slug',
+    'sponsor_slug', 'products_or_services',
+]
 
 class TimesheetDataset(OmniDataset):
     def __init__(self, models: OmniModels = None):
         self.models = models or OmniModels()
         self.logger = logging.getLogger(self.__class__.__name__)
-        self.memory = TimesheetMemoryCache()
+        max_entries = os.getenv('TIMESHEET_MEMORY_MAX_ENTRIES')
+        budget_mb = os.getenv('TIMESHEET_MEMORY_BUDGET_MB')
+        self.memory = TimesheetMemoryCache(
+            max_entries=int(max_entries) if max_entries else None,
+            max_bytes=int(budget_mb) * 1024 * 1024 if budget_mb else None,
+        )
         
         api_key = os.getenv('EVERHOUR_API_KEY')
         if not api_key:
@@ -29,8 +77,23 @@ class TimesheetDataset(OmniDataset):
             
         cache_dir = Path("ts_2024")
         self.disk = TimesheetDiskCache(cache_dir, api_key)
-        
-        self._ensure_2024()
+        migrated = self.disk.migrate_all()
+        if migrated:
+            self.logger.info(f"Migrated {len(migrated)} legacy timesheet partitions")
+
+        self.fetch_workers = int(os.getenv('TIMESHEET_FETCH_WORKERS', '3'))
+        max_workers = int(os.getenv('TIMESHEET_HYDRATION_WORKERS', '4'))
+        self.hydrator = TimesheetHydrator(self._hydrate_partition, max_workers=max_workers)
+        self._refetch = set()
+        self.sync_interval = int(os.getenv('TIMESHEET_SYNC_INTERVAL', '300'))
+        self._synced_at = {}
+        self._sync_lock = threading.Lock()
+        self._register_2024()
+        self._register_disk_partitions()
+        self._register_current_month()
+
+        if os.getenv('TIMESHEET_PREFETCH', 'true').lower() == 'true':
+            self.hydrator.prefetch()
 
     def get_treemap_path(self):
         return 'TimeInHs', ['Kind', 'ClientName', 'WorkerName']
@@ -38,39 +101,138 @@ class TimesheetDataset(OmniDataset):
     def get_filterable_fields(self):
         return ['Kind', 'AccountManagerName', 'ClientName', 'CaseTitle', 'Sponsor', 'WorkerName', 'ProductsOrServices']
 
-    @cache
     def get(self, after: datetime, before: datetime) -> SummarizablePowerDataFrame:
+        self._sync_open_month(after, before)
+        return self._read(after, before)
+
+    @cache
+    def _read(self, after: datetime, before: datetime) -> SummarizablePowerDataFrame:
+        self.hydrator.ensure(after, before)
+        months = self._months(after, before)
+        self._load_months(months)
+
+        frames = []
+        versions = []
+        for first_day_of_month, last_day_of_month in months:
+            # Whole months are loaded, but only the days of the range are read
+            month_frames, version = self._scan(
+                first_day_of_month, last_day_of_month,
+                max(after, first_day_of_month), min(before, last_day_of_month)
+            )
+            frames.extend(month_frames)
+            versions.append(version)
+
+        result = self._concat(frames)
+        if None not in versions:
+            result.version = tuple(versions)
+        return result
+
+    @staticmethod
+    def _months(after: datetime, before: datetime) -> List[tuple]:
+        """The (first day, last day) of each month the range touches"""
+        months = []
         first_day_of_month = after.replace(day=1)
-        df = pd.DataFrame()
-        
         while first_day_of_month < before:
             last_day_of_month = first_day_of_month.replace(day=calendar.monthrange(first_day_of_month.year, first_day_of_month.month)[1])
-            result = self._get(first_day_of_month, last_day_of_month)
-            df = pd.concat([df, result.data])
-            
+            months.append((first_day_of_month, last_day_of_month))
             first_day_of_month = last_day_of_month + timedelta(days=1)
-        
-        if len(df) > 0:
-            df = df[df['Date'] >= after.date()]
-            df = df[df['Date'] <= before.date()]
-        
-        return SummarizablePowerDataFrame(df)
-        
+        return months
+
+    def _load_months(self, months: List[tuple]):
+        """
+        Loads the months that are not cached yet concurrently, each one added
+        to the memory cache as soon as it is ready. Months that fail are left
+        to `_scan`, which loads them again (and raises) on its own.
+        """
+        cold = [(s, e) for s, e in months if self.memory.missing(s, e)]
+        if len(cold) < 2:
+            return
+
+        start_time = datetime.now()
+        self.logger.info(f"Loading {len(cold)} uncached months with {self.fetch_workers} workers")
+        with ThreadPoolExecutor(max_workers=self.fetch_workers, thread_name_prefix="timesheet-fetch") as executor:
+            futures = {executor.submit(self._fill, s, e): (s, e) for s, e in cold}
+            for future in as_completed(futures):
+                s, e = futures[future]
+                try:
+                    future.result()
+                except Exception as ex:
+                    self.logger.warning(f"Failed to load appointments from {s} to {e}: {ex}")
+
+        elapsed_time = datetime.now() - start_time
+        self.logger.info(f"Time to load {len(cold)} months: {elapsed_time.total_seconds():.2f} seconds")
+
+    @staticmethod
+    def _concat(frames) -> SummarizablePowerDataFrame:
+        frames = [f for f in frames if len(f.columns) > 0]
+        if not frames:
+            return SummarizablePowerDataFrame(pd.DataFrame())
+        return SummarizablePowerDataFrame(frames[0] if len(frames) == 1 else pd.concat(frames))
+
     def _get(self, after: datetime, before: datetime) -> SummarizablePowerDataFrame:
-        result = self.memory.get(after, before)
-        if result:
+        frames, _ = self._scan(after, before, after, before)
+        return self._concat(frames)
+
+    def _scan(self, month_after: datetime, month_before: datetime, after: datetime, before: datetime):
+        """
+        The frames holding the days of [after, before], a range within
+        [month_after, month_before], and the cache version of their rows
+        (None when they could not be served from memory); the uncached days
+        of the latter are loaded into memory first.
+        """
+        scanned = self.memory.scan(after, before)
+        if scanned is not None:
             self.logger.info(f"Getting appointments from cache from {after} to {before}.")
-            return result
-        
+            return scanned
+
+        gaps, fetched = self._fill(month_after, month_before)
+
+        scanned = self.memory.scan(after, before)
+        if scanned is None:
+            # The memory budget could not hold the whole range at once.
+            self.logger.warning(f"Timesheet memory budget is too small for {month_after} to {month_before}")
+            if len(gaps) != 1 or fetched is None:
+                fetched = self._fetch(month_after, month_before)
+            df = fetched.data
+            if len(df) > 0:
+                df = df[(df['Date'] >= after.date()) & (df['Date'] <= before.date())]
+            scanned = [df], None
+
+        return scanned
+
+    def _fill(self, after: datetime, before: datetime):
+        """Loads the uncached days of the range into memory; returns the gaps and the frame of the last one"""
+        gaps = self.memory.missing(after, before)
+        fetched = None
+        for gap_after, gap_before in gaps:
+            fetched = self._load_range(gap_after, gap_before)
+            self.memory.add(gap_after, gap_before, fetched)
+        return gaps, fetched
+
+    def _load_range(self, after: datetime, before: datetime) -> SummarizablePowerDataFrame:
+        partition = self._partition_name(after)
+        if (
+            (after.year, after.month) == (before.year, before.month)
+            and partition not in self._refetch
+            and self._is_complete(partition)
+        ):
+            result = self.disk.load(partition, after=after, before=before)
+            if result is not None:
+                self.logger.info(f"Getting appointments from disk cache from {after} to {before}.")
+                return result
+
+        return self._fetch(after, before)
+
+    def _fetch(self, after: datetime, before: datetime) -> SummarizablePowerDataFrame:
         start_time = datetime.now()
         self.logger.info(f"Getting appointments from {after} to {before}")
-        raw = self.models.tracker.get_appointments(after, before)
+        appointments = self.models.tracker.get_appointments_frame(after, before)
         elapsed_time = datetime.now() - start_time
         self.logger.info(f"Time to get appointments: {elapsed_time.total_seconds():.2f} seconds")
-        
-        data = [ap.to_dict() for ap in raw]
-        df = pd.DataFrame(data)
-    
+
+        return self._enrich(appointments)
+
+    def _enrich(self, df: pd.DataFrame) -> SummarizablePowerDataFrame:
         start_time = datetime.now()
         self.logger.info(f"Enriching timesheet data")
         
@@ -78,56 +240,6 @@ class TimesheetDataset(OmniDataset):
         if df.empty:
             return SummarizablePowerDataFrame(pd.DataFrame())
 
-        # Create caches
-        workers_cache = {}
-        cases_cache = {}
-        clients_cache = {}
-        offers_cache = {}
-        eh_projects_cache = self.models.tracker.all_projects
-
-        # Pre-fetch all needed data
-        unique_user_ids = df['user_id'].unique()
-        unique_project_ids = df['project_id'].unique()
-        
-        # Bulk load workers
-        for user_id in unique_user_ids:
-            workers_cache[user_id] = self.models.workers.get_by_everhour_id(user_id)
-        
-        # Bulk load cases
-        for project_id in unique_project_ids:
-            cases_cache[project_id] = self.models.cases.get_by_everhour_project_id(project_id)
-        
-        # Bulk load clients and offers
-        unique_client_ids = set()
-        unique_offer_ids = set()
-        for case in cases_cache.values():
-            if case:
-                if case.client_id:
-                    unique_client_ids.add(case.client_id)
-                if hasattr(case, 'offers_ids'):
-                    unique_offer_ids.update(case.offers_ids)
-        
-        for client_id in unique_client_ids:
-            clients_cache[client_id] = self.models.clients.get_by_id(client_id)
-        
-        for offer_id in unique_offer_ids:
-            offer = self.models.products_or_services.get_by_id(offer_id)
-            offers_cache[offer_id] = offer.name if offer else None
-
-        # Optimize by pre-allocating arrays for better memory usage
-        n_rows = len(df)
-        
-        # Create typed arrays for better performance
-        client_data = {
-            'client_id': np.full(n_rows, "N/A", dtype=object),
-            'client_name': np.full(n_rows, "N/A", dtype=object),
-            'client_slug': np.full(n_rows, "N/A", dtype=object),
-            'client_omni_url': np.full(n_rows, "N/A", dtype=object),
-            'client': np.full(n_rows, "N/A", dtype=object),
-            'account_manager_name': np.full(n_rows, "N/A", dtype=object),
-            'account_manager_slug': np.full(n_rows, "N/A", dtype=object)
-        }
-
         # Optimize date operations using pandas
         date_series = pd.to_datetime(df['date'])
         df = df.assign(
@@ -139,105 +251,83 @@ class TimesheetDataset(OmniDataset):
             year_month=date_series.dt.strftime('%Y-%m')
         )
 
-        # Create numpy arrays for project and user IDs for faster lookups
-        project_ids = df['project_id'].values
-        user_ids = df['user_id'].values
+        # Project and worker attributes are computed once per distinct id and joined to the rows
+        columns = {
+            **self._project_dimension().take(df),
+            **self._worker_dimension().take(df),
+        }
+        df = df.assign(**{column: columns[column] for column in ENRICHED_COLUMNS})
 
-        # Vectorized billing information using numpy masks
-        billing_type = np.full(n_rows, None, dtype=object)
-        billing_fee = np.full(n_rows, None, dtype=object)
+        elapsed_time = datetime.now() - start_time
+        self.logger.info(f"Time to enrich timesheet data: {elapsed_time.total_seconds():.2f} seconds")
         
-        for pid in np.unique(project_ids):
-            mask = project_ids == pid
-            project = eh_projects_cache.get(pid)
+        return SummarizablePowerDataFrame(df)
+    
+    def _worker_dimension(self) -> DimensionTable:
+        def lookup(user_id):
+            worker = self.models.workers.get_by_everhour_id(user_id)
+            if not worker:
+                return None
+
+            row = {
+                'worker_name': worker.name,
+                'worker_slug': worker.slug,
+                'worker_omni_url': worker.omni_url,
+            }
+            if worker.name is not None and worker.omni_url is not None:
+                row['worker'] = f'<a href="{worker.omni_url}">{worker.name}</a>'
+            return row
+
+        return DimensionTable('user_id', WORKER_COLUMNS, lookup)
+
+    def _project_dimension(self) -> DimensionTable:
+        eh_projects = self.models.tracker.all_projects
+        offers_cache = {}
+
+        def offer_name(offer_id):
+            if offer_id not in offers_cache:
+                offer = self.models.products_or_services.get_by_id(offer_id)
+                offers_cache[offer_id] = offer.name if offer else None
+            return offers_cache[offer_id]
+
+        def lookup(project_id):
+            row = {}
+
+            project = eh_projects.get(project_id)
             if project and project.billing:
-                billing_type[mask] = project.billing.type
-                billing_fee[mask] = project.billing.fee
-        
-        df['billing_type'] = billing_type
-        df['billing_fee'] = billing_fee
+                row['billing_type'] = project.billing.type
+                row['billing_fee'] = project.billing.fee
 
-        # Vectorized worker information
-        worker_data = {field: np.full(n_rows, None, dtype=object) for field in ['worker_name', 'worker_slug', 'worker_omni_url']}
-        
-        for uid in np.unique(user_ids):
-            mask = user_ids == uid
-            worker = workers_cache.get(uid)
-            if worker:
-                worker_data['worker_name'][mask] = worker.name
-                worker_data['worker_slug'][mask] = worker.slug
-                worker_data['worker_omni_url'][mask] = worker.omni_url
-        
-        df = df.assign(**worker_data)
-        
-        # Create worker links using pandas operations instead of numpy char operations
-        valid_worker_mask = df['worker_name'].notna() & df['worker_omni_url'].notna()
-        df['worker'] = None
-        df.loc[valid_worker_mask, 'worker'] = (
-            '<a href="' + 
-            df.loc[valid_worker_mask, 'worker_omni_url'] + 
-            '">' + 
-            df.loc[valid_worker_mask, 'worker_name'] + 
-            '</a>'
-        )
+            case = self.models.cases.get_by_everhour_project_id(project_id)
+            if not case:
+                return row
 
-        # Vectorized case information using numpy operations
-        case_data = {
-            'case_id': np.full(n_rows, "N/A", dtype=object),
-            'case_title': np.full(n_rows, "N/A", dtype=object),
-            'case_slug': np.full(n_rows, "N/A", dtype=object),
-            'sponsor': np.full(n_rows, "N/A", dtype=object),
-            'case_omni_url': np.full(n_rows, "N/A", dtype=object)
-        }
-        
-        for pid in np.unique(project_ids):
-            mask = project_ids == pid
-            case = cases_cache.get(pid)
-            if case:
-                case_data['case_id'][mask] = case.id
-                case_data['case_title'][mask] = case.title
-                case_data['case_slug'][mask] = case.slug
-                case_data['sponsor'][mask] = case.sponsor or "N/A"
-                case_data['case_omni_url'][mask] = case.omni_url
-                
-                # Update client data in the same loop to avoid multiple iterations
-                if case.client_id:
-                    client = clients_cache.get(case.client_id)
-                    if client:
-                        client_data['client_id'][mask] = client.id
-                        client_data['client_name'][mask] = client.name
-                        client_data['client_slug'][mask] = client.slug
-                        client_data['client_omni_url'][mask] = client.omni_url
-                        client_data['client'][mask] = f"<a href='{client.omni_url}'>{client.name}</a>"
-                        if client.account_manager:
-                            client_data['account_manager_name'][mask] = client.account_manager.name
-                            client_data['account_manager_slug'][mask] = client.account_manager.slug
-        
-        df = df.assign(**case_data)
-        df = df.assign(**client_data)
-        
-        # Optimize sponsor_slug creation using numpy
-        df['sponsor_slug'] = np.vectorize(slugify)(df['sponsor'].values)
-
-        # Optimize products_or_services using numpy operations
-        products = np.full(n_rows, "N/A", dtype=object)
-        for pid in np.unique(project_ids):
-            mask = project_ids == pid
-            case = cases_cache.get(pid)
-            if case and hasattr(case, 'offers_ids'):
-                products[mask] = ';'.join(filter(None, [offers_cache.get(oid) for oid in case.offers_ids]))
-        
-        df['products_or_services'] = products
+            row['case_id'] = case.id
+            row['case_title'] = case.title
+            row['case_slug'] = case.slug
+            row['sponsor'] = case.sponsor or "N/A"
+            row['sponsor_slug'] = slugify(row['sponsor'])
+            row['case_omni_url'] = case.omni_url
 
-        elapsed_time = datetime.now() - start_time
-        self.logger.info(f"Time to enrich timesheet data: {elapsed_time.total_seconds():.2f} seconds")
-        
-        result = SummarizablePowerDataFrame(df)
-        
-        self.memory.add(after, before, result)
+            if case.client_id:
+                client = self.models.clients.get_by_id(case.client_id)
+                if client:
+                    row['client_id'] = client.id
+                    row['client_name'] = client.name
+                    row['client_slug'] = client.slug
+                    row['client_omni_url'] = client.omni_url
+                    row['client'] = f"<a href='{client.omni_url}'>{client.name}</a>"
+                    if client.account_manager:
+                        row['account_manager_name'] = client.account_manager.name
+                        row['account_manager_slug'] = client.account_manager.slug
+
+            if hasattr(case, 'offers_ids'):
+                row['products_or_services'] = ';'.join(filter(None, [offer_name(oid) for oid in case.offers_ids]))
+
+            return row
+
+        return DimensionTable('project_id', PROJECT_COLUMNS, lookup)
 
-        return result
-    
     def get_common_fields(self):
         return ['Kind', 'ClientName', 'Sponsor', 'WorkerName', 'TimeInHs', 'Date', 'Week', 'IsLte']
 
@@ -296,35 +386,182 @@ class TimesheetDataset(OmniDataset):
 
         return data 
     
-    def _ensure_2024(self):
-        """Ensures all 2024 timesheet data is cached to disk."""
-        months = {
-            'jan': '01', 'fev': '02', 'mar': '03', 'abr': '04',
-            'mai': '05', 'jun': '06', 'jul': '07', 'ago': '08',
-            'set': '09', 'out': '10', 'nov': '11', 'dez': '12'
-        }
-        
-        self.logger.info("Ensuring 2024 timesheet data is cached...")
-        
-        for month_name, month_num in months.items():
-            filename = f"{month_name}_2024"
-            s = datetime(2024, int(month_num), 1, 0, 0, 0)
-            e = datetime(2024, int(month_num), calendar.monthrange(2024, int(month_num))[1], 23, 59, 59)
-            
-            # Check if month data is already cached
-            cached_data = self.disk.load(filename)
-            if cached_data is not None:
-                self.memory.add(s, e, cached_data)
-                self.logger.info(f"Month {month_name}_2024 already cached")
-                continue
-                
-            # If not cached, fetch from API
-            self.logger.info(f"Fetching {month_name}_2024 from API...")
-            dataset = self.get(s, e)
-            
-            if dataset is not None:
-                self.logger.info(f"Saving {month_name}_2024 to disk cache...")
-                self.disk.save(dataset, filename)
-                self.memory.add(s, e, dataset)
-            else:
-                self.logger.warning(f"No data available for {month_name}_2024")
\ No newline at end of file
+    @staticmethod
+    def _partition_name(reference: datetime) -> str:
+        return f"{PARTITION_MONTHS[reference.month - 1]}_{reference.year}"
+
+    def _register_2024(self):
+        """Registers the 2024 months as partitions persisted to the disk cache."""
+        for month_num, month_name in enumerate(PARTITION_MONTHS, start=1):
+            s = datetime(2024, month_num, 1, 0, 0, 0)
+            e = datetime(2024, month_num, calendar.monthrange(2024, month_num)[1], 23, 59, 59)
+            self.hydrator.register(f"{month_name}_2024", s, e)
+
+    @staticmethod
+    def _partition_range(filename: str):
+        """The first and last moment of the month of a partition name, or None when it is not one"""
+        month_name, _, year = filename.partition('_')
+        if month_name not in PARTITION_MONTHS or not year.isdigit():
+            return None
+        year, month_num = int(year), PARTITION_MONTHS.index(month_name) + 1
+        s = datetime(year, month_num, 1, 0, 0, 0)
+        e = datetime(year, month_num, calendar.monthrange(year, month_num)[1], 23, 59, 59)
+        return s, e
+
+    def _is_complete(self, filename: str) -> bool:
+        """
+        Whether the partition on disk was written after its month closed. One
+        saved while the month was open misses what was logged afterwards, so
+        it is synced once more before being trusted.
+        """
+        month = self._partition_range(filename)
+        saved_at = self.disk.saved_at(filename)
+        return month is not None and saved_at is not None and saved_at > month[1]
+
+    def partition_version(self, year: int, month: int) -> Optional[str]:
+        """
+        Version of a month whose partition is stored complete on disk (when
+        it was saved), known without reading it; None for any other month,
+        or one waiting to be fetched again.
+        """
+        filename = self._partition_name(datetime(year, month, 1))
+        if filename in self._refetch or not self._is_complete(filename):
+            return None
+        saved_at = self.disk.saved_at(filename)
+        return saved_at.isoformat() if saved_at else None
+
+    def _register_disk_partitions(self):
+        """Registers every month partition found on disk, so it is hydrated (and synced) like the others."""
+        for filename in self.disk.partitions():
+            month = self._partition_range(filename)
+            if month is not None:
+                self.hydrator.register(filename, *month)
+
+    def _register_current_month(self):
+        """Registers the open month, kept on disk and brought up to date incrementally."""
+        now = datetime.now()
+        s = datetime(now.year, now.month, 1, 0, 0, 0)
+        e = datetime(now.year, now.month, calendar.monthrange(now.year, now.month)[1], 23, 59, 59)
+        self.hydrator.register(self._partition_name(now), s, e)
+
+    def sync(self, filename: str, after: datetime, before: datetime, cached: SummarizablePowerDataFrame = None) -> SummarizablePowerDataFrame:
+        """
+        Brings a month partition stored on disk up to date with the
+        appointments created since its high-water mark (the latest CreatedAt
+        it holds); only those are enriched and merged into the partition by
+        Id. Appointments edited or deleted in Everhour are picked up when the
+        month is fetched again by `invalidate`. `cached`, the partition when
+        already read, is returned as is when nothing new was logged.
+        """
+        if cached is None:
+            cached = self.disk.load(filename)
+        high_water_mark = self.disk.high_water_mark(filename)
+        if cached is None or len(cached.data) == 0 or 'Id' not in cached.data.columns or high_water_mark is None:
+            return self._fetch(after, before)
+
+        start_time = datetime.now()
+        created = self.models.tracker.get_appointments_frame(after, before, created_after=high_water_mark)
+
+        df = cached.data
+        # Appointments logged in the second of the mark may be there already
+        new = created[~created['id'].isin(df['Id'])] if not created.empty else created
+        self.logger.info(f"Syncing {filename} (high-water mark {high_water_mark}): {len(new)} new appointments")
+        if new.empty:
+            return cached
+
+        merged = pd.concat([df, self._enrich(new).data], ignore_index=True).sort_values('Date', kind='stable')
+
+        elapsed_time = datetime.now() - start_time
+        self.logger.info(f"Time to sync {filename}: {elapsed_time.total_seconds():.2f} seconds")
+        return SummarizablePowerDataFrame(merged)
+
+    def _sync_open_month(self, after: datetime, before: datetime):
+        """
+        Syncs the open month, when the range reads it, at most once every
+        `sync_interval` seconds; the ranges read before are dropped when it
+        brought new appointments.
+        """
+        now = datetime.now()
+        filename = self._partition_name(now)
+        month = self._partition_range(filename)
+        if after > month[1] or before < month[0] or not self.hydrator.is_warm(filename):
+            # A cold month is synced when it is hydrated
+            return
+
+        with self._sync_lock:
+            synced_at = self._synced_at.get(filename)
+            if synced_at is not None and (now - synced_at).total_seconds() < self.sync_interval:
+                return
+            self._synced_at[filename] = now
+
+            cached = self.disk.load(filename)
+            dataset = self.sync(filename, *month, cached)
+            if dataset is cached:
+                return
+            self._store_partition(filename, *month, dataset)
+            forget(TimesheetDataset._read.cache_name)
+
+    def list_partitions(self) -> List[dict]:
+        """The hydration state of each partition with the memory its month takes in the cache"""
+        usage = self.memory.usage()
+        result = []
+        for partition in self.hydrator.list_partitions():
+            month = usage.get((partition['after'].year, partition['after'].month), {})
+            result.append({
+                **partition,
+                'memory_bytes': month.get('bytes'),
+                'memory_raw_bytes': month.get('raw_bytes'),
+            })
+        return result
+
+    def invalidate(self, after: datetime = None, before: datetime = None):
+        """Drops the cached range; the months it touches are fully fetched again."""
+        self.memory.invalidate(after, before)
+        # Partitions written to disk after startup are registered, so they are refetched too
+        self._register_disk_partitions()
+        for partition in self.hydrator.list_partitions():
+            if (after is None or partition['before'] >= after) and (before is None or partition['after'] <= before):
+                self._refetch.add(partition['key'])
+        self.hydrator.invalidate(after, before)
+
+    def _hydrate_partition(self, filename: str, s: datetime, e: datetime):
+        """Loads a month partition from the disk cache, fetching and saving it when missing."""
+        if filename in self._refetch:
+            # Taken before fetching, so an invalidate arriving meanwhile asks for another fetch
+            self._refetch.discard(filename)
+            self.logger.info(f"Fetching {filename} from API...")
+            try:
+                dataset = self._fetch(s, e)
+            except Exception:
+                self._refetch.add(filename)
+                raise
+            self._store_partition(filename, s, e, dataset)
+            return
+
+        if self.disk.exists(filename) and not self._is_complete(filename):
+            # The open month, or a month saved before it closed
+            self._synced_at[filename] = datetime.now()
+            dataset = self.sync(filename, s, e)
+            self._store_partition(filename, s, e, dataset)
+            return
+
+        cached_data = self.disk.load(filename)
+        if cached_data is not None:
+            self.memory.add(s, e, cached_data)
+            self.logger.info(f"Month {filename} loaded from disk cache")
+            return
+
+        self.logger.info(f"Fetching {filename} from API...")
+        dataset = self._get(s, e)
+        self._store_partition(filename, s, e, dataset, in_memory=False)
+
+    def _store_partition(self, filename: str, s: datetime, e: datetime, dataset: SummarizablePowerDataFrame, in_memory: bool = True):
+        if in_memory:
+            self.memory.invalidate(s, e)
+            self.memory.add(s, e, dataset)
+
+        if dataset is not None and len(dataset.data) > 0:
+            self.logger.info(f"Saving {filename} to disk cache...")
+            self.disk.save(dataset, filename)
+        else:
+            self.logger.warning(f"No data available for {filename}")
@@ -1,17 +1,76 @@
+import os
 import pickle
 import base64
+import logging
+from datetime import datetime
 from pathlib import Path
+from typing import Callable, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pyarrow.parquet.encryption as pqe
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
+from omni_models.base.powerdataframe import SummarizablePowerDataFrame
+
+# Partitions are read whole or by day range, skipping row groups by Date
+STATISTICS_COLUMNS = ('Date',)
+
+# Columns holding both ints and strings (e.g. ClientId is "N/A" when unknown)
+# are stored as strings tagged with the type of each value ("i:42", "s:N/A");
+# the schema metadata lists them.
+MIXED_COLUMNS_METADATA_KEY = b'omni.mixed_columns'
+INT_TAG = 'i:'
+STR_TAG = 's:'
+
+# Partitions written in an older layout are not read; they are fetched again
+FORMAT_METADATA_KEY = b'omni.format'
+FORMAT = b'2'
+
+# Latest CreatedAt of the partition, used by the incremental sync
+HIGH_WATER_MARK_METADATA_KEY = b'omni.high_water_mark'
+
+ROW_GROUP_SIZE = 2048
+
+
+class _PartitionKmsClient(pqe.KmsClient):
+    """Wraps the data keys of a partition with the key derived for that partition"""
+
+    def __init__(self, file_key: Callable[[str], Fernet]):
+        pqe.KmsClient.__init__(self)
+        self.file_key = file_key
+
+    def wrap_key(self, key_bytes, master_key_identifier):
+        return self.file_key(master_key_identifier).encrypt(key_bytes).decode()
+
+    def unwrap_key(self, wrapped_key, master_key_identifier):
+        return self.file_key(master_key_identifier).decrypt(wrapped_key.encode())
+
+
 class TimesheetDiskCache:
-    def __init__(self, cache_dir: str, api_key: str):
+    """
+    Month partitions of the enriched timesheet, stored as zstd-compressed
+    Parquet files sorted by Date. Each file may be encrypted with Parquet
+    modular encryption under its own key, derived from the Everhour API key
+    and the partition name. Footer and column chunks are encrypted
+    separately, so reads of a day range still skip the row groups outside it.
+    """
+
+    def __init__(self, cache_dir: str, api_key: str, encrypt: bool = True):
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        self.fernet = self._get_encryption_key(api_key)
+        self.encrypt = encrypt
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.master_key = self._get_master_key(api_key)
+        self._crypto = pqe.CryptoFactory(lambda _: _PartitionKmsClient(self._get_file_key))
+        self._kms = pqe.KmsConnectionConfig()
 
-    def _get_encryption_key(self, api_key: str) -> Fernet:
+    @staticmethod
+    def _get_master_key(api_key: str) -> bytes:
         salt = b'omni_salt'
         kdf = PBKDF2HMAC(
             algorithm=hashes.SHA256(),
@@ -19,37 +78,267 @@ class TimesheetDiskCache:
             salt=salt,
             iterations=100000,
         )
-        key = base64.urlsafe_b64encode(kdf.derive(api_key.encode()))
+        return kdf.derive(api_key.encode())
+
+    def _get_file_key(self, filename: str) -> Fernet:
+        hkdf = HKDF(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=None,
+            info=f'timesheet:{filename}'.encode(),
+        )
+        key = base64.urlsafe_b64encode(hkdf.derive(self.master_key))
         return Fernet(key)
 
-    def save(self, dataset, filename: str) -> None:
-        """Save an encrypted timesheet dataset to file"""
+    def _encryption_properties(self, filename: str):
+        return self._crypto.file_encryption_properties(
+            self._kms,
+            pqe.EncryptionConfiguration(footer_key=filename, uniform_encryption=True),
+        )
+
+    def _decryption_properties(self):
+        return self._crypto.file_decryption_properties(self._kms, pqe.DecryptionConfiguration())
+
+    def _legacy_fernet(self) -> Fernet:
+        return Fernet(base64.urlsafe_b64encode(self.master_key))
+
+    def _path(self, filename: str, encrypted: bool) -> Path:
+        suffix = '.parquet.enc' if encrypted else '.parquet'
+        return self.cache_dir / f"{filename}{suffix}"
+
+    def _legacy_path(self, filename: str) -> Path:
+        return self.cache_dir / f"{filename}.timesheet"
+
+    def exists(self, filename: str) -> bool:
+        return (
+            self._path(filename, True).is_file()
+            or self._path(filename, False).is_file()
+            or self._legacy_path(filename).is_file()
+        )
+
+    def _existing_path(self, filename: str) -> Optional[Path]:
+        for path in (self._path(filename, True), self._path(filename, False), self._legacy_path(filename)):
+            if path.is_file():
+                return path
+        return None
+
+    def saved_at(self, filename: str) -> Optional[datetime]:
+        """When a month partition was last written, or None when it is not on disk"""
+        path = self._existing_path(filename)
+        if path is None:
+            return None
+        return datetime.fromtimestamp(path.stat().st_mtime)
+
+    def partitions(self) -> List[str]:
+        """Names of the month partitions on disk, in any of the stored formats"""
+        names = set()
+        for suffix in ('.parquet.enc', '.parquet', '.timesheet'):
+            for path in self.cache_dir.glob(f'*{suffix}'):
+                names.add(path.name[:-len(suffix)])
+        return sorted(names)
+
+    @staticmethod
+    def _tag(value) -> Optional[str]:
+        if value is None or (pd.api.types.is_scalar(value) and pd.isna(value)):
+            return None
+        if type(value) is int:
+            return f"{INT_TAG}{value}"
+        return f"{STR_TAG}{value}"
+
+    @staticmethod
+    def _untag(value):
+        if not isinstance(value, str):
+            # Only missing values are stored untagged
+            return None
+        if value.startswith(INT_TAG):
+            return int(value[len(INT_TAG):])
+        return value[len(STR_TAG):]
+
+    @staticmethod
+    def _to_table(df: pd.DataFrame) -> pa.Table:
+        df = df.copy()
+        mixed_columns = []
+
+        for column in df.columns:
+            if df[column].dtype != object:
+                continue
+            types = {type(v) for v in df[column].dropna()}
+            if int in types and str in types:
+                df[column] = df[column].map(TimesheetDiskCache._tag)
+                mixed_columns.append(column)
+
+        if 'Date' in df.columns:
+            df = df.sort_values('Date', kind='stable')
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[FORMAT_METADATA_KEY] = FORMAT
+        metadata[MIXED_COLUMNS_METADATA_KEY] = ','.join(mixed_columns).encode()
+        if 'CreatedAt' in df.columns and len(df) > 0:
+            metadata[HIGH_WATER_MARK_METADATA_KEY] = pd.Timestamp(df['CreatedAt'].max()).isoformat().encode()
+        return table.replace_schema_metadata(metadata)
+
+    @staticmethod
+    def _restore_mixed_columns(df: pd.DataFrame, schema: pa.Schema) -> pd.DataFrame:
+        raw = (schema.metadata or {}).get(MIXED_COLUMNS_METADATA_KEY, b'')
+        mixed_columns = [c for c in raw.decode().split(',') if c and c in df.columns]
+
+        for column in mixed_columns:
+            df[column] = pd.Series(
+                [TimesheetDiskCache._untag(value) for value in df[column]],
+                index=df.index,
+                dtype=object,
+            )
+        return df
+
+    @staticmethod
+    def _restore_object_columns(df: pd.DataFrame, schema: pa.Schema) -> pd.DataFrame:
+        """Object columns come back as strings with NaN for missing values; they are objects with None again"""
+        pandas_columns = (schema.pandas_metadata or {}).get('columns', [])
+        object_columns = [
+            c['name'] for c in pandas_columns
+            if c.get('numpy_type') == 'object' and c['name'] in df.columns and df[c['name']].dtype != object
+        ]
+
+        for column in object_columns:
+            values = df[column].astype(object)
+            df[column] = values.where(values.notna(), None)
+        return df
+
+    def save(self, dataset: SummarizablePowerDataFrame, filename: str) -> None:
+        """Save a month partition of the timesheet dataset"""
         if dataset is None:
             return
 
-        filepath = self.cache_dir / f"{filename}.timesheet"
-        
-        # Serialize and encrypt the dataset
-        serialized = pickle.dumps(dataset)
-        encrypted = self.fernet.encrypt(serialized)
-        
-        # Save to file
-        with open(filepath, "wb") as file:
-            file.write(encrypted)
-
-    def load(self, filename: str):
-        """Load an encrypted timesheet dataset from file"""
+        table = self._to_table(dataset.data)
+
+        filepath = self._path(filename, self.encrypt)
+        tmp_path = filepath.with_suffix(filepath.suffix + '.tmp')
         try:
-            filepath = self.cache_dir / f"{filename}.timesheet"
-            
-            # Read encrypted data
-            with open(filepath, "rb") as file:
-                encrypted = file.read()
-                
-            # Decrypt and deserialize
-            decrypted = self.fernet.decrypt(encrypted)
-            return pickle.loads(decrypted)
-        except:
+            pq.write_table(
+                table,
+                tmp_path,
+                compression='zstd',
+                row_group_size=ROW_GROUP_SIZE,
+                write_statistics=list(c for c in STATISTICS_COLUMNS if c in table.column_names),
+                encryption_properties=self._encryption_properties(filename) if self.encrypt else None,
+            )
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            if tmp_path.exists():
+                tmp_path.unlink()
+            raise
+
+        # The other layout of the partition, if any, is now stale
+        other_path = self._path(filename, not self.encrypt)
+        if other_path.is_file():
+            other_path.unlink()
+
+    def _open(self, filename: str):
+        """The path and decryption properties of a partition in the current layout, or None"""
+        encrypted_path = self._path(filename, True)
+        if encrypted_path.is_file():
+            with open(encrypted_path, "rb") as file:
+                # Files encrypted as a whole (the previous layout) are not Parquet
+                if file.read(4) != b'PARE':
+                    return None
+            return str(encrypted_path), self._decryption_properties()
+
+        plain_path = self._path(filename, False)
+        if plain_path.is_file():
+            return str(plain_path), None
+
+        return None
+
+    def _read_schema(self, filename: str) -> Optional[pa.Schema]:
+        source = self._open(filename)
+        if source is None:
+            return None
+        path, decryption_properties = source
+        schema = pq.read_schema(path, decryption_properties=decryption_properties)
+        if (schema.metadata or {}).get(FORMAT_METADATA_KEY) != FORMAT:
+            return None
+        return schema
+
+    def high_water_mark(self, filename: str) -> Optional[datetime]:
+        """Latest CreatedAt stored in a month partition"""
+        try:
+            schema = self._read_schema(filename)
+            if schema is None:
+                return None
+            raw = (schema.metadata or {}).get(HIGH_WATER_MARK_METADATA_KEY)
+        except Exception as ex:
+            self.logger.warning(f"Unable to read the high-water mark of {filename}: {ex}")
+            return None
+
+        return datetime.fromisoformat(raw.decode()) if raw else None
+
+    def load(self,
+             filename: str,
+             after: Optional[datetime] = None,
+             before: Optional[datetime] = None
+             ) -> Optional[SummarizablePowerDataFrame]:
+        """Load a month partition, reading only the row groups that may hold the Date range"""
+        if not self._path(filename, True).is_file() and not self._path(filename, False).is_file():
+            if not self.migrate_legacy(filename):
+                return None
+
+        try:
+            schema = self._read_schema(filename)
+            if schema is None:
+                self.logger.info(f"{filename} is not stored in the current layout")
+                return None
+            path, decryption_properties = self._open(filename)
+
+            predicates = []
+            if after is not None:
+                predicates.append(('Date', '>=', after.date() if isinstance(after, datetime) else after))
+            if before is not None:
+                predicates.append(('Date', '<=', before.date() if isinstance(before, datetime) else before))
+
+            table = pq.read_table(
+                path,
+                filters=predicates or None,
+                decryption_properties=decryption_properties,
+            )
+            df = table.to_pandas(date_as_object=True)
+            df = self._restore_mixed_columns(df, schema)
+            df = self._restore_object_columns(df, schema)
+            return SummarizablePowerDataFrame(df)
+        except Exception as ex:
+            self.logger.warning(f"Unable to load {filename} from disk cache: {ex}")
             return None
-    
-    
\ No newline at end of file
+
+    def migrate_legacy(self, filename: str) -> bool:
+        """Rewrite a legacy pickled .timesheet file as a Parquet partition"""
+        legacy_path = self._legacy_path(filename)
+        if not legacy_path.is_file():
+            return False
+
+        try:
+            with open(legacy_path, "rb") as file:
+                encrypted = file.read()
+            dataset = pickle.loads(self._legacy_fernet().decrypt(encrypted))
+        except Exception as ex:
+            self.logger.warning(f"Unable to read legacy cache file {legacy_path}: {ex}")
+            return False
+
+        self.save(dataset, filename)
+        if self._read_schema(filename) is None:
+            return False
+
+        # The partition is as complete as the legacy file was when it was written
+        legacy_stat = legacy_path.stat()
+        os.utime(self._path(filename, self.encrypt), (legacy_stat.st_atime, legacy_stat.st_mtime))
+
+        legacy_path.unlink()
+        self.logger.info(f"Migrated {legacy_path} to the columnar format")
+        return True
+
+    def migrate_all(self) -> List[str]:
+        """Migrate every legacy .timesheet file in the cache directory"""
+        return [
+            path.stem
+            for path in sorted(self.cache_dir.glob('*.timesheet'))
+            if self.migrate_legacy(path.stem)
+        ]
@@ -0,0 +1,147 @@
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from enum import Enum
+from typing import Callable, Dict, List, Optional
+
+
+class PartitionState(Enum):
+    COLD = "cold"
+    LOADING = "loading"
+    WARM = "warm"
+
+
+class TimesheetPartition:
+    def __init__(self, key: str, after: datetime, before: datetime):
+        self.key = key
+        self.after = after
+        self.before = before
+        self.state = PartitionState.COLD
+        self.loaded_at: Optional[datetime] = None
+        self.error: Optional[str] = None
+        self.future: Optional[Future] = None
+        # Bumped by every invalidation, so a load that started before one is not trusted
+        self.generation = 0
+
+    def overlaps(self, after: datetime, before: datetime) -> bool:
+        return self.after <= before and self.before >= after
+
+    def to_dict(self) -> dict:
+        return {
+            "key": self.key,
+            "state": self.state.value,
+            "after": self.after,
+            "before": self.before,
+            "loaded_at": self.loaded_at,
+            "error": self.error,
+        }
+
+
+class TimesheetHydrator:
+    """
+    Loads month partitions of the timesheet the first time a range touches
+    them. Partitions can also be prefetched in the background; callers that
+    need a partition being loaded wait for the in-flight load instead of
+    starting a new one.
+    """
+
+    def __init__(self, loader: Callable[[str, datetime, datetime], None], max_workers: int = 4):
+        self.loader = loader
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.partitions: Dict[str, TimesheetPartition] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="timesheet-hydration")
+
+    def register(self, key: str, after: datetime, before: datetime):
+        with self._lock:
+            if key not in self.partitions:
+                self.partitions[key] = TimesheetPartition(key, after, before)
+
+    def _load(self, partition: TimesheetPartition):
+        start_time = datetime.now()
+        while True:
+            with self._lock:
+                generation = partition.generation
+            try:
+                self.loader(partition.key, partition.after, partition.before)
+            except Exception as ex:
+                self.logger.warning(f"Unable to hydrate {partition.key}: {ex}")
+                with self._lock:
+                    partition.state = PartitionState.COLD
+                    partition.error = str(ex)
+                    partition.future = None
+                raise
+
+            with self._lock:
+                if partition.generation == generation:
+                    partition.state = PartitionState.WARM
+                    partition.loaded_at = datetime.now()
+                    partition.error = None
+                    partition.future = None
+                    break
+
+            # Invalidated while loading: what was loaded may predate it
+            self.logger.info(f"{partition.key} was invalidated while hydrating, loading it again")
+
+        elapsed_time = datetime.now() - start_time
+        self.logger.info(f"Time to hydrate {partition.key}: {elapsed_time.total_seconds():.2f} seconds")
+
+    def _submit(self, partition: TimesheetPartition) -> Optional[Future]:
+        with self._lock:
+            if partition.state == PartitionState.WARM:
+                return None
+            if partition.future is None:
+                partition.state = PartitionState.LOADING
+                partition.future = self._executor.submit(self._load, partition)
+            return partition.future
+
+    def ensure(self, after: datetime, before: datetime):
+        """Blocks until every registered partition touched by the range is warm"""
+        futures = [
+            future
+            for partition in list(self.partitions.values())
+            if partition.overlaps(after, before)
+            for future in [self._submit(partition)]
+            if future is not None
+        ]
+
+        for future in futures:
+            try:
+                future.result()
+            except Exception:
+                # The range is still served, straight from the source.
+                pass
+
+    def prefetch(self, keys: Optional[List[str]] = None):
+        """Starts loading the given partitions (all of them by default) in the background"""
+        partitions = [
+            partition
+            for key, partition in list(self.partitions.items())
+            if keys is None or key in keys
+        ]
+        for partition in partitions:
+            self._submit(partition)
+
+    def invalidate(self, after: datetime = None, before: datetime = None):
+        with self._lock:
+            for partition in self.partitions.values():
+                if after is None or before is None or partition.overlaps(after, before):
+                    partition.generation += 1
+                    if partition.state == PartitionState.WARM:
+                        partition.state = PartitionState.COLD
+                        partition.loaded_at = None
+
+    def is_warm(self, key: str) -> bool:
+        partition = self.partitions.get(key)
+        return partition is not None and partition.state == PartitionState.WARM
+
+    def is_ready(self) -> bool:
+        return all(p.state == PartitionState.WARM for p in self.partitions.values())
+
+    def list_partitions(self) -> List[dict]:
+        with self._lock:
+            return [
+                partition.to_dict()
+                for partition in sorted(self.partitions.values(), key=lambda p: p.after)
+            ]
@@ -0,0 +1,257 @@
+import sys
+import threading
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Object columns with at most this share of distinct values are dictionary-encoded
+MAX_DISTINCT_RATIO = 0.5
+
+CODE_DTYPE = np.int32
+
+
+def _worker_link(url, name):
+    if url is None or name is None:
+        return None
+    return f'<a href="{url}">{name}</a>'
+
+
+def _client_link(url, name):
+    if url == "N/A" and name == "N/A":
+        return "N/A"
+    return f"<a href='{url}'>{name}</a>"
+
+
+# Display columns rebuilt from the (url, name) columns they are made of
+DERIVED_COLUMNS: Dict[str, Tuple[str, str, Callable[[Any, Any], Any]]] = {
+    'Worker': ('WorkerOmniUrl', 'WorkerName', _worker_link),
+    'Client': ('ClientOmniUrl', 'ClientName', _client_link),
+}
+
+
+class SharedDictionaries:
+    """
+    Append-only dictionaries of the distinct values of each column, shared by
+    every cached month, so a value such as a client name is held once no
+    matter how many months mention it. Codes never change once assigned.
+    """
+
+    def __init__(self):
+        self.values: Dict[str, List[Any]] = {}
+        self.codes: Dict[str, Dict[Tuple[type, Any], int]] = {}
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def encode(self, column: str, values: pd.Series) -> np.ndarray:
+        local_codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        with self._lock:
+            values_list = self.values.setdefault(column, [])
+            codes = self.codes.setdefault(column, {})
+            # The extra slot keeps missing values (local code -1) at -1
+            mapping = np.full(len(uniques) + 1, -1, dtype=CODE_DTYPE)
+            for i, value in enumerate(uniques):
+                key = (type(value), value)
+                code = codes.get(key)
+                if code is None:
+                    code = len(values_list)
+                    codes[key] = code
+                    values_list.append(value)
+                    # The value and its slot in the list
+                    self._nbytes += sys.getsizeof(value) + 8
+                    self._arrays.pop(column, None)
+                mapping[i] = code
+
+        return mapping.take(local_codes)
+
+    def array(self, column: str) -> np.ndarray:
+        with self._lock:
+            array = self._arrays.get(column)
+            if array is None:
+                values = self.values.get(column, [])
+                array = np.empty(len(values), dtype=object)
+                array[:] = values
+                self._arrays[column] = array
+            return array
+
+    def nbytes(self) -> int:
+        """Bytes held by the dictionary values, kept up to date as they are added"""
+        with self._lock:
+            return self._nbytes
+
+
+class _Encoded:
+    """A column stored as codes into a shared dictionary; -1 stands for `missing`"""
+
+    def __init__(self, codes: np.ndarray, dtype, missing: Any):
+        self.codes = codes
+        self.dtype = dtype
+        self.missing = missing
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes
+
+
+class _Narrowed:
+    """An integer column stored in the smallest dtype that holds its values"""
+
+    def __init__(self, values: np.ndarray, dtype):
+        self.values = values
+        self.dtype = dtype
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes
+
+
+def _missing_value(values: pd.Series):
+    """The single missing marker used by the column (None or NaN), or a sentinel when it mixes them"""
+    missing = values[values.isna()]
+    if len(missing) == 0:
+        return None
+    kinds = {type(value) for value in missing}
+    if len(kinds) > 1:
+        return _Mixed
+    return missing.iloc[0]
+
+
+class _Mixed:
+    pass
+
+
+class CompactFrame:
+    """
+    A timesheet frame in a compact layout: repetitive object columns hold
+    codes into `SharedDictionaries`, integer columns are narrowed and the
+    `DERIVED_COLUMNS` links are not stored. `decode` gives back the original
+    frame (same columns, dtypes and values) for the requested rows.
+    """
+
+    def __init__(self, df: pd.DataFrame, dictionaries: SharedDictionaries):
+        self.dictionaries = dictionaries
+        self.columns = list(df.columns)
+        self.index = df.index
+        self.length = len(df)
+        self.raw_nbytes = int(df.memory_usage(deep=True).sum()) if len(df.columns) > 0 else 0
+        self.stored: Dict[str, Any] = {}
+        self.derived: Dict[str, Tuple[str, str, Callable]] = {}
+
+        for column in self.columns:
+            self.stored[column] = self._compact(column, df[column])
+
+        for column, (url, name, link) in DERIVED_COLUMNS.items():
+            if column in self.stored and self._derivable(df, column, url, name, link):
+                self.derived[column] = (url, name, link)
+                del self.stored[column]
+
+        self.day_ordinals = self._day_ordinals()
+
+    def _compact(self, column: str, values: pd.Series):
+        if self.length == 0:
+            return values
+
+        if pd.api.types.is_integer_dtype(values.dtype) and isinstance(values.dtype, np.dtype):
+            for dtype in (np.int8, np.int16, np.int32):
+                info = np.iinfo(dtype)
+                if values.min() >= info.min and values.max() <= info.max:
+                    return _Narrowed(values.to_numpy().astype(dtype), values.dtype)
+            return values
+
+        if values.dtype != object and not pd.api.types.is_string_dtype(values.dtype):
+            return values
+
+        missing = _missing_value(values)
+        if missing is _Mixed:
+            return values
+        try:
+            if values.nunique(dropna=False) > MAX_DISTINCT_RATIO * self.length:
+                return values
+            codes = self.dictionaries.encode(column, values)
+        except TypeError:
+            # Unhashable values
+            return values
+        return _Encoded(codes, values.dtype, missing)
+
+    def _derivable(self, df: pd.DataFrame, column: str, url: str, name: str, link: Callable) -> bool:
+        if url not in df.columns or name not in df.columns:
+            return False
+        triples = df[[url, name, column]].drop_duplicates()
+        return all(
+            link(u, n) == value or (value is None and link(u, n) is None)
+            for u, n, value in triples.itertuples(index=False)
+        )
+
+    def _day_ordinals(self) -> Optional[np.ndarray]:
+        """Day ordinal of each row when the frame is sorted by an encoded Date column, for range searches"""
+        stored = self.stored.get('Date')
+        if not isinstance(stored, _Encoded) or (stored.codes < 0).any():
+            return None
+
+        dictionary = self.dictionaries.array('Date')
+        try:
+            table = np.array([value.toordinal() for value in dictionary], dtype=np.int32)
+        except AttributeError:
+            return None
+
+        ordinals = table.take(stored.codes)
+        if len(ordinals) > 1 and (ordinals[1:] < ordinals[:-1]).any():
+            return None
+        return ordinals
+
+    def date_rows(self, after: date, before: date) -> Optional[slice]:
+        """Positions of the rows dated within [after, before], or None when the frame is not sorted by Date"""
+        if self.day_ordinals is None:
+            return None
+        start = int(np.searchsorted(self.day_ordinals, after.toordinal(), side='left'))
+        end = int(np.searchsorted(self.day_ordinals, before.toordinal(), side='right'))
+        return slice(start, end)
+
+    @property
+    def nbytes(self) -> int:
+        total = self.index.memory_usage(deep=True)
+        if self.day_ordinals is not None:
+            total += self.day_ordinals.nbytes
+        for stored in self.stored.values():
+            if isinstance(stored, (_Encoded, _Narrowed)):
+                total += stored.nbytes
+            else:
+                total += int(stored.memory_usage(deep=True, index=False))
+        return int(total)
+
+    def column(self, column: str, rows=None) -> pd.Series:
+        index = self.index if rows is None else self.index[rows]
+
+        if column in self.derived:
+            url, name, link = self.derived[column]
+            urls = self.column(url, rows)
+            names = self.column(name, rows)
+            codes, pairs = pd.factorize(pd.Series(list(zip(urls, names)), dtype=object))
+            table = np.empty(len(pairs) + 1, dtype=object)
+            for i, (u, n) in enumerate(pairs):
+                table[i] = link(u, n)
+            return pd.Series(table.take(codes), index=index, dtype=object, name=column)
+
+        stored = self.stored[column]
+        if isinstance(stored, _Encoded):
+            codes = stored.codes if rows is None else stored.codes[rows]
+            table = np.append(self.dictionaries.array(column), np.array([stored.missing], dtype=object))
+            values = pd.Series(table.take(codes), index=index, dtype=object, name=column)
+            return values if stored.dtype == object else values.astype(stored.dtype)
+
+        if isinstance(stored, _Narrowed):
+            values = stored.values if rows is None else stored.values[rows]
+            return pd.Series(values.astype(stored.dtype), index=index, name=column)
+
+        return stored if rows is None else stored.iloc[rows]
+
+    def decode(self, rows=None) -> pd.DataFrame:
+        """The frame, or the rows selected by a boolean mask, positions or a slice"""
+        if not self.columns:
+            return pd.DataFrame(index=self.index if rows is None else self.index[rows])
+
+        # Built from the Series, which share the same index, so object columns
+        # are not inferred as strings again
+        return pd.DataFrame({column: self.column(column, rows) for column in self.columns})
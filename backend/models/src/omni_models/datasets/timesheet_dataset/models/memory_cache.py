@@ -1,65 +1,324 @@
-from datetime import datetime
+import bisect
+import itertools
+import logging
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import pandas as pd
+
 from omni_models.base.powerdataframe import SummarizablePowerDataFrame
 
+from .layout import CompactFrame, SharedDictionaries
+
+MonthKey = Tuple[int, int]
+
+_serials = itertools.count(1)
+
+
+def _to_date(value) -> Optional[date]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def _month_key(value: date) -> MonthKey:
+    return value.year, value.month
+
+
+def _month_bounds(key: MonthKey) -> Tuple[date, date]:
+    year, month = key
+    first = date(year, month, 1)
+    next_month = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return first, next_month - timedelta(days=1)
+
+
+class _CacheEntry:
+    def __init__(self, after: date, before: date, data: pd.DataFrame, dictionaries: SharedDictionaries):
+        self.after = after
+        self.before = before
+        self.data = CompactFrame(data, dictionaries)
+        self.created_at = datetime.now()
+        # Entries are never changed, so a serial names their rows for good
+        self.serial = next(_serials)
+        self.nbytes = self.data.nbytes
+        self.raw_nbytes = self.data.raw_nbytes
+
+    def covers(self, after: date, before: date) -> bool:
+        return self.after <= after and self.before >= before
+
+    def slice(self, after: date, before: date) -> pd.DataFrame:
+        data = self.data
+        if data.length == 0 or (self.after >= after and self.before <= before):
+            return data.decode()
+        rows = data.date_rows(after, before)
+        if rows is None:
+            dates = data.column('Date')
+            rows = ((dates >= after) & (dates <= before)).to_numpy()
+        return data.decode(rows)
+
+
 class TimesheetMemoryCache:
-    def __init__(self):
-        self.cache = []
+    """
+    Timesheet frames indexed by month. Each month holds the day ranges that
+    were cached for it, so a request is answered by stitching the covering
+    ranges of the months it touches, and `missing` reports only the gaps
+    that still need to be fetched. Entries are evicted in LRU order once
+    `max_entries` or `max_bytes` is exceeded.
+
+    Frames are kept as `CompactFrame`s whose dictionaries are shared by all
+    months; `max_bytes` budgets the compact size of the entries plus the
+    dictionaries, which are started afresh whenever the cache empties.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.months: Dict[MonthKey, List[_CacheEntry]] = {}
+        # Per month, the start of each entry (in order) and the entry reaching
+        # furthest among it and the ones before, for bisected interval lookups
+        self.reach: Dict[MonthKey, Tuple[List[date], List[_CacheEntry]]] = {}
+        self.sorted_months: List[MonthKey] = []
+        self.lru: "OrderedDict[int, _CacheEntry]" = OrderedDict()
+        self.dictionaries = SharedDictionaries()
+        self._lock = threading.RLock()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def _months_between(self, after: date, before: date) -> List[MonthKey]:
+        start = bisect.bisect_left(self.sorted_months, _month_key(after))
+        end = bisect.bisect_right(self.sorted_months, _month_key(before))
+        return self.sorted_months[start:end]
+
+    def _cover(self, key: MonthKey, after: date, before: date) -> Tuple[List[Tuple[_CacheEntry, date, date]], List[Tuple[date, date]]]:
+        """Greedy interval cover of [after, before] with the entries of one month"""
+        pieces = []
+        gaps = []
+        cursor = after
+        starts, furthest = self.reach.get(key, ([], []))
+
+        while cursor <= before:
+            # Entries starting at or before the cursor; the one reaching furthest covers it, if any does
+            i = bisect.bisect_right(starts, cursor)
+            if i > 0 and furthest[i - 1].before >= cursor:
+                best = furthest[i - 1]
+                end = min(best.before, before)
+                pieces.append((best, cursor, end))
+                cursor = end + timedelta(days=1)
+                continue
+
+            gap_end = min(starts[i] - timedelta(days=1), before) if i < len(starts) else before
+            gaps.append((cursor, gap_end))
+            cursor = gap_end + timedelta(days=1)
+
+        return pieces, gaps
+
+    def _index(self, key: MonthKey):
+        entries = self.months.get(key)
+        if not entries:
+            self.reach.pop(key, None)
+            return
+
+        furthest = []
+        for entry in entries:
+            furthest.append(entry if not furthest or entry.before > furthest[-1].before else furthest[-1])
+        self.reach[key] = ([entry.after for entry in entries], furthest)
+
+    def _plan(self, after: date, before: date):
+        pieces = []
+        gaps = []
+        key = _month_key(after)
+        last_key = _month_key(before)
+
+        while key <= last_key:
+            first, last = _month_bounds(key)
+            p, g = self._cover(key, max(first, after), min(last, before))
+            pieces.extend(p)
+            gaps.extend(g)
+            key = (key[0] + 1, 1) if key[1] == 12 else (key[0], key[1] + 1)
+
+        merged_gaps = []
+        for gap in gaps:
+            if merged_gaps and merged_gaps[-1][1] + timedelta(days=1) == gap[0]:
+                merged_gaps[-1] = (merged_gaps[-1][0], gap[1])
+            else:
+                merged_gaps.append(gap)
+
+        return pieces, merged_gaps
+
+    def missing(self, after: datetime, before: datetime) -> List[Tuple[datetime, datetime]]:
+        """Day ranges inside [after, before] that are not cached yet"""
+        with self._lock:
+            _, gaps = self._plan(_to_date(after), _to_date(before))
+        return [
+            (datetime.combine(s, datetime.min.time()), datetime.combine(e, datetime.max.time()))
+            for s, e in gaps
+        ]
+
+    def scan(self, after: datetime, before: datetime) -> Optional[Tuple[List[pd.DataFrame], Hashable]]:
+        """
+        The cached pieces covering [after, before], in date order and sliced
+        to the range, without concatenating them, and the version naming
+        those rows; None if any day is missing.
+        """
+        after = _to_date(after)
+        before = _to_date(before)
+
+        with self._lock:
+            pieces, gaps = self._plan(after, before)
+            if gaps or not pieces:
+                return None
+
+            for entry, _, _ in pieces:
+                self.lru.move_to_end(id(entry))
+
+        frames = [entry.slice(s, e) for entry, s, e in pieces]
+        version = tuple((entry.serial, s, e) for entry, s, e in pieces)
+        return [f for f in frames if len(f.columns) > 0], version
 
     def get(self, after: datetime, before: datetime) -> SummarizablePowerDataFrame:
-        for m in self.cache:
-            if m['after'] <= after and m['before'] >= before:
-                df = m['result'].data
-                df = df[df['Date'] >= after.date()]
-                df = df[df['Date'] <= before.date()]
-                return SummarizablePowerDataFrame(df)
-        return None
-    
+        scanned = self.scan(after, before)
+        if scanned is None:
+            return None
+
+        frames, version = scanned
+        if not frames:
+            result = SummarizablePowerDataFrame(pd.DataFrame())
+        else:
+            result = SummarizablePowerDataFrame(frames[0] if len(frames) == 1 else pd.concat(frames))
+        result.version = version
+        return result
+
+    def _insert(self, entry: _CacheEntry):
+        key = _month_key(entry.after)
+
+        for existing in [e for e in self.months.get(key, []) if entry.covers(e.after, e.before)]:
+            self._remove(existing)
+
+        if any(e.covers(entry.after, entry.before) for e in self.months.get(key, [])):
+            return
+
+        entries = self.months.get(key)
+        if entries is None:
+            entries = []
+            self.months[key] = entries
+            bisect.insort(self.sorted_months, key)
+
+        entries.append(entry)
+        entries.sort(key=lambda e: e.after)
+        self._index(key)
+        self.lru[id(entry)] = entry
+        self.total_bytes += entry.nbytes
+
+    def _remove(self, entry: _CacheEntry):
+        key = _month_key(entry.after)
+        entries = self.months.get(key, [])
+        if entry in entries:
+            entries.remove(entry)
+            self.total_bytes -= entry.nbytes
+            self.lru.pop(id(entry), None)
+
+        if not entries and key in self.months:
+            del self.months[key]
+            self.sorted_months.remove(key)
+        self._index(key)
+
+    def _reset_dictionaries(self):
+        # Once no entry refers to them, the values of evicted months go too
+        if not self.lru:
+            self.dictionaries = SharedDictionaries()
+
+    def _evict(self):
+        while self.lru and (
+            (self.max_entries is not None and len(self.lru) > self.max_entries) or
+            (self.max_bytes is not None and self.total_bytes + self.dictionaries.nbytes() > self.max_bytes)
+        ):
+            oldest = next(iter(self.lru.values()))
+            self._remove(oldest)
+        self._reset_dictionaries()
+
     def add(self, after: datetime, before: datetime, result: SummarizablePowerDataFrame):
-        self.cache.append({
-            "after": after,
-            "before": before,
-            "result": result, 
-            "created_at": datetime.now()
-        })
+        after = _to_date(after)
+        before = _to_date(before)
+        df = result.data
 
-    def list_cache(self, after, before):
-        if after:
-            if isinstance(after, str):
-                after = datetime.strptime(after, '%Y-%m-%d').date()
-            elif isinstance(after, datetime):
-                after = after.date()
-                
-        if before:
-            if isinstance(before, str):
-                before = datetime.strptime(before, '%Y-%m-%d').date()
-            elif isinstance(before, datetime):
-                before = before.date()
-        
-        return [
-            {
-                "after": m['after'],
-                "before": m['before'],
-                "created_at": m['created_at']
+        with self._lock:
+            key = _month_key(after)
+            while key <= _month_key(before):
+                first, last = _month_bounds(key)
+                s, e = max(first, after), min(last, before)
+                if len(df) > 0 and (_month_key(after) != _month_key(before)):
+                    month_df = df[(df['Date'] >= s) & (df['Date'] <= e)]
+                else:
+                    month_df = df
+                entry = _CacheEntry(s, e, month_df, self.dictionaries)
+                self._report(key, entry)
+                self._insert(entry)
+                key = (key[0] + 1, 1) if key[1] == 12 else (key[0], key[1] + 1)
+
+            self._evict()
+
+    def _report(self, key: MonthKey, entry: _CacheEntry):
+        if entry.raw_nbytes == 0:
+            return
+        reduction = 100 * (1 - entry.nbytes / entry.raw_nbytes)
+        self.logger.info(
+            f"Caching {key[0]}-{key[1]:02d} ({entry.after} to {entry.before}): "
+            f"{entry.raw_nbytes / 1024 / 1024:.2f} MB stored in {entry.nbytes / 1024 / 1024:.2f} MB "
+            f"({reduction:.0f}% less)"
+        )
+
+    def usage(self) -> Dict[MonthKey, Dict[str, int]]:
+        """Compact and original (decoded) bytes held for each cached month"""
+        with self._lock:
+            return {
+                key: {
+                    "bytes": sum(entry.nbytes for entry in entries),
+                    "raw_bytes": sum(entry.raw_nbytes for entry in entries),
+                }
+                for key, entries in self.months.items()
             }
-            for m in self.cache
-            if (after is None or after >= m['after']) and (before is None or before <= m['before'])
+
+    def _entries_between(self, after: Optional[date], before: Optional[date]) -> List[_CacheEntry]:
+        keys = self.sorted_months
+        if after is not None or before is not None:
+            keys = self._months_between(after or date.min, before or date.max)
+
+        return [
+            entry
+            for key in keys
+            for entry in self.months[key]
         ]
-        
+
+    def list_cache(self, after, before):
+        after = _to_date(after)
+        before = _to_date(before)
+
+        with self._lock:
+            entries = self._entries_between(None, None)
+            return [
+                {
+                    "after": entry.after,
+                    "before": entry.before,
+                    "created_at": entry.created_at,
+                    "bytes": entry.nbytes,
+                    "raw_bytes": entry.raw_nbytes,
+                }
+                for entry in entries
+                if (after is None or after >= entry.after) and (before is None or before <= entry.before)
+            ]
+
     def invalidate(self, after, before):
-        if after:
-            if isinstance(after, str):
-                after = datetime.strptime(after, '%Y-%m-%d').date()
-            elif isinstance(after, datetime):
-                after = after.date()
-                
-        if before:
-            if isinstance(before, str):
-                before = datetime.strptime(before, '%Y-%m-%d').date()
-            elif isinstance(before, datetime):
-                before = before.date()
-                
-        self.cache = [
-            m 
-            for m in self.cache 
-            if (after is None or after >= m['after']) and (before is None or before <= m['before'])
-        ] 
\ No newline at end of file
+        after = _to_date(after)
+        before = _to_date(before)
+
+        with self._lock:
+            for entry in self._entries_between(after, before):
+                if (after is None or entry.before >= after) and (before is None or entry.after <= before):
+                    self._remove(entry)
+            self._reset_dictionaries()
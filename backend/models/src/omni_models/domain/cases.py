@@ -7,6 +7,7 @@ from omni_models.domain.clients import ClientsRepository
 from pydantic import BaseModel
 from datetime import datetime, date, timezone, timedelta
 import re
+import threading
 
 import omni_utils.helpers.numbers as numbers
 from omni_models.domain.active_deals import ActiveDealsRepository
@@ -133,10 +134,19 @@ class CasesRepository:
         self.clients_repository = clients_repository
         self.deals_repository = deals_repository
         self.__data: Dict[int, Case] = None
+        self.__indexes: Dict[str, Dict] = {}
+        self.__by_client_id: Dict[int, List[Case]] = {}
+        self.__lock = threading.RLock()
 
-    def get_all(self) -> Dict[str, Case]:
+    def __ensure_data(self):
+        # Concurrent callers on a cold repository wait for a single build
         if self.__data is None:
-            self.__build_data()
+            with self.__lock:
+                if self.__data is None:
+                    self.__build_data()
+
+    def get_all(self) -> Dict[str, Case]:
+        self.__ensure_data()
 
         return self.__data
 
@@ -167,6 +177,7 @@ class CasesRepository:
         
     def get_cases_with_ids(self, case_ids: List[str]) -> Dict[str, Case]:
         all_cases = self.get_all().values()
+        case_ids = set(case_ids)
         result = {
             case.id: case
             for case in all_cases
@@ -174,9 +185,12 @@ class CasesRepository:
         }
         return result
 
+    def get_by_client_id(self, client_id) -> List[Case]:
+        self.__ensure_data()
+        return list(self.__by_client_id.get(client_id, []))
+
     def get_by_id(self, id: int) -> Case:
-        if self.__data is None:
-            self.__build_data()
+        self.__ensure_data()
 
         attempt1 = self.__data.get(id, None)
         if attempt1 is not None:
@@ -187,29 +201,44 @@ class CasesRepository:
 
         raise KeyError(f'No case with id {id}')
 
+    def __lookup(self, index: str, value) -> Optional[Case]:
+        self.__ensure_data()
+        return self.__indexes[index].get(value)
+
     def get_by_slug(self, slug: str) -> Case:
-        o_case = next((case for case in self.get_all().values() if case.slug == slug), None)
-        return o_case
+        return self.__lookup('slug', slug)
     
     def get_by_title(self, title: str) -> Case:
-        o_case = next((case for case in self.get_all().values() if case.title == title), None)
-        return o_case
+        return self.__lookup('title', title)
 
     def get_by_everhour_project_id(self, id) -> Case:
-        cases = self.get_all().values()
-        for case in cases:
-            if id in case.everhour_projects_ids:
-                return case
-        return None
+        return self.__lookup('everhour_project_id', id)
     
     def get_by_everhour_project_name(self, name: str) -> Case:
-        cases = self.get_all().values()
-        for case in cases:
+        return self.__lookup('everhour_project_name', name)
+
+    @staticmethod
+    def __build_indexes(cases: Dict[str, Case]):
+        indexes = {
+            'slug': {},
+            'title': {},
+            'everhour_project_id': {},
+            'everhour_project_name': {},
+        }
+        by_client_id: Dict[int, List[Case]] = {}
+
+        # The first case wins, as the previous linear scans did
+        for case in cases.values():
+            indexes['slug'].setdefault(case.slug, case)
+            indexes['title'].setdefault(case.title, case)
+            for project_id in case.everhour_projects_ids:
+                indexes['everhour_project_id'].setdefault(project_id, case)
             for ti in case.tracker_info:
-                if ti.name == name:
-                    return case
-        
-        return None
+                indexes['everhour_project_name'].setdefault(ti.name, case)
+            if case.client_id is not None:
+                by_client_id.setdefault(case.client_id, []).append(case)
+
+        return indexes, by_client_id
 
     # def get_by_slug(self, slug: str) -> Case:
     #     return next((worker for worker in self.ontology.workers.values() if worker.slug == slug), None)
@@ -324,5 +353,6 @@ class CasesRepository:
                             
                         if due_on:
                             tracker_project.due_on = due_on
-                    
+
+        self.__indexes, self.__by_client_id = self.__build_indexes(cases_dict)
         self.__data = cases_dict
@@ -7,6 +7,7 @@ import omni_models.syntactic.everhour as t
 from pydantic import BaseModel
 from typing import Optional, List, Dict
 import omni_utils.helpers.numbers as numbers
+import threading
 
 
 class Client(BaseModel):
@@ -54,15 +55,22 @@ class ClientsRepository:
         self.tracker = tracker
         self.workers_repository = workers_repository
         self.__data: Dict[int, Client] = None
+        self.__indexes: Dict[str, Dict] = {}
+        self.__lock = threading.RLock()
 
-    def get_all(self) -> Dict[int, Client]:
+    def __ensure_data(self):
+        # Concurrent callers on a cold repository wait for a single build
         if not self.__data:
-            self.__build_data()
+            with self.__lock:
+                if not self.__data:
+                    self.__build_data()
+
+    def get_all(self) -> Dict[int, Client]:
+        self.__ensure_data()
         return self.__data
 
     def get_by_id(self, id: int) -> Client:
-        if not self.__data:
-            self.__build_data()
+        self.__ensure_data()
 
         attempt1 = self.__data.get(id, None)
         if attempt1 is not None:
@@ -73,26 +81,35 @@ class ClientsRepository:
 
         raise KeyError(f'No case with id {id}')
 
+    def __lookup(self, index: str, value) -> Optional[Client]:
+        self.__ensure_data()
+        return self.__indexes[index].get(value)
+
     def get_by_slug(self, slug: str) -> Client:
-        o_client = next((client for client in self.get_all().values() if client.slug == slug), None)
-        return o_client
+        return self.__lookup('slug', slug)
     
     def get_by_name(self, name: str) -> Client:
-        o_client = next((client for client in self.get_all().values() if client.name == name), None)
-        return o_client
+        return self.__lookup('name', name)
 
     def get_by_everhour_id(self, everhour_id: int) -> Client:
+        return self.__lookup('everhour_id', everhour_id)
+
+    @staticmethod
+    def __build_indexes(clients: Dict[int, Client]):
+        indexes = {
+            'slug': {},
+            'name': {},
+            'everhour_id': {},
+        }
 
-        o_client = next(
-            (
-                client
-                for client in self.get_all().values()
-                if everhour_id in client.tracker_ids
-            ),
-            None
-        )
+        # The first client wins, as the previous linear scans did
+        for client in clients.values():
+            indexes['slug'].setdefault(client.slug, client)
+            indexes['name'].setdefault(client.name, client)
+            for tracker_id in client.tracker_ids:
+                indexes['everhour_id'].setdefault(tracker_id, client)
 
-        return o_client
+        return indexes
 
     def __build_data(self) -> Dict[int, Client]:
         clients_dict: Dict[str, Client] = {}
@@ -150,7 +167,10 @@ class ClientsRepository:
                 clients_dict[tracker_client.normalized_name].tracker_info.append(tracker_client)
                 neg_id = neg_id - 1
 
-        self.__data = {
+        data = {
             client.id: client
             for client in clients_dict.values()
         }
+
+        self.__indexes = self.__build_indexes(data)
+        self.__data = data
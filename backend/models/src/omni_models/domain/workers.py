@@ -1,4 +1,5 @@
 from enum import Enum
+import threading
 from typing import Optional, Dict
 from pydantic import BaseModel, computed_field
 
@@ -123,10 +124,19 @@ class WorkersRepository:
         self.tasksmanager = tasksmanager or TasksManager()
         self.salesfunnel = salesfunnel or SalesFunnelB2B()
         self.__data: Dict[int, Worker] = None
+        self.__indexes: Dict[str, Dict] = {}
+        self.__positions: Dict[int, int] = {}
+        self.__lock = threading.RLock()
 
-    def get_all(self, kind: Optional[WorkerKind] = WorkerKind.ALL) -> Dict[int, Worker]:
+    def __ensure_data(self):
+        # Concurrent callers on a cold repository wait for a single build
         if not self.__data:
-            self.__build_data()
+            with self.__lock:
+                if not self.__data:
+                    self.__build_data()
+
+    def get_all(self, kind: Optional[WorkerKind] = WorkerKind.ALL) -> Dict[int, Worker]:
+        self.__ensure_data()
 
         if kind == WorkerKind.ALL:
             return self.__data
@@ -140,17 +150,17 @@ class WorkersRepository:
     def get_by_id(self, id: int) -> Worker:
         return self.get_all()[id]
 
+    def __lookup(self, index: str, value) -> Optional[Worker]:
+        self.__ensure_data()
+        return self.__indexes[index].get(value)
+
     def get_by_slug(self, slug: str) -> Worker:
-        all_workers = self.get_all().values()
-        return next((worker for worker in all_workers if worker.slug == slug), None)
+        return self.__lookup('slug', slug)
 
     def get_by_name(self, name: str) -> Worker:
-        all_workers = self.get_all().values()
-        return next((worker for worker in all_workers if worker.name == name), None)
+        return self.__lookup('name', name)
     
     def get_by_email(self, email: str) -> Worker:
-        all_workers = self.get_all().values()
-        
         if not email.endswith('@eximia.co') and not email.endswith('@elemarjr.com'):
             return None
 
@@ -158,61 +168,50 @@ class WorkersRepository:
         email1 = f'{user_name}@eximia.co'
         email2 = f'{user_name}@elemarjr.com'
 
-        return next(
-            (worker for worker in all_workers if (
-                worker.email == email1 or worker.email == email2
-            )), None
-        )
+        candidates = [
+            worker
+            for worker in (self.__lookup('email', email1), self.__lookup('email', email2))
+            if worker is not None
+        ]
+        return min(candidates, key=lambda worker: self.__positions[worker.id], default=None)
 
     def get_by_everhour_id(self, id: int) -> Worker:
-        all_workers = self.get_all().values()
-        return next(
-            (worker
-             for worker in all_workers
-             if worker.tracker_info is not None and worker.tracker_info.id == id
-             )
-            , None
-        )
+        return self.__lookup('everhour_id', id)
 
     def get_by_todoist_id(self, id: int) -> Worker:
-        all_workers = self.get_all().values()
-        return next(
-            (worker
-             for worker in all_workers
-             if worker.todoist_user_id == id
-             )
-            , None
-        )
+        return self.__lookup('todoist_user_id', id)
 
     def get_by_ontology_user_id(self, user_id: int) -> Worker:
-        all_workers = self.get_all().values()
-        return next(
-            (
-                worker
-                for worker in all_workers
-                if worker.ontology_user_id == user_id
-            ), None
-        )
+        return self.__lookup('ontology_user_id', user_id)
 
     def get_by_insights_user_id(self, user_id: int) -> Worker:
-        all_workers = self.get_all().values()
-        return next(
-            (
-                worker
-                for worker in all_workers
-                if worker.insights_user_id == user_id
-            ), None
-        )
+        return self.__lookup('insights_user_id', user_id)
 
     def get_by_pipedrive_user_id(self, user_id: int) -> Worker:
-        all_workers = self.get_all().values()
-        return next(
-            (
-                worker
-                for worker in all_workers
-                if worker.pipedrive_user_id == user_id
-            ), None
-        )
+        return self.__lookup('pipedrive_user_id', user_id)
+
+    @staticmethod
+    def __build_indexes(workers: Dict[int, Worker]) -> Dict[str, Dict]:
+        keys = {
+            'slug': lambda worker: worker.slug,
+            'name': lambda worker: worker.name,
+            'email': lambda worker: worker.email,
+            'everhour_id': lambda worker: worker.tracker_info.id if worker.tracker_info is not None else None,
+            'todoist_user_id': lambda worker: worker.todoist_user_id,
+            'ontology_user_id': lambda worker: worker.ontology_user_id,
+            'insights_user_id': lambda worker: worker.insights_user_id,
+            'pipedrive_user_id': lambda worker: worker.pipedrive_user_id,
+        }
+
+        indexes = {index: {} for index in keys}
+        for worker in workers.values():
+            for index, key in keys.items():
+                value = key(worker)
+                if value is not None:
+                    # The first worker wins, as the previous linear scans did
+                    indexes[index].setdefault(value, worker)
+
+        return indexes
 
     def __build_data(self) -> Dict[int, Worker]:
 
@@ -321,8 +320,12 @@ class WorkersRepository:
         #         )
         #         neg_id -= 1
 
-        self.__data = {
+        data = {
             worker.id: worker
             for worker in workers_dict.values()
             if not worker.is_todoist_only and worker.name != 'admin'
         }
+
+        self.__indexes = self.__build_indexes(data)
+        self.__positions = {id: position for position, id in enumerate(data)}
+        self.__data = data
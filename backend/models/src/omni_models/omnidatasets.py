@@ -1,12 +1,14 @@
 import calendar
 from datetime import datetime, timedelta
 from calendar import monthrange
+import numpy as np
 import pandas as pd
 from typing import Tuple
 
 from omni_models.base.powerdataframe import SummarizablePowerDataFrame
 from omni_models.datasets.insights_dataset import InsightsDataset
 from omni_models.datasets.omni_dataset import OmniDataset
+from omni_models.datasets.filter_index import FilterIndexes
 from omni_models.datasets.ontology_entries_dataset import OntologyEntriesDataset
 from omni_models.datasets.tasks_dataset import TasksDataset
 from omni_models.datasets.timesheet_dataset import TimesheetDataset
@@ -58,9 +60,18 @@ def get_semester_dates(semester_slug: str) -> Tuple[datetime, datetime]:
 
     return start_date, end_date
 
+# Filterable name fields whose selections also match the entity slug
+SLUG_FIELDS = {
+    'WorkerName': 'WorkerSlug',
+    'ClientName': 'ClientSlug',
+    'CaseTitle': 'CaseSlug',
+}
+
+
 class OmniDatasets:
     def __init__(self, models: OmniModels = None):
         self.models = models
+        self.filter_indexes = FilterIndexes()
         self.timesheets = TimesheetDataset(models)
         self.ontology_entries = OntologyEntriesDataset(models)
         self.insights = InsightsDataset(models)
@@ -491,17 +502,27 @@ class OmniDatasets:
     def apply_filters(self, 
                       source: OmniDataset, 
                       df: pd.DataFrame, 
-                      filters: dict
+                      filters: dict,
+                      rows: np.ndarray = None,
+                      version = None
                      ):
         
-        # Compose filterable_fields and apply filters
+        # Compose filterable_fields and apply filters. Each field narrows the
+        # rows seen by the next ones; the options and selections of a field are
+        # answered from the frame's FilterIndex as bitmaps over its rows.
+        # `rows`, a boolean mask, restricts the frame beforehand, so the rows
+        # of a frame that is kept (e.g. a month) reuse its index. `version`
+        # names the rows of `df` (see PowerDataFrame.version); frames of the
+        # same version share their index.
         filterable_fields = source.get_filterable_fields()
         result = {'filterable_fields': []}
+        index = self.filter_indexes.get(df, version) if len(df) > 0 else None
+        bitmap = rows
 
         for field in filterable_fields:
             options = []
-            if len(df) > 0:
-                options = sorted([value for value in df[field].unique().tolist() if value is not None])
+            if index is not None and (bitmap is None or bitmap.any()):
+                options = index.field(field).options(bitmap)
             
             selected_values = []
 
@@ -520,23 +541,17 @@ class OmniDatasets:
             )
 
             # Apply filter to dataframe
-            if selected_values and len(df) > 0:
-                slug_field = None
-                
-                if field == "WorkerName":
-                    slug_field = "WorkerSlug"
-                elif field == "ClientName":
-                    slug_field = "ClientSlug"
-                elif field == "CaseTitle":
-                    slug_field = "CaseSlug"
-                    
-                if not slug_field:
-                    df = df[
-                        df[field].isin(selected_values)
-                        ]
-                else:
-                    df = df[
-                        df[field].isin(selected_values) | df[slug_field].isin(selected_values)
-                    ]
+            if selected_values and index is not None and (bitmap is None or bitmap.any()):
+                rows = index.field(field).rows(selected_values)
+
+                # Names also match the slug of the same entity
+                slug_field = SLUG_FIELDS.get(field)
+                if slug_field:
+                    rows |= index.field(slug_field).rows(selected_values)
+
+                bitmap = rows if bitmap is None else bitmap & rows
+
+        if bitmap is not None:
+            df = df[bitmap]
         
         return df, result
@@ -1,5 +1,8 @@
+import logging
 from datetime import datetime
-from typing import Dict
+from typing import Dict, Optional
+
+import pandas as pd
 
 from omni_models.base.semanticmodel import SemanticModel
 from omni_models.semantic import Ontology
@@ -10,6 +13,7 @@ from omni_utils.helpers.weeks import Weeks
 
 from .models.appointment import Appointment
 from .models.project import Project
+from .models.frame import derive_columns
 
 @c4_external_system('Time Tracker (Everhour)', 'Logs EximiaCo engagements, detailing all projects and hours worked')
 class TimeTracker(SemanticModel):
@@ -18,6 +22,7 @@ class TimeTracker(SemanticModel):
         self.everhour = everhour or Everhour(api_token=api_key)
         self.ontology = ontology or Ontology()
         self.context = None
+        self.logger = logging.getLogger(self.__class__.__name__)
 
     @property
     def active_workers(self) -> Dict[int, User]:
@@ -38,13 +43,52 @@ class TimeTracker(SemanticModel):
         }
 
     def get_appointments(self, starting: datetime, ending: datetime):
-        appointments = self.everhour.fetch_appointments(starting, ending)
         projects = self.all_projects
 
-        return [
+        result = [
             Appointment.from_base_instance(ap, projects[ap.project_id])
-            for ap in appointments
+            for ap in self.everhour.iter_appointments(starting, ending)
         ]
+        result.sort(key=lambda ap: (ap.date, ap.id))
+        return result
+
+    def get_appointments_frame(self, starting: datetime, ending: datetime, created_after: Optional[datetime] = None) -> pd.DataFrame:
+        """
+        The rows `get_appointments` would produce (as `Appointment.to_dict`),
+        built from the typed columns of the Everhour response without creating
+        an object per appointment. Records that do not match the schema are
+        logged together and left out; appointments of unknown projects are
+        logged and raise a KeyError. With `created_after`, only appointments
+        created at or after it are returned.
+        """
+        result = self.everhour.fetch_appointments_frame(starting, ending, created_after)
+        if result.errors:
+            self.logger.warning(
+                f"Skipping {len(result.errors)} appointments that do not match the schema: {result.errors[:10]}"
+            )
+
+        df = result.data
+        if df.empty:
+            return pd.DataFrame()
+
+        projects = self.all_projects
+        codes, project_ids = pd.factorize(df['project_id'], sort=False)
+
+        # As in get_appointments, an appointment of an unknown project is an error
+        unknown = [project_id for project_id in project_ids if project_id not in projects]
+        if unknown:
+            self.logger.error(f"Appointments reference {len(unknown)} unknown projects: {unknown}")
+            raise KeyError(unknown[0])
+
+        attributes = pd.DataFrame(
+            [Appointment.project_attributes(projects[project_id]) for project_id in project_ids]
+        ).astype({'rate': 'float64'})
+        df = df.assign(**{
+            column: attributes[column].to_numpy().take(codes)
+            for column in attributes.columns
+        })
+
+        return derive_columns(df)
 
     def get_appointments_of_n_weeks(self, number_of_weeks=4):
         start, end = Weeks.get_n_weeks_dates(number_of_weeks)
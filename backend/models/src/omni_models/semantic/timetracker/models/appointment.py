@@ -1,9 +1,10 @@
-from typing import Optional
-import pytz
+from typing import Iterable, Optional
+import pandas as pd
 
 from omni_utils.helpers.weeks import Weeks
 import omni_models.syntactic.everhour as e
 from .project import Project
+from .frame import SP_TIMEZONE, appointments_frame
 
 class Appointment(e.Appointment):
     is_squad: Optional[bool] = False
@@ -43,8 +44,7 @@ class Appointment(e.Appointment):
 
     @property
     def correctness(self):
-        sp_timezone = pytz.timezone('America/Sao_Paulo')
-        date_aware = self.date.replace(tzinfo=sp_timezone)
+        date_aware = self.date.replace(tzinfo=SP_TIMEZONE)
         difference = self.created_at_sp - date_aware
         days = difference.days
         if days == 0:
@@ -56,8 +56,7 @@ class Appointment(e.Appointment):
 
     @property
     def is_lte(self):
-        sp_timezone = pytz.timezone('America/Sao_Paulo')
-        date_aware = self.date.replace(tzinfo=sp_timezone)
+        date_aware = self.date.replace(tzinfo=SP_TIMEZONE)
         difference = self.created_at_sp - date_aware
         days = difference.days
         return days > 2
@@ -75,15 +74,27 @@ class Appointment(e.Appointment):
         return data
 
     @classmethod
-    def from_base_instance(cls, base_instance: e.Appointment, project: Project):
-        base_dict = base_instance.dict()
-        base_dict['is_squad'] = project.is_squad if project else False
-        base_dict['is_eximiaco'] = project.is_eximiaco if project else True
-        base_dict['is_handson'] = project.is_handson if project else False
+    def to_frame(cls, appointments: Iterable['Appointment']) -> pd.DataFrame:
+        """The rows `to_dict` would produce for each appointment, derived column by column"""
+        return appointments_frame(appointments, list(cls.model_fields))
+
+    @staticmethod
+    def project_attributes(project: Optional[Project]) -> dict:
+        """The attributes an appointment takes from its project"""
+        attributes = {
+            'is_squad': project.is_squad if project else False,
+            'is_eximiaco': project.is_eximiaco if project else True,
+            'is_handson': project.is_handson if project else False,
+            'rate': project.rate.rate / 100 if project and project.rate and project.rate.type == 'project_rate' else 0,
+        }
 
-        base_dict['rate'] = project.rate.rate / 100 if project.rate and project.rate.type == 'project_rate' else 0
+        if attributes['is_handson']:
+            attributes['is_squad'] = False
 
-        if base_dict['is_handson']:
-            base_dict['is_squad'] = False
+        return attributes
 
-        return cls(**base_dict) 
\ No newline at end of file
+    @classmethod
+    def from_base_instance(cls, base_instance: e.Appointment, project: Project):
+        base_dict = base_instance.dict()
+        base_dict.update(cls.project_attributes(project))
+        return cls(**base_dict)
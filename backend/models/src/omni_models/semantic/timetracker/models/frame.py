@@ -0,0 +1,116 @@
+from datetime import datetime
+from typing import Callable, Iterable, List
+
+import numpy as np
+import pandas as pd
+import pytz
+
+SP_TIMEZONE = pytz.timezone('America/Sao_Paulo')
+
+# `datetime.replace(tzinfo=SP_TIMEZONE)` attaches the zone's first (LMT) offset
+# rather than the offset in effect at that date; the per-appointment properties
+# compare against it, so the columnar path does the same.
+SP_REPLACE_OFFSET = pd.Timedelta(datetime(2000, 1, 1, tzinfo=SP_TIMEZONE).utcoffset())
+
+ONE_DAY = pd.Timedelta(days=1)
+
+
+def _map_distinct(values: pd.Series, fn: Callable) -> pd.Series:
+    """Applies `fn` once per distinct value and spreads the results over the rows"""
+    codes, uniques = pd.factorize(values, sort=False)
+    table = np.empty(len(uniques), dtype=object)
+    for i, value in enumerate(uniques):
+        table[i] = fn(value)
+    return pd.Series(table.take(codes), index=values.index)
+
+
+def week_strings(values: pd.Series) -> pd.Series:
+    """Same as `Weeks.get_week_string` (weeks start on Sunday) for every value of a datetime column"""
+    if values.dt.tz is not None:
+        values = values.dt.tz_localize(None)
+
+    days = values.dt.normalize()
+    starts = days - pd.to_timedelta((days.dt.weekday + 1) % 7, unit='D')
+    return _map_distinct(
+        starts,
+        lambda start: f"{start.strftime('%d/%m')} - {(start + pd.Timedelta(days=6)).strftime('%d/%m')}"
+    )
+
+
+def time_in_hs(time: pd.Series) -> pd.Series:
+    # Python's round, not np.round: they disagree on a few thousand second counts
+    return _map_distinct(time, lambda seconds: round(seconds / 3600, 1)).astype('float64')
+
+
+def kinds(df: pd.DataFrame) -> pd.Series:
+    kind = np.select(
+        [df['is_eximiaco'].astype(bool), df['is_squad'].astype(bool), df['is_handson'].astype(bool)],
+        ['Internal', 'Squad', 'HandsOn'],
+        default='Consulting'
+    )
+    return pd.Series(kind.astype(object), index=df.index)
+
+
+def created_at_sp(created_at: pd.Series) -> pd.Series:
+    return created_at.dt.tz_localize(pytz.utc).dt.tz_convert(SP_TIMEZONE)
+
+
+def days_to_log(df: pd.DataFrame) -> pd.Series:
+    """Whole days between the appointment date and its creation, as `Appointment.correctness` counts them"""
+    return (df['created_at'] - df['date'] + SP_REPLACE_OFFSET) // ONE_DAY
+
+
+def correctness(days: pd.Series) -> pd.Series:
+    def label(value):
+        if value == 0:
+            return "OK"
+        elif value == 1:
+            return "Acceptable (1)"
+        return f"WTF {value}"
+
+    return _map_distinct(days, label)
+
+
+def revenue(rate: pd.Series, hours: pd.Series) -> pd.Series:
+    rate = rate.fillna(0)
+    charged = rate != 0
+    result = (rate * hours).where(charged, 0)
+    if not charged.any():
+        # `Appointment.revenue` returns the integer 0 for unbilled appointments
+        result = result.astype('int64')
+    return result
+
+
+def derive_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Adds the columns `Appointment.to_dict` derives from each appointment
+    (week, kind, correctness, ...) computed over whole columns.
+    """
+    if df.empty:
+        return df
+
+    hours = time_in_hs(df['time'])
+    days = days_to_log(df)
+
+    return df.assign(
+        week=week_strings(df['date']),
+        time_in_hs=hours,
+        kind=kinds(df),
+        created_at_week=week_strings(created_at_sp(df['created_at'])),
+        correctness=correctness(days),
+        is_lte=(days > 2).astype(bool),
+        revenue=revenue(df['rate'], hours),
+    )
+
+
+def appointments_frame(appointments: Iterable, columns: List[str]) -> pd.DataFrame:
+    """One row per appointment with the given attributes plus the derived columns"""
+    appointments = list(appointments)
+    if not appointments:
+        return pd.DataFrame()
+
+    df = pd.DataFrame({
+        column: [getattr(ap, column) for ap in appointments]
+        for column in columns
+    })
+    return derive_columns(df)
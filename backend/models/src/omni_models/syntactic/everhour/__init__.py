@@ -10,6 +10,7 @@ from .models import (
 )
 
 from .client import Everhour
+from .frames import AppointmentsFrame, AppointmentSchemaError
 
 __all__ = [
     'User',
@@ -21,4 +22,6 @@ __all__ = [
     'Appointment',
     'Task',
     'Everhour',
+    'AppointmentsFrame',
+    'AppointmentSchemaError',
 ]
@@ -1,35 +1,111 @@
-import requests
-from typing import Dict, Optional, List, Any
-from datetime import datetime
+import asyncio
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, Optional, List, Any, Tuple
+from datetime import datetime, timedelta
 
 from omni_utils.decorators.cache import cache
+from omni_models.syntactic.transport import HttpTransport, get_transport, loads
 from .models import User, Project, Task, Client, Appointment
+from .frames import AppointmentsFrame, appointments_frame
+
+DEFAULT_PAGE_SIZE = 10000
+APPOINTMENTS_PAGE_SIZE = 1000
+TASKS_PAGE_SIZE = 250
+
+# Appointment ranges are split in slices of this many days, fetched concurrently
+APPOINTMENTS_SLICE_DAYS = 7
 
 class Everhour:
-    def __init__(self, api_token: str):
-        self.session = requests.Session()
+    def __init__(self, api_token: str, max_workers: int = 4, transport: Optional[HttpTransport] = None):
+        self.transport = transport or get_transport()
         self.api_token = api_token
         self.base_url = "https://api.everhour.com/"
+        self.max_workers = max_workers
 
-    def fetch(self, entity: str, entity_id: Optional[str] = None, sub_entity: Optional[str] = None, params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
-        if params is None:
-            params = {}
-
+    def _url(self, entity: str, entity_id: Optional[str] = None, sub_entity: Optional[str] = None) -> str:
         url = self.base_url + entity
         if entity_id:
             url += f"/{entity_id}"
         if sub_entity:
             url += f"/{sub_entity}"
+        return url
 
-        headers = {
+    def _headers(self) -> Dict[str, str]:
+        return {
             'Content-Type': 'application/json',
             'X-Api-Key': self.api_token
         }
 
-        response = self.session.get(url, params=params, headers=headers)
+    def fetch(self, entity: str, entity_id: Optional[str] = None, sub_entity: Optional[str] = None, params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        url = self._url(entity, entity_id, sub_entity)
+        response = self.transport.get(url, params=params or {}, headers=self._headers())
+        response.raise_for_status()
+        return loads(response.content)
+
+    async def afetch(self, entity: str, entity_id: Optional[str] = None, sub_entity: Optional[str] = None, params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        url = self._url(entity, entity_id, sub_entity)
+        response = await self.transport.aget(url, params=params or {}, headers=self._headers())
         response.raise_for_status()
-        return response.json()
+        return loads(response.content)
+
+    def fetch_pages(self,
+                    queries: List[Tuple[str, Dict[str, Any]]],
+                    page_size: int = DEFAULT_PAGE_SIZE,
+                    lookahead: int = 1
+                    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yields the pages of each (entity, params) query as they arrive, following
+        each query until it returns a short page. Queries are fetched concurrently
+        and up to `lookahead` pages of the same query may be in flight at once.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="everhour") as executor:
+            pending = {}
+            next_page = {}
+            exhausted = set()
+
+            def submit(index: int):
+                entity, params = queries[index]
+                page = next_page[index]
+                next_page[index] = page + 1
+                future = executor.submit(self.fetch, entity, params={**params, 'limit': page_size, 'page': page})
+                pending[future] = index
+
+            for index in range(len(queries)):
+                next_page[index] = 1
+                for _ in range(max(lookahead, 1)):
+                    submit(index)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = pending.pop(future)
+                    items = future.result() or []
+
+                    if len(items) < page_size:
+                        exhausted.add(index)
+                    elif index not in exhausted:
+                        submit(index)
+
+                    if items:
+                        yield items
+
+    def fetch_all_pages(self, entity: str, params: Optional[Dict[str, Any]] = None, page_size: int = DEFAULT_PAGE_SIZE) -> List[Dict[str, Any]]:
+        return [
+            item
+            for page in self.fetch_pages([(entity, params or {})], page_size=page_size)
+            for item in page
+        ]
     
+    async def afetch_all_pages(self, entity: str, params: Optional[Dict[str, Any]] = None, page_size: int = DEFAULT_PAGE_SIZE) -> List[Dict[str, Any]]:
+        result = []
+        page = 1
+        while True:
+            items = await self.afetch(entity, params={**(params or {}), 'limit': page_size, 'page': page}) or []
+            result.extend(items)
+            if len(items) < page_size:
+                return result
+            page += 1
+
     @cache
     def fetch_all_users(self) -> Dict[int, User]:
         json = self.fetch('team/users')
@@ -39,36 +115,75 @@ class Everhour:
         }
         return result
 
-    def fetch_appointments(self, starting: datetime, ending: datetime) -> List[Appointment]:
-        params = {
-            'from': starting.strftime('%Y-%m-%d'),
-            'to': ending.strftime('%Y-%m-%d'),
-            "limit": 10000,
-            "page": 1
-        }
+    @staticmethod
+    def _appointment_slices(starting: datetime, ending: datetime) -> List[Dict[str, Any]]:
+        slices = []
+        slice_start = starting
+        while slice_start.date() <= ending.date():
+            slice_end = min(slice_start + timedelta(days=APPOINTMENTS_SLICE_DAYS - 1), ending)
+            slices.append({
+                'from': slice_start.strftime('%Y-%m-%d'),
+                'to': slice_end.strftime('%Y-%m-%d'),
+            })
+            slice_start = slice_start + timedelta(days=APPOINTMENTS_SLICE_DAYS)
+        return slices
 
-        json = self.fetch("team/time", params=params)
-        return [
-            Appointment(
-                **{
-                    **ap,
-                    'task_project': ap['task']
-                }
-            )
-            for ap in json
+    @staticmethod
+    def _to_appointment(ap: Dict[str, Any]) -> Appointment:
+        return Appointment(
+            **{
+                **ap,
+                'task_project': ap['task']
+            }
+        )
+
+    def iter_appointments(self, starting: datetime, ending: datetime) -> Iterator[Appointment]:
+        """Streams the appointments of the range, fetching week slices concurrently"""
+        queries = [("team/time", params) for params in self._appointment_slices(starting, ending)]
+        for page in self.fetch_pages(queries, page_size=APPOINTMENTS_PAGE_SIZE):
+            for ap in page:
+                yield self._to_appointment(ap)
+
+    def fetch_appointments_frame(self, starting: datetime, ending: datetime, created_after: Optional[datetime] = None) -> AppointmentsFrame:
+        """
+        The appointments of the range as typed columns, sorted by date and id,
+        without building models. With `created_after`, only the appointments
+        created at or after that moment are kept; `team/time` cannot be asked for
+        them, so the others are dropped as the pages arrive, before decoding.
+        """
+        queries = [("team/time", params) for params in self._appointment_slices(starting, ending)]
+        # createdAt is "%Y-%m-%d %H:%M:%S", which sorts as its moment does
+        created_after = created_after.strftime('%Y-%m-%d %H:%M:%S') if created_after else None
+        records = [
+            ap
+            for page in self.fetch_pages(queries, page_size=APPOINTMENTS_PAGE_SIZE)
+            for ap in page
+            if created_after is None or (ap.get('createdAt') or '') >= created_after
         ]
+        result = appointments_frame(records)
+        result.data = result.data.sort_values(['date', 'id'], kind='stable', ignore_index=True)
+        return result
+
+    def fetch_appointments(self, starting: datetime, ending: datetime) -> List[Appointment]:
+        result = list(self.iter_appointments(starting, ending))
+        result.sort(key=lambda ap: (ap.date, ap.id))
+        return result
     
+    async def afetch_appointments(self, starting: datetime, ending: datetime) -> List[Appointment]:
+        pages = await asyncio.gather(*[
+            self.afetch_all_pages("team/time", params, page_size=APPOINTMENTS_PAGE_SIZE)
+            for params in self._appointment_slices(starting, ending)
+        ])
+        result = [self._to_appointment(ap) for page in pages for ap in page]
+        result.sort(key=lambda ap: (ap.date, ap.id))
+        return result
+
     def fetch_all_projects_json(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
-        params = {
-            "limit": 10000,
-            "page": 1
-        }
-        
+        params = {}
         if status:
             params["status"] = status
 
-        json = self.fetch("projects", params=params)
-        return json
+        return self.fetch_all_pages("projects", params)
 
     @cache
     def fetch_all_projects(self, status: Optional[str] = None) -> List[Project]:
@@ -80,11 +195,7 @@ class Everhour:
 
     @cache
     def fetch_project_tasks(self, project_id: str) -> List[Task]:
-        params = {
-            "limit": 250,
-            "page": 1
-        }
-        json = self.fetch(f"projects/{project_id}/tasks", params=params)
+        json = self.fetch_all_pages(f"projects/{project_id}/tasks", page_size=TASKS_PAGE_SIZE)
         return [
             Task(**t)
             for t in json
@@ -108,16 +219,8 @@ class Everhour:
     
     @cache
     def fetch_all_clients(self) -> List[Client]:
-        params = {
-            "limit": 10000,
-            "page": 1
-        }
-
-        json = self.fetch("clients", params=params)
+        json = self.fetch_all_pages("clients")
         return [
             Client(**c)
             for c in json
         ]
-
-    def __del__(self):
-        self.session.close() 
\ No newline at end of file
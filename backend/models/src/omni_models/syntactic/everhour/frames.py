@@ -0,0 +1,109 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from .models import Appointment
+
+# Columns of an appointments frame, named after the `Appointment` fields
+APPOINTMENT_COLUMNS = ['id', 'created_at', 'date', 'user_id', 'comment', 'time', 'project_id']
+
+
+class AppointmentSchemaError(ValueError):
+    def __init__(self, errors: List[Dict[str, Any]]):
+        self.errors = errors
+        super().__init__(f"{len(errors)} appointments do not match the expected schema: {errors[:5]}")
+
+
+@dataclass
+class AppointmentsFrame:
+    """
+    Appointments decoded straight into typed columns. Records that fail the
+    schema are left out of `data` and listed in `errors` (their position in
+    the response, id and offending fields).
+    """
+    data: pd.DataFrame
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+    def raise_for_errors(self):
+        if self.errors:
+            raise AppointmentSchemaError(self.errors)
+
+    def to_appointments(self) -> List[Appointment]:
+        """Builds the pydantic objects for callers that need them; the columns are already validated"""
+        return [
+            Appointment.model_construct(**{
+                **row,
+                'created_at': row['created_at'].to_pydatetime(),
+                'date': row['date'].to_pydatetime(),
+            })
+            for row in self.data.to_dict('records')
+        ]
+
+
+def _integers(values: List[Any]) -> pd.Series:
+    numbers = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce')
+    return numbers.where(numbers.notna() & (numbers % 1 == 0))
+
+
+def _project_id(task: Any) -> Any:
+    if isinstance(task, dict) and task.get('projects'):
+        return task['projects'][0]
+    return task
+
+
+def appointments_frame(records: List[Dict[str, Any]]) -> AppointmentsFrame:
+    """
+    Columns of the `team/time` records, validated as a whole: the same rules
+    as the `Appointment` model, checked per column instead of per object.
+    """
+    if not records:
+        return AppointmentsFrame(pd.DataFrame(columns=APPOINTMENT_COLUMNS))
+
+    ids = _integers([r.get('id') for r in records])
+    user_ids = _integers([r.get('user') for r in records])
+    times = _integers([r.get('time') for r in records])
+    created_at = pd.to_datetime(
+        pd.Series([r.get('createdAt') for r in records], dtype=object),
+        format='%Y-%m-%d %H:%M:%S', errors='coerce'
+    )
+    dates = pd.to_datetime(
+        pd.Series([r.get('date') for r in records], dtype=object),
+        format='%Y-%m-%d', errors='coerce'
+    )
+    comments = pd.Series([r.get('comment') for r in records], dtype=object)
+    project_ids = pd.Series([_project_id(r.get('task')) for r in records], dtype=object)
+
+    checks = {
+        'id': ids.isna().to_numpy(),
+        'createdAt': created_at.isna().to_numpy(),
+        'date': dates.isna().to_numpy(),
+        'user': user_ids.isna().to_numpy(),
+        'time': (times.isna() | (times < 0)).to_numpy(),
+        'comment': ~comments.map(lambda c: c is None or isinstance(c, str)).to_numpy(dtype=bool),
+        'task': ~project_ids.map(lambda p: isinstance(p, str)).to_numpy(dtype=bool),
+    }
+    invalid = np.logical_or.reduce(list(checks.values()))
+
+    errors = [
+        {
+            'row': int(row),
+            'id': records[row].get('id'),
+            'fields': [name for name, failed in checks.items() if failed[row]],
+        }
+        for row in np.flatnonzero(invalid)
+    ]
+
+    valid = ~invalid
+    data = pd.DataFrame({
+        'id': ids[valid].astype('int64').to_numpy(),
+        'created_at': created_at[valid].to_numpy(),
+        'date': dates[valid].to_numpy(),
+        'user_id': user_ids[valid].astype('int64').to_numpy(),
+        'comment': comments[valid].tolist(),
+        'time': times[valid].astype('int64').to_numpy(),
+        'project_id': project_ids[valid].tolist(),
+    })
+
+    return AppointmentsFrame(data, errors)
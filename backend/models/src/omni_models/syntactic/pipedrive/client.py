@@ -1,8 +1,7 @@
 from datetime import datetime
 from typing import List
-import requests
-import time
 from omni_utils.decorators.cache import cache
+from omni_models.syntactic.transport import HttpTransport, get_transport
 
 from .models.activity import Activity
 from .models.deal import Deal
@@ -14,11 +13,11 @@ from .models.user import User
 
 
 class Pipedrive:
-    def __init__(self, api_token):
-        self.session = requests.Session()  # Use a session for connection pooling
+    def __init__(self, api_token, transport: HttpTransport = None):
+        self.transport = transport or get_transport()
         self.api_token = api_token
 
-    def __fetch(self, entity, start=0, params=None):
+    def __request(self, entity, start=0, params=None):
         if params is None:
             params = {}
         url = f"https://api.pipedrive.com/v1/{entity}"
@@ -27,25 +26,19 @@ class Pipedrive:
         params['api_token'] = self.api_token
         params['limit'] = 500
         params['start'] = start
+        return url, params
 
-        retries = 0
-        max_retries = 3
-        
-        while True:
-            try:
-                response = self.session.get(url, params=params)
-                response.raise_for_status()  # Proper error handling
-                return response.json()
-            except requests.exceptions.HTTPError as e:
-                if e.response.status_code == 429:  # Too Many Requests
-                    if retries >= max_retries:
-                        print(f"Maximum retry attempts ({max_retries}) reached for rate limit. Raising exception...")
-                        raise
-                    retries += 1
-                    print(f"Rate limit exceeded for Pipedrive API. Waiting 2 seconds before retry {retries}/{max_retries}...")
-                    time.sleep(2)
-                    continue
-                raise  # Re-raise other HTTP errors
+    def __fetch(self, entity, start=0, params=None):
+        url, params = self.__request(entity, start, params)
+        response = self.transport.get(url, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    async def __afetch(self, entity, start=0, params=None):
+        url, params = self.__request(entity, start, params)
+        response = await self.transport.aget(url, params=params)
+        response.raise_for_status()
+        return response.json()
 
     @staticmethod
     def __has_next_page(data):
@@ -70,6 +63,23 @@ class Pipedrive:
 
         # Create DataFrame from all data at once
         return all_data
+
+    async def _afetch_all(self, entity, params=None):
+        all_data = []
+        start = 0
+
+        while True:
+            data = await self.__afetch(entity, start, dict(params or {}))
+            if data is None or not data.get('data'):
+                break
+
+            all_data.extend(data['data'])
+
+            if not self.__has_next_page(data):
+                break
+            start = data.get('additional_data', {}).get('pagination', {}).get('next_start', 0)
+
+        return all_data
     
     @cache(remember=True)
     
@@ -123,6 +133,30 @@ class Pipedrive:
             for n in json
         ]
 
+    async def afetch_activities(self, starting: datetime, ending: datetime):
+        params = {
+            'since': starting.strftime('%Y-%m-%d %H:%M:%S'),
+            'until': ending.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+
+        json = await self._afetch_all('activities/collection', params=params)
+        return [
+            Activity(**activity)
+            for activity in json
+        ]
+
+    async def afetch_notes(self, starting: datetime, ending: datetime) -> List[Note]:
+        params = {
+            'start_date': starting.strftime('%Y-%m-%d'),
+            'end_date': ending.strftime('%Y-%m-%d'),
+        }
+
+        json = await self._afetch_all('notes', params=params)
+        return [
+            Note(**n)
+            for n in json
+        ]
+
     def fetch_users(self):
         json = self._fetch_all('users')
         return [User(**user) for user in json]
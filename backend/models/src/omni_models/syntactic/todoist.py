@@ -1,8 +1,8 @@
-import requests
 from pydantic import BaseModel
 from typing import List, Optional
 
 from omni_utils.decorators.cache import cache
+from omni_models.syntactic.transport import HttpTransport, get_transport
 import omni_utils.helpers.slug as slug
 
 
@@ -59,7 +59,8 @@ class Folder(BaseModel):
 
 
 class Todoist:
-    def __init__(self, api_token: str):
+    def __init__(self, api_token: str, transport: Optional[HttpTransport] = None):
+        self.transport = transport or get_transport()
         self.api_token = api_token
         self.base_url = 'https://api.todoist.com/sync/v9'
 
@@ -75,14 +76,24 @@ class Todoist:
             'resource_types': '["all"]',
             'sync_token': sync_token
         }
-        response = requests.post(url, headers=self._get_headers(), json=params)
+        response = self.transport.post(url, headers=self._get_headers(), json=params)
+        response.raise_for_status()
+        return response.json()
+
+    async def sync_async(self, sync_token='*'):
+        url = f'{self.base_url}/sync'
+        params = {
+            'resource_types': '["all"]',
+            'sync_token': sync_token
+        }
+        response = await self.transport.apost(url, headers=self._get_headers(), json=params)
         response.raise_for_status()
         return response.json()
 
     @cache
     def sync_completed(self, project_id: int):
         url = f'{self.base_url}/completed/get_all'
-        response = requests.post(url, headers=self._get_headers(), params={'project_id': project_id})
+        response = self.transport.post(url, headers=self._get_headers(), params={'project_id': project_id})
         response.raise_for_status()
         return response.json()
 
@@ -109,7 +120,7 @@ class Todoist:
         }
         completed_tasks = []
         while True:
-            response = requests.get(url, headers=self._get_headers(), params=params)
+            response = self.transport.get(url, headers=self._get_headers(), params=params)
             response.raise_for_status()
             data = response.json()
 
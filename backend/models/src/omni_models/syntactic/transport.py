@@ -0,0 +1,292 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:
+    import json
+    loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS_CODES = {429, 502, 503, 504}
+
+
+@dataclass
+class HostPolicy:
+    rate: Optional[float] = None          # requests per second, None for unlimited
+    burst: int = 1
+    max_concurrency: int = 8
+
+
+DEFAULT_HOST_POLICIES: Dict[str, HostPolicy] = {
+    'api.everhour.com': HostPolicy(rate=5, burst=10, max_concurrency=4),
+    'api.pipedrive.com': HostPolicy(rate=10, burst=20, max_concurrency=8),
+    'api.todoist.com': HostPolicy(rate=5, burst=10, max_concurrency=4),
+}
+
+
+class TokenBucket:
+    """Thread-safe token bucket; `pause` empties it until the given delay has passed."""
+
+    def __init__(self, rate: Optional[float], burst: int = 1):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Takes a token, returning how long the caller must wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(self.paused_until - now, 0.0)
+            if self.rate is None:
+                return wait
+
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= 1
+            if self.tokens < 0:
+                wait = max(wait, -self.tokens / self.rate)
+            return wait
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class _Host:
+    def __init__(self, policy: HostPolicy):
+        self.policy = policy
+        self.bucket = TokenBucket(policy.rate, policy.burst)
+        self.semaphore = threading.BoundedSemaphore(policy.max_concurrency)
+        self._async_semaphores: Dict[int, asyncio.Semaphore] = {}
+
+    def async_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._async_semaphores.get(id(loop))
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.policy.max_concurrency)
+            self._async_semaphores[id(loop)] = semaphore
+        return semaphore
+
+
+class HttpTransport:
+    """
+    HTTP transport shared by the syntactic clients. It keeps pooled keep-alive
+    connections (HTTP/2 when the h2 package is installed), limits concurrent
+    requests and request rate per host, and retries rate-limited or failed
+    requests with jittered exponential backoff, honoring Retry-After.
+    """
+
+    def __init__(self,
+                 max_retries: int = 4,
+                 backoff_base: float = 0.5,
+                 backoff_max: float = 30.0,
+                 timeout: float = 60.0,
+                 http2: Optional[bool] = None,
+                 host_policies: Optional[Dict[str, HostPolicy]] = None):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.http2 = HTTP2_AVAILABLE if http2 is None else http2 and HTTP2_AVAILABLE
+        self.host_policies = {**DEFAULT_HOST_POLICIES, **(host_policies or {})}
+        self.limits = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
+        self.client = httpx.Client(http2=self.http2, timeout=timeout, limits=self.limits, follow_redirects=True)
+        self._async_clients: Dict[int, httpx.AsyncClient] = {}
+        self._hosts: Dict[str, _Host] = {}
+        self._lock = threading.Lock()
+
+    def configure_host(self, host: str, policy: HostPolicy):
+        with self._lock:
+            self.host_policies[host] = policy
+            self._hosts.pop(host, None)
+
+    def _host(self, url: str) -> _Host:
+        host = urlsplit(url).hostname or ''
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = _Host(self.host_policies.get(host, HostPolicy()))
+                self._hosts[host] = state
+            return state
+
+    def _async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(id(loop))
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(http2=self.http2, timeout=self.timeout, limits=self.limits, follow_redirects=True)
+            self._async_clients[id(loop)] = client
+        return client
+
+    @staticmethod
+    def _prepare(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Drops the params set to None, which httpx would send as empty values (requests left them out)"""
+        params = kwargs.get('params')
+        if isinstance(params, dict):
+            kwargs = {**kwargs, 'params': {key: value for key, value in params.items() if value is not None}}
+        return kwargs
+
+    def _retry_after(self, response: httpx.Response) -> Optional[float]:
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            return None
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _delay(self, host: _Host, attempt: int, response: Optional[httpx.Response]) -> float:
+        delay = self._backoff(attempt)
+        if response is not None:
+            retry_after = self._retry_after(response)
+            if retry_after is not None:
+                delay = retry_after + random.uniform(0, self.backoff_base)
+            if response.status_code == 429:
+                host.bucket.pause(delay)
+        return delay
+
+    def _should_retry(self, attempt: int, response: Optional[httpx.Response]) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        return response is None or response.status_code in RETRY_STATUS_CODES
+
+    def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        kwargs = self._prepare(kwargs)
+        host = self._host(url)
+        attempt = 0
+        while True:
+            host.bucket.acquire()
+            response = None
+            try:
+                with host.semaphore:
+                    response = self.client.request(method, url, **kwargs)
+            except httpx.TransportError as ex:
+                if not self._should_retry(attempt, None):
+                    raise
+                logger.warning(f"{method} {url} failed ({ex}), retrying {attempt + 1}/{self.max_retries}")
+
+            if response is not None and not self._should_retry(attempt, response):
+                return response
+
+            delay = self._delay(host, attempt, response)
+            if response is not None:
+                logger.warning(
+                    f"{method} {url} returned {response.status_code}, "
+                    f"retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})"
+                )
+            time.sleep(delay)
+            attempt += 1
+
+    async def arequest(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        kwargs = self._prepare(kwargs)
+        host = self._host(url)
+        client = self._async_client()
+        attempt = 0
+        while True:
+            await host.bucket.acquire_async()
+            response = None
+            try:
+                async with host.async_semaphore():
+                    response = await client.request(method, url, **kwargs)
+            except httpx.TransportError as ex:
+                if not self._should_retry(attempt, None):
+                    raise
+                logger.warning(f"{method} {url} failed ({ex}), retrying {attempt + 1}/{self.max_retries}")
+
+            if response is not None and not self._should_retry(attempt, response):
+                return response
+
+            delay = self._delay(host, attempt, response)
+            if response is not None:
+                logger.warning(
+                    f"{method} {url} returned {response.status_code}, "
+                    f"retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})"
+                )
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return self.request('POST', url, **kwargs)
+
+    async def aget(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.arequest('GET', url, **kwargs)
+
+    async def apost(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.arequest('POST', url, **kwargs)
+
+    def close(self):
+        self.client.close()
+
+    async def aclose(self):
+        """Closes the async client bound to the running event loop"""
+        loop_id = id(asyncio.get_running_loop())
+        client = self._async_clients.pop(loop_id, None)
+        with self._lock:
+            for host in self._hosts.values():
+                host._async_semaphores.pop(loop_id, None)
+        if client is not None:
+            await client.aclose()
+
+
+_shared_transport: Optional[HttpTransport] = None
+_shared_lock = threading.Lock()
+
+
+def get_transport() -> HttpTransport:
+    """The process-wide transport used by the syntactic clients"""
+    global _shared_transport
+    with _shared_lock:
+        if _shared_transport is None:
+            _shared_transport = HttpTransport()
+        return _shared_transport
+
+
+def gather(*coroutines):
+    """Runs the coroutines concurrently from synchronous code and returns their results"""
+    async def run():
+        try:
+            return await asyncio.gather(*coroutines)
+        finally:
+            await get_transport().aclose()
+    return asyncio.run(run())
@@ -1,11 +1,11 @@
+import asyncio
 from datetime import datetime
 from collections import defaultdict
-import requests
-from requests.auth import HTTPBasicAuth
 from typing import Union, Dict, List, Any, Optional, Type, TypeVar
 from pydantic import HttpUrl
 
 from omni_utils.decorators.cache import cache
+from omni_models.syntactic.transport import HttpTransport, get_transport
 import logging
 
 from .models.post import Post
@@ -15,15 +15,12 @@ from .models.post_type import PostType
 logger = logging.getLogger(__name__)
 
 class Wordpress:
-    def __init__(self, url, username=None, password=None):
-        self.session = requests.Session()
+    def __init__(self, url, username=None, password=None, transport: HttpTransport = None):
+        self.transport = transport or get_transport()
         self.url = url
         self.username = username
         self.password = password
-
-        if username and password:
-            auth = HTTPBasicAuth(username, password)
-            self.session.auth = auth
+        self.auth = (username, password) if username and password else None
 
     def api_url_for_entity(self, entity_type: str) -> HttpUrl:
         return f'{self.url}/wp-json/wp/v2/{entity_type}'
@@ -32,34 +29,28 @@ class Wordpress:
     def fetch_media_url(self, media_id: str) -> HttpUrl:
         url = f'{self.api_url_for_entity("media")}/{media_id}'
 
-        response = self.session.get(url)
+        response = self.transport.get(url, auth=self.auth)
         response.raise_for_status()
         json = response.json()
 
         return json['guid']['rendered']
 
-    def fetch(self, entity_type: str, params: Dict[str, Any] = None) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
-        api_url = self.api_url_for_entity(entity_type)
-
+    @staticmethod
+    def _default_params(params: Dict[str, Any] = None) -> Dict[str, Any]:
         if not params:
             params = {}
 
         params.setdefault('date_gmt', '')
         params.setdefault('per_page', 100)
         params.setdefault('_embed', 'wp:attachment')
+        return params
 
+    @staticmethod
+    def _combine(pages: List[Union[Dict[str, Any], List[Dict[str, Any]]]]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
         all_results = []
         combined_results = defaultdict(list)  # Para combinar resultados quando a resposta for dicionário
-        page = 1
-        total_pages = 1
-
-        while page <= total_pages:
-            params['page'] = page
-            response = self.session.get(api_url, params=params)
-            response.raise_for_status()
-
-            result = response.json()
 
+        for result in pages:
             if isinstance(result, list):
                 # Se o retorno for uma lista, apenas estende o resultado
                 all_results.extend(result)
@@ -71,14 +62,46 @@ class Wordpress:
                     else:
                         combined_results[key] = value  # Sobrescreve outros tipos
 
-            total_pages = int(response.headers.get('X-WP-TotalPages', 1))
-            page += 1
-
         if all_results:
             return all_results  # Retorna a lista se foi o caso
         else:
             return dict(combined_results)  # Retorna o dicionário combinado se foi o caso
 
+    def fetch(self, entity_type: str, params: Dict[str, Any] = None) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        api_url = self.api_url_for_entity(entity_type)
+        params = self._default_params(params)
+
+        pages = []
+        page = 1
+        total_pages = 1
+
+        while page <= total_pages:
+            params['page'] = page
+            response = self.transport.get(api_url, params=params, auth=self.auth)
+            response.raise_for_status()
+
+            pages.append(response.json())
+            total_pages = int(response.headers.get('X-WP-TotalPages', 1))
+            page += 1
+
+        return self._combine(pages)
+
+    async def afetch(self, entity_type: str, params: Dict[str, Any] = None) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        """Same as fetch, but once the first page reports the page count the remaining pages are requested concurrently"""
+        api_url = self.api_url_for_entity(entity_type)
+        params = self._default_params(params)
+
+        async def fetch_page(page: int):
+            response = await self.transport.aget(api_url, params={**params, 'page': page}, auth=self.auth)
+            response.raise_for_status()
+            return response
+
+        first = await fetch_page(1)
+        total_pages = int(first.headers.get('X-WP-TotalPages', 1))
+        others = await asyncio.gather(*[fetch_page(page) for page in range(2, total_pages + 1)])
+
+        return self._combine([first.json()] + [response.json() for response in others])
+
     @cache
     def fetch_users(self) -> Dict[int, User]:
         json = self.fetch('users')
@@ -139,7 +162,7 @@ class Wordpress:
     def fetch_jet_relations(self, relation_id: int) -> Dict[int, List[int]]:
         api_url = self.api_url_for_jet_relations(relation_id)
 
-        response = self.session.get(api_url)
+        response = self.transport.get(api_url, auth=self.auth)
         response.raise_for_status()
 
         input_dict = response.json()
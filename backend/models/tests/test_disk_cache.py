@@ -0,0 +1,103 @@
+import pickle
+from datetime import date, datetime
+
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+from omni_models.base.powerdataframe import SummarizablePowerDataFrame
+from omni_models.datasets.timesheet_dataset.models.disk_cache import TimesheetDiskCache
+
+ROWS = 5000
+
+
+@pytest.fixture
+def january() -> pd.DataFrame:
+    return pd.DataFrame({
+        'Date': [date(2024, 1, 1 + i * 31 // ROWS) for i in range(ROWS)],
+        'ClientId': pd.Series([[7, '123', 'N/A', None][i % 4] for i in range(ROWS)], dtype=object),
+        'Kind': pd.Series(['Squad', 'Consulting'] * (ROWS // 2), dtype=object),
+        'WorkerSlug': pd.Series([f'worker-{i % 5}' for i in range(ROWS)], dtype=object),
+        'TimeInHs': [1.5] * ROWS,
+        'CreatedAt': pd.Timestamp(2024, 2, 1) + pd.to_timedelta(range(ROWS), unit='s'),
+    })
+
+
+@pytest.fixture(params=[True, False], ids=['encrypted', 'plain'])
+def disk(request, tmp_path) -> TimesheetDiskCache:
+    return TimesheetDiskCache(str(tmp_path), 'api-key', encrypt=request.param)
+
+
+def test_round_trip(disk, january):
+    disk.save(SummarizablePowerDataFrame(january), 'jan_2024')
+    loaded = disk.load('jan_2024').data
+
+    pdt.assert_frame_equal(loaded[['Date', 'Kind', 'WorkerSlug', 'TimeInHs']], january[['Date', 'Kind', 'WorkerSlug', 'TimeInHs']])
+    assert loaded['CreatedAt'].tolist() == january['CreatedAt'].tolist()
+    assert disk.partitions() == ['jan_2024']
+    assert disk.high_water_mark('jan_2024') == january['CreatedAt'].max().to_pydatetime()
+
+
+def test_mixed_columns_keep_the_type_of_each_value(disk, january):
+    disk.save(SummarizablePowerDataFrame(january), 'jan_2024')
+    client_ids = disk.load('jan_2024').data['ClientId']
+
+    assert client_ids.tolist() == january['ClientId'].tolist()
+    assert [type(value) for value in client_ids[:4]] == [int, str, str, type(None)]
+
+
+def test_reads_only_the_requested_days(disk, january):
+    disk.save(SummarizablePowerDataFrame(january), 'jan_2024')
+
+    loaded = disk.load('jan_2024', after=datetime(2024, 1, 20), before=datetime(2024, 1, 25)).data
+    expected = january[(january['Date'] >= date(2024, 1, 20)) & (january['Date'] <= date(2024, 1, 25))]
+
+    assert len(loaded) == len(expected) > 0
+    assert loaded['ClientId'].tolist() == expected['ClientId'].tolist()
+
+
+def test_missing_partition(disk):
+    assert disk.load('feb_2024') is None
+    assert disk.high_water_mark('feb_2024') is None
+    assert disk.saved_at('feb_2024') is None
+
+
+def test_another_key_cannot_read_an_encrypted_partition(tmp_path, january):
+    TimesheetDiskCache(str(tmp_path), 'api-key').save(SummarizablePowerDataFrame(january), 'jan_2024')
+    assert TimesheetDiskCache(str(tmp_path), 'other-key').load('jan_2024') is None
+
+
+def test_files_encrypted_as_a_whole_are_not_read(tmp_path):
+    disk = TimesheetDiskCache(str(tmp_path), 'api-key')
+    path = disk._path('jan_2024', True)
+    path.write_bytes(disk._get_file_key('jan_2024').encrypt(b'PAR1'))
+
+    assert disk.exists('jan_2024')
+    assert disk.load('jan_2024') is None
+
+
+def test_saving_replaces_the_other_layout(tmp_path, january):
+    TimesheetDiskCache(str(tmp_path), 'api-key', encrypt=False).save(SummarizablePowerDataFrame(january), 'jan_2024')
+    TimesheetDiskCache(str(tmp_path), 'api-key', encrypt=True).save(SummarizablePowerDataFrame(january), 'jan_2024')
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['jan_2024.parquet.enc']
+
+
+def test_legacy_files_are_migrated(tmp_path, january):
+    disk = TimesheetDiskCache(str(tmp_path), 'api-key')
+    legacy = disk._legacy_path('jan_2024')
+    legacy.write_bytes(disk._legacy_fernet().encrypt(pickle.dumps(SummarizablePowerDataFrame(january))))
+
+    loaded = disk.load('jan_2024').data
+
+    assert len(loaded) == ROWS
+    assert not legacy.exists()
+    assert disk.partitions() == ['jan_2024']
+
+
+def test_every_legacy_file_is_migrated_at_once(tmp_path, january):
+    disk = TimesheetDiskCache(str(tmp_path), 'api-key')
+    for filename in ('jan_2024', 'feb_2024'):
+        disk._legacy_path(filename).write_bytes(disk._legacy_fernet().encrypt(pickle.dumps(SummarizablePowerDataFrame(january))))
+
+    assert disk.migrate_all() == ['feb_2024', 'jan_2024']
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['feb_2024.parquet.enc', 'jan_2024.parquet.enc']
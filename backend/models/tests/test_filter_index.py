@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+from omni_models.datasets.filter_index import FieldIndex, FilterIndexes
+
+VALUES = pd.Series(['Squad', 'Consulting', None, 'Squad', np.nan, 42, 'Internal', 42.0, None, 'HandsOn'])
+
+
+@pytest.mark.parametrize('selected_values', [
+    ['Squad'],
+    ['Squad', 'Internal'],
+    ['Missing'],
+    [],
+    [42],
+    [42.0],
+    ['42'],
+    [None],
+    [np.nan],
+    [None, 'Consulting'],
+])
+def test_rows_match_isin(selected_values):
+    index = FieldIndex(VALUES)
+    expected = VALUES.isin(selected_values).to_numpy()
+    np.testing.assert_array_equal(index.rows(selected_values), expected)
+
+
+def test_options_are_sorted_without_none():
+    index = FieldIndex(pd.Series(['b', None, 'a', 'c', 'a', None], dtype=object))
+    assert index.options() == ['a', 'b', 'c']
+
+
+def test_options_of_selected_rows():
+    index = FieldIndex(pd.Series(['b', None, 'a', 'c', 'a'], dtype=object))
+    bitmap = np.array([True, True, False, False, False])
+    assert index.options(bitmap) == ['b']
+
+
+def test_indexes_are_reused_per_version():
+    indexes = FilterIndexes()
+    df = pd.DataFrame({'Kind': ['Squad', 'Consulting']})
+    same_rows = pd.concat([df.iloc[:1], df.iloc[1:]])
+
+    index = indexes.get(df, ('january', 1))
+    assert indexes.get(same_rows, ('january', 1)) is index
+    assert indexes.get(df, ('january', 2)) is not index
+    assert index.field('Kind') is index.field('Kind')
+
+
+def test_frames_without_a_version_are_not_kept():
+    indexes = FilterIndexes()
+    df = pd.DataFrame({'Kind': ['Squad', 'Consulting']})
+
+    assert indexes.get(df) is not indexes.get(df)
+
+
+def test_least_recent_versions_are_dropped():
+    indexes = FilterIndexes(max_size=2)
+    df = pd.DataFrame({'Kind': ['Squad', 'Consulting']})
+
+    first = indexes.get(df, 1)
+    indexes.get(df, 2)
+    indexes.get(df, 1)
+    indexes.get(df, 3)
+
+    assert indexes.get(df, 1) is first
+    assert len(indexes._indexes) == 2
+
+
+def test_apply_filters_on_a_row_mask_matches_the_cut_frame():
+    from omni_models.omnidatasets import OmniDatasets
+
+    class Source:
+        def get_filterable_fields(self):
+            return ['Kind', 'WorkerName']
+
+    datasets = OmniDatasets.__new__(OmniDatasets)
+    datasets.filter_indexes = FilterIndexes()
+    df = pd.DataFrame({
+        'Day': range(8),
+        'Kind': ['Squad', 'Consulting', 'Squad', 'HandsOn', 'Squad', 'Consulting', 'Squad', 'Internal'],
+        'WorkerName': ['Ana', 'Bruno', 'Carla', 'Ana', 'Dora', 'Ana', 'Bruno', 'Ana'],
+        'WorkerSlug': ['ana', 'bruno', 'carla', 'ana', 'dora', 'ana', 'bruno', 'ana'],
+    })
+    filters = [{'field': 'Kind', 'selected_values': ['Squad', 'HandsOn']}]
+    rows = (df['Day'] <= 3).to_numpy()
+
+    masked, masked_result = datasets.apply_filters(Source(), df, filters, rows)
+    cut, cut_result = datasets.apply_filters(Source(), df[df['Day'] <= 3], filters)
+
+    pd.testing.assert_frame_equal(masked, cut)
+    assert masked_result == cut_result
+    assert masked_result['filterable_fields'][1]['options'] == ['Ana', 'Carla']
@@ -0,0 +1,69 @@
+import threading
+from datetime import datetime
+
+from omni_models.datasets.timesheet_dataset.models.hydration import PartitionState, TimesheetHydrator
+
+JANUARY = (datetime(2024, 1, 1), datetime(2024, 1, 31, 23, 59, 59))
+
+
+def test_ensure_loads_a_partition_once():
+    loads = []
+    hydrator = TimesheetHydrator(lambda key, s, e: loads.append(key))
+    hydrator.register('january', *JANUARY)
+
+    hydrator.ensure(*JANUARY)
+    hydrator.ensure(*JANUARY)
+
+    assert loads == ['january']
+    assert hydrator.is_ready()
+
+
+def test_invalidate_makes_a_warm_partition_load_again():
+    loads = []
+    hydrator = TimesheetHydrator(lambda key, s, e: loads.append(key))
+    hydrator.register('january', *JANUARY)
+    hydrator.ensure(*JANUARY)
+
+    hydrator.invalidate(*JANUARY)
+    assert not hydrator.is_ready()
+
+    hydrator.ensure(*JANUARY)
+    assert loads == ['january', 'january']
+
+
+def test_invalidate_during_a_load_is_not_lost():
+    started = threading.Event()
+    release = threading.Event()
+    loads = []
+
+    def loader(key, s, e):
+        loads.append(key)
+        if len(loads) == 1:
+            started.set()
+            release.wait(5)
+
+    hydrator = TimesheetHydrator(loader)
+    hydrator.register('january', *JANUARY)
+    hydrator.prefetch()
+
+    assert started.wait(5)
+    hydrator.invalidate(*JANUARY)
+    release.set()
+    hydrator.ensure(*JANUARY)
+
+    # The load that was running when the invalidation came is not trusted
+    assert loads == ['january', 'january']
+    assert hydrator.partitions['january'].state == PartitionState.WARM
+
+
+def test_failed_load_leaves_the_partition_cold():
+    def loader(key, s, e):
+        raise RuntimeError('unavailable')
+
+    hydrator = TimesheetHydrator(loader)
+    hydrator.register('january', *JANUARY)
+    hydrator.ensure(*JANUARY)
+
+    partition = hydrator.partitions['january']
+    assert partition.state == PartitionState.COLD
+    assert partition.error == 'unavailable'
@@ -0,0 +1,87 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+from omni_models.datasets.timesheet_dataset.models.layout import CompactFrame, SharedDictionaries, _Encoded, _Narrowed
+
+
+def timesheet(rows: int = 200, month: int = 1) -> pd.DataFrame:
+    workers = ['Ana', 'Bruno', 'Carla', None]
+    names = [workers[i % 4] for i in range(rows)]
+    urls = [None if name is None else f'https://omni/{name.lower()}' for name in names]
+    df = pd.DataFrame({
+        'Date': [date(2024, month, 1 + i * 28 // rows) for i in range(rows)],
+        'WorkerName': pd.Series(names, dtype=object),
+        'WorkerOmniUrl': pd.Series(urls, dtype=object),
+        'Worker': pd.Series(
+            [None if name is None else f'<a href="{url}">{name}</a>' for url, name in zip(urls, names)],
+            dtype=object,
+        ),
+        'ClientId': [[42, 'N/A', 7][i % 3] for i in range(rows)],
+        'Kind': pd.Series(['Squad', 'Consulting'] * (rows // 2), dtype='string'),
+        'Comment': pd.Series([f'comment {i}' for i in range(rows)], dtype=object),
+        'TimeInHs': np.linspace(0.25, 8, rows),
+        'Minutes': np.arange(rows, dtype=np.int64) * 15,
+    })
+    df.index = pd.RangeIndex(100, 100 + rows)
+    return df
+
+
+def test_decode_gives_back_the_original_frame():
+    df = timesheet()
+    compact = CompactFrame(df, SharedDictionaries())
+
+    pdt.assert_frame_equal(compact.decode(), df)
+    assert [type(value) for value in compact.decode()['ClientId'][:3]] == [int, str, int]
+
+
+def test_repetitive_columns_are_compacted():
+    df = timesheet()
+    compact = CompactFrame(df, SharedDictionaries())
+
+    assert isinstance(compact.stored['WorkerName'], _Encoded)
+    assert isinstance(compact.stored['Minutes'], _Narrowed)
+    assert 'Worker' in compact.derived and 'Worker' not in compact.stored
+    # Unique comments are kept as they are
+    assert isinstance(compact.stored['Comment'], pd.Series)
+    assert compact.nbytes < compact.raw_nbytes
+
+
+def test_decode_selected_rows():
+    df = timesheet()
+    compact = CompactFrame(df, SharedDictionaries())
+    mask = (df['Kind'] == 'Squad').to_numpy(dtype=bool)
+
+    pdt.assert_frame_equal(compact.decode(mask), df[mask])
+    pdt.assert_frame_equal(compact.decode(slice(10, 20)), df.iloc[10:20])
+    pdt.assert_frame_equal(compact.decode(np.array([3, 1, 4])), df.iloc[[3, 1, 4]])
+
+
+def test_date_rows_of_a_sorted_frame():
+    df = timesheet()
+    compact = CompactFrame(df, SharedDictionaries())
+    rows = compact.date_rows(date(2024, 1, 10), date(2024, 1, 20))
+
+    expected = df[(df['Date'] >= date(2024, 1, 10)) & (df['Date'] <= date(2024, 1, 20))]
+    pdt.assert_frame_equal(compact.decode(rows), expected)
+
+
+def test_date_rows_of_an_unsorted_frame():
+    df = timesheet().iloc[::-1]
+    assert CompactFrame(df, SharedDictionaries()).date_rows(date(2024, 1, 1), date(2024, 1, 31)) is None
+
+
+def test_months_share_their_dictionaries():
+    dictionaries = SharedDictionaries()
+    january = CompactFrame(timesheet(month=1), dictionaries)
+    february = CompactFrame(timesheet(month=2), dictionaries)
+
+    assert dictionaries.values['WorkerName'] == ['Ana', 'Bruno', 'Carla']
+    pdt.assert_frame_equal(january.decode(), timesheet(month=1))
+    pdt.assert_frame_equal(february.decode(), timesheet(month=2))
+
+
+def test_empty_frame():
+    df = timesheet().iloc[0:0]
+    pdt.assert_frame_equal(CompactFrame(df, SharedDictionaries()).decode(), df)
@@ -0,0 +1,100 @@
+import random
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+from omni_models.base.powerdataframe import SummarizablePowerDataFrame
+from omni_models.datasets.timesheet_dataset.models.memory_cache import TimesheetMemoryCache
+
+
+def timesheet(after: date, before: date) -> SummarizablePowerDataFrame:
+    days = [after + timedelta(days=i) for i in range((before - after).days + 1)]
+    return SummarizablePowerDataFrame(pd.DataFrame({
+        'Date': days,
+        'WorkerName': pd.Series([f'worker {day.day % 3}' for day in days], dtype=object),
+        'TimeInHs': [float(day.day) for day in days],
+    }))
+
+
+def add(cache: TimesheetMemoryCache, after: date, before: date):
+    cache.add(datetime.combine(after, datetime.min.time()), datetime.combine(before, datetime.max.time()), timesheet(after, before))
+
+
+def brute_force_gaps(ranges, after: date, before: date):
+    """Missing days of [after, before], as ranges, by checking every day"""
+    gaps = []
+    day = after
+    while day <= before:
+        if not any(s <= day <= e for s, e in ranges):
+            if gaps and gaps[-1][1] + timedelta(days=1) == day:
+                gaps[-1] = (gaps[-1][0], day)
+            else:
+                gaps.append((day, day))
+        day += timedelta(days=1)
+    return gaps
+
+
+def test_missing_matches_a_day_by_day_check():
+    rng = random.Random(7)
+    for _ in range(50):
+        cache = TimesheetMemoryCache()
+        ranges = []
+        for _ in range(rng.randint(0, 6)):
+            start = date(2024, 3, rng.randint(1, 31))
+            end = min(start + timedelta(days=rng.randint(0, 10)), date(2024, 3, 31))
+            add(cache, start, end)
+            ranges.append((start, end))
+
+        after, before = date(2024, 3, rng.randint(1, 15)), date(2024, 3, rng.randint(15, 31))
+        gaps = [(s.date(), e.date()) for s, e in cache.missing(after, before)]
+        assert gaps == brute_force_gaps(ranges, after, before)
+
+        if not gaps:
+            df = cache.get(after, before).data
+            assert sorted(df['Date']) == [after + timedelta(days=i) for i in range((before - after).days + 1)]
+
+
+def test_ranges_spanning_months():
+    cache = TimesheetMemoryCache()
+    add(cache, date(2024, 1, 20), date(2024, 2, 10))
+
+    assert cache.missing(date(2024, 1, 25), date(2024, 2, 5)) == []
+    assert [(s.date(), e.date()) for s, e in cache.missing(date(2024, 1, 15), date(2024, 2, 15))] == [
+        (date(2024, 1, 15), date(2024, 1, 19)),
+        (date(2024, 2, 11), date(2024, 2, 15)),
+    ]
+    assert len(cache.get(date(2024, 1, 25), date(2024, 2, 5)).data) == 12
+
+
+def test_max_bytes_counts_the_dictionaries():
+    cache = TimesheetMemoryCache(max_bytes=10 ** 9)
+    add(cache, date(2024, 1, 1), date(2024, 1, 31))
+    assert cache.dictionaries.nbytes() > 0
+
+    cache.max_bytes = cache.total_bytes + cache.dictionaries.nbytes() - 1
+    add(cache, date(2024, 2, 1), date(2024, 2, 29))
+    assert cache.total_bytes + cache.dictionaries.nbytes() <= cache.max_bytes
+
+
+def test_dictionaries_are_reset_when_the_cache_empties():
+    cache = TimesheetMemoryCache()
+    add(cache, date(2024, 1, 1), date(2024, 1, 31))
+    dictionaries = cache.dictionaries
+
+    cache.invalidate(None, None)
+
+    assert cache.dictionaries is not dictionaries
+    assert cache.dictionaries.nbytes() == 0
+    assert cache.get(date(2024, 1, 1), date(2024, 1, 31)) is None
+
+
+def test_version_names_the_rows_read():
+    cache = TimesheetMemoryCache()
+    add(cache, date(2024, 1, 1), date(2024, 1, 31))
+
+    version = cache.get(date(2024, 1, 5), date(2024, 1, 10)).version
+    assert cache.get(date(2024, 1, 5), date(2024, 1, 10)).version == version
+    assert cache.get(date(2024, 1, 5), date(2024, 1, 11)).version != version
+
+    cache.invalidate(None, None)
+    add(cache, date(2024, 1, 1), date(2024, 1, 31))
+    assert cache.get(date(2024, 1, 5), date(2024, 1, 10)).version != version
@@ -0,0 +1,107 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+from omni_models.analytics import revenue_snapshots
+from omni_models.analytics.revenue_snapshots import RevenueSnapshotStore, is_closed
+
+
+class Month:
+    """Stands for a timesheet month snapshot"""
+
+    def __init__(self, **columns):
+        self.data = pd.DataFrame(columns)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch) -> RevenueSnapshotStore:
+    store = RevenueSnapshotStore(str(tmp_path))
+    monkeypatch.setattr(store, 'models_version', lambda: 'models-1')
+    return store
+
+
+@pytest.fixture
+def january() -> Month:
+    return Month(Date=[date(2024, 1, 2), date(2024, 1, 3)], Kind=['Squad', 'Consulting'], TimeInHs=[1.0, 2.0], Revenue=[100.0, 200.0])
+
+
+FILTERS = [{'field': 'Kind', 'selected_values': ['Squad']}]
+
+
+def test_keys_name_the_tracking_and_its_data(store):
+    key = store.key(date(2024, 1, 31), None, FILTERS, 'v1')
+
+    assert store.key(date(2024, 1, 31), None, [dict(FILTERS[0])], 'v1') == key
+    assert store.key(date(2024, 1, 30), None, FILTERS, 'v1') != key
+    assert store.key(date(2024, 1, 31), 'am', FILTERS, 'v1') != key
+    assert store.key(date(2024, 1, 31), None, None, 'v1') != key
+
+    changed_key = store.key(date(2024, 1, 31), None, FILTERS, 'v2')
+    assert changed_key != key
+    assert changed_key.split('-')[0] == key.split('-')[0]
+
+
+def test_timesheet_versions_follow_the_columns_trackings_read(store, january):
+    changed = Month(Date=[date(2024, 1, 2), date(2024, 1, 3)], Kind=['Squad', 'Consulting'], TimeInHs=[1.0, 2.5], Revenue=[100.0, 200.0])
+    assert store.timesheet_version(changed) != store.timesheet_version(january)
+
+    month = Month(Date=[date(2024, 1, 2)], TimeInHs=[1.0], Comment=['first'])
+    edited = Month(Date=[date(2024, 1, 2)], TimeInHs=[1.0], Comment=['edited'])
+    assert store.timesheet_version(month) == store.timesheet_version(edited)
+
+
+def test_keys_change_with_the_format(store, monkeypatch):
+    key = store.key(date(2024, 1, 31), None, None, 'v1')
+    monkeypatch.setattr(revenue_snapshots, 'SNAPSHOT_FORMAT', revenue_snapshots.SNAPSHOT_FORMAT + 1)
+    assert store.key(date(2024, 1, 31), None, None, 'v1') != key
+
+
+def test_put_and_get(store):
+    day = date(2024, 1, 31)
+    key = store.key(day, None, FILTERS, 'v1')
+
+    assert store.get(day, key) is None
+    store.put(day, key, {'total': 300.0})
+    assert store.get(day, key) == {'total': 300.0}
+    assert store.months() == [(2024, 1)]
+
+
+def test_put_prunes_other_versions_of_the_tracking(store, tmp_path):
+    day = date(2024, 1, 31)
+    store.put(day, 'tracking-v1', 1)
+    store.put(day, 'other-v1', 2)
+    store.put(day, 'tracking-v2', 3)
+
+    assert sorted(path.name for path in (tmp_path / '2024-01').iterdir()) == ['other-v1.snapshot', 'tracking-v2.snapshot']
+    assert store.get(day, 'tracking-v1') is None
+    assert store.get(day, 'tracking-v2') == 3
+
+
+def test_unreadable_snapshots_are_missing(store, tmp_path):
+    day = date(2024, 1, 31)
+    store.put(day, 'tracking-v1', 1)
+    (tmp_path / '2024-01' / 'tracking-v1.snapshot').write_bytes(b'not a pickle')
+    assert store.get(day, 'tracking-v1') is None
+
+
+def test_failed_puts_leave_no_files(store, tmp_path):
+    with pytest.raises(Exception):
+        store.put(date(2024, 1, 31), 'tracking-v1', lambda: None)
+    assert list((tmp_path / '2024-01').iterdir()) == []
+
+
+def test_drop_months_in_range(store):
+    for month in (1, 2, 3):
+        store.put(date(2024, month, 10), 'tracking-v1', month)
+
+    assert store.drop(date(2024, 2, 1), date(2024, 3, 31)) == 2
+    assert store.get(date(2024, 1, 10), 'tracking-v1') == 1
+    assert store.get(date(2024, 2, 10), 'tracking-v1') is None
+    assert store.drop() == 1
+
+
+def test_is_closed():
+    assert is_closed(2024, 1, today=date(2024, 2, 1))
+    assert is_closed(2023, 12, today=date(2024, 1, 15))
+    assert not is_closed(2024, 2, today=date(2024, 2, 29))
+    assert not is_closed(2024, 3, today=date(2024, 2, 29))
@@ -0,0 +1,114 @@
+import asyncio
+
+import httpx
+import pytest
+from omni_models.syntactic import transport as transport_module
+from omni_models.syntactic.transport import HttpTransport
+
+
+class Server:
+    """Answers the requests with the given responses in order, recording them"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        if callable(response):
+            return response(request)
+        return response
+
+
+@pytest.fixture
+def serve(monkeypatch):
+    """Builds an HttpTransport whose clients send their requests to `server`"""
+    client, async_client = httpx.Client, httpx.AsyncClient
+
+    def build(server: Server, **kwargs) -> HttpTransport:
+        mock = httpx.MockTransport(server)
+        monkeypatch.setattr(transport_module.httpx, 'Client', lambda **options: client(transport=mock, **options))
+        monkeypatch.setattr(transport_module.httpx, 'AsyncClient', lambda **options: async_client(transport=mock, **options))
+        return HttpTransport(backoff_base=0, http2=False, **kwargs)
+    return build
+
+
+def test_retries_unavailable_responses(serve):
+    server = Server(httpx.Response(503), httpx.Response(502), httpx.Response(200, json={'ok': True}))
+    response = serve(server).get('https://api.test/items')
+
+    assert response.status_code == 200
+    assert response.json() == {'ok': True}
+    assert len(server.requests) == 3
+
+
+def test_returns_the_last_response_after_max_retries(serve):
+    server = Server(*[httpx.Response(503) for _ in range(3)])
+    response = serve(server, max_retries=2).get('https://api.test/items')
+
+    assert response.status_code == 503
+    assert len(server.requests) == 3
+
+
+def test_does_not_retry_client_errors(serve):
+    server = Server(httpx.Response(404))
+    assert serve(server).get('https://api.test/items').status_code == 404
+    assert len(server.requests) == 1
+
+
+def test_retries_rate_limited_responses_after_retry_after(serve):
+    server = Server(httpx.Response(429, headers={'Retry-After': '0'}), httpx.Response(200))
+    assert serve(server).get('https://api.test/items').status_code == 200
+    assert len(server.requests) == 2
+
+
+def test_retries_transport_errors(serve):
+    server = Server(httpx.ConnectError('refused'), httpx.Response(200))
+    assert serve(server).get('https://api.test/items').status_code == 200
+
+    server = Server(*[httpx.ConnectError('refused') for _ in range(2)])
+    with pytest.raises(httpx.ConnectError):
+        serve(server, max_retries=1).get('https://api.test/items')
+    assert len(server.requests) == 2
+
+
+def test_follows_redirects(serve):
+    server = Server(
+        httpx.Response(301, headers={'Location': 'https://api.test/v2/items'}),
+        httpx.Response(200, json=[1, 2]),
+    )
+    response = serve(server).get('https://api.test/items')
+
+    assert response.status_code == 200
+    assert response.json() == [1, 2]
+    assert str(response.url) == 'https://api.test/v2/items'
+
+
+def test_leaves_out_params_set_to_none(serve):
+    server = Server(httpx.Response(200))
+    serve(server).get('https://api.test/items', params={'page': 2, 'from': None})
+
+    assert dict(server.requests[0].url.params) == {'page': '2'}
+
+
+def test_async_requests_retry_and_follow_redirects(serve):
+    server = Server(
+        httpx.Response(503),
+        httpx.Response(302, headers={'Location': 'https://api.test/final'}),
+        httpx.Response(200, text='done'),
+    )
+    transport = serve(server)
+
+    async def fetch():
+        try:
+            return await transport.aget('https://api.test/start', params={'skip': None})
+        finally:
+            await transport.aclose()
+
+    response = asyncio.run(fetch())
+    assert response.text == 'done'
+    assert [request.url.path for request in server.requests] == ['/start', '/start', '/final']
+    assert not server.requests[0].url.params
@@ -1,119 +1,513 @@
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 import functools
 import hashlib
 import logging
 import os
 import pickle
-from typing import Callable
+import tempfile
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
 
 logger = logging.getLogger(__name__)
 
+CACHE_DIR = 'cache'
+
+# When enabled, processes sharing the cache directory take a file lock before
+# computing a disk-cached value, so only one of them rebuilds it.
+FILE_LOCKS = os.getenv('CACHE_FILE_LOCKS', 'false').lower() == 'true'
+
+CacheKey = Tuple[Hashable, ...]
+Seconds = Union[int, float, timedelta, None]
+
+
+class CacheStats:
+    def __init__(self, name: str, kind: str):
+        self.name = name
+        self.kind = kind
+        self.created_at = datetime.now()
+        self.hits = 0
+        self.disk_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.computations = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, counter: str, amount: int = 1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def record_latency(self, seconds: float):
+        with self._lock:
+            self.computations += 1
+            self.total_latency += seconds
+            self.max_latency = max(self.max_latency, seconds)
+
+    @property
+    def average_latency(self) -> float:
+        return self.total_latency / self.computations if self.computations else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            'key': self.name,
+            'kind': self.kind,
+            'created_at': self.created_at,
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'computations': self.computations,
+            'average_latency_ms': self.average_latency * 1000,
+            'max_latency_ms': self.max_latency * 1000,
+        }
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key: the first caller computes the
+    value and the others wait for its result (or its exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Tuple[Future, int]] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = (Future(), threading.get_ident())
+                self._calls[key] = call
+                leader = True
+            else:
+                leader = False
+
+        future, owner = call
+        if not leader:
+            if owner == threading.get_ident():
+                # Re-entrant call from the computation itself
+                return fn()
+            return future.result()
+
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as ex:
+            future.set_exception(ex)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+
+@contextmanager
+def file_lock(path: str):
+    """Exclusive lock on `path`.lock shared by every process, when CACHE_FILE_LOCKS is enabled"""
+    if not FILE_LOCKS or fcntl is None:
+        yield
+        return
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(f"{path}.lock", 'a') as lock:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+
+_stats: Dict[str, CacheStats] = {}
+_stores: Dict[str, 'weakref.WeakSet[_Store]'] = {}
+_registry_lock = threading.Lock()
+_refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix='cache-refresh')
+
+
+def _stats_for(name: str, kind: str) -> CacheStats:
+    with _registry_lock:
+        stats = _stats.get(name)
+        if stats is None:
+            stats = CacheStats(name, kind)
+            _stats[name] = stats
+        return stats
+
+
+def _to_seconds(value: Seconds) -> Optional[float]:
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    return value
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted(((k, _freeze(v)) for k, v in value.items()), key=repr))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(v) for v in value)
+    try:
+        hash(value)
+    except TypeError:
+        # A repr may hold the object's address, so equal arguments would miss the cache
+        raise TypeError(f"Unable to use a {type(value).__name__} argument in a cache key") from None
+    return value
+
+
+def make_key(args: tuple, kwargs: dict) -> CacheKey:
+    """Hashable key of a call; argument types are part of it, so 1 and 1.0 differ"""
+    return (
+        _freeze(args),
+        tuple(sorted((k, _freeze(v)) for k, v in kwargs.items())),
+        tuple(type(a) for a in args),
+    )
+
+
+def _canonical(value: Any) -> Any:
+    """The frozen key with its frozensets in sorted order, so its repr is the same in every process"""
+    if isinstance(value, frozenset):
+        return ('frozenset', tuple(sorted((_canonical(v) for v in value), key=repr)))
+    if isinstance(value, tuple):
+        return tuple(_canonical(v) for v in value)
+    return value
+
+
+def _digest(name: str, key: CacheKey) -> str:
+    return hashlib.blake2b(f"{name}:{_canonical(key)!r}".encode(), digest_size=16).hexdigest()
+
+
+def _legacy_digest(func: Callable, args: tuple, kwargs: dict) -> str:
+    """Name of the cache file of a call before file names were blake2b digests"""
+    return hashlib.md5(f"{func.__module__}.{func.__name__}:{args}:{kwargs}".encode()).hexdigest()
+
+
+def _migrate_legacy(legacy_file: str, cache_file: str):
+    """Renames a cache file still named after the legacy digest; its mtime (and so its age) is kept"""
+    if not os.path.isfile(cache_file) and os.path.isfile(legacy_file):
+        try:
+            os.replace(legacy_file, cache_file)
+            logger.info(f"Cache file {legacy_file} renamed to {cache_file}")
+        except OSError as ex:
+            logger.warning(f"Unable to rename legacy cache file {legacy_file}: {ex}")
+
+
+def _atomic_dump(path: str, value: Any):
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(value, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _load_fresh(path: str, ttl: Optional[float]) -> Tuple[bool, Any]:
+    """Reads a pickled value unless it is missing or older than `ttl` seconds"""
+    try:
+        if ttl is not None and time.time() - os.path.getmtime(path) > ttl:
+            return False, None
+        with open(path, 'rb') as f:
+            return True, pickle.load(f)
+    except FileNotFoundError:
+        return False, None
+
+
+class _Entry:
+    __slots__ = ('value', 'expires_at')
+
+    def __init__(self, value: Any, ttl: Optional[float]):
+        self.value = value
+        self.expires_at = time.monotonic() + ttl if ttl is not None else None
+
+    @property
+    def is_expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
 
-def _make_key(func, args, kwargs):
-    key = f"{func.__module__}.{func.__name__}:{args}:{kwargs}"
-    logger.info(f'Generating a hash key for: {key}')
-    return hashlib.md5(key.encode()).hexdigest()
+class _Store:
+    """LRU store of one cached function for one instance"""
 
+    def __init__(self, stats: CacheStats, ttl: Optional[float], max_size: Optional[int]):
+        self.stats = stats
+        self.ttl = ttl
+        self.max_size = max_size
+        self.entries: 'OrderedDict[CacheKey, _Entry]' = OrderedDict()
+        self.refreshing = set()
+        self.flights = SingleFlight()
+        self.lock = threading.Lock()
 
-def cache(func=None, *, remember=False):
+    def get(self, key: CacheKey) -> Optional[_Entry]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def put(self, key: CacheKey, value: Any):
+        with self.lock:
+            self.entries[key] = _Entry(value, self.ttl)
+            self.entries.move_to_end(key)
+            while self.max_size is not None and len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.stats.record('evictions')
+
+    def pop(self, key: CacheKey):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def _store_for(instance, name: str, stats: CacheStats, ttl: Optional[float], max_size: Optional[int]) -> _Store:
+    with _registry_lock:
+        stores = getattr(instance, 'cache', None)
+        if stores is None:
+            stores = {}
+            instance.cache = stores
+        store = stores.get(name)
+        if store is None:
+            store = _Store(stats, ttl, max_size)
+            stores[name] = store
+            _stores.setdefault(name, weakref.WeakSet()).add(store)
+        return store
+
+
+def cache(func=None, *,
+          remember: bool = False,
+          ttl: Seconds = None,
+          max_size: Optional[int] = None,
+          stale_while_revalidate: bool = False):
+    """
+    Memoizes a method per instance. Entries expire after `ttl` (seconds or a
+    timedelta) and the least recently used ones are dropped beyond `max_size`.
+    With `stale_while_revalidate`, an expired entry is still returned while it is
+    recomputed in the background. With `remember`, results are also pickled to
+    the cache directory and reused across processes.
+    """
     if func is None:
-        return lambda func: cache(func, remember=remember)
+        return lambda func: cache(
+            func,
+            remember=remember,
+            ttl=ttl,
+            max_size=max_size,
+            stale_while_revalidate=stale_while_revalidate,
+        )
+
+    name = f"{func.__module__}.{func.__qualname__}"
+    ttl_seconds = _to_seconds(ttl)
+    stats = _stats_for(name, 'function')
+
+    def compute(instance, store: _Store, key: CacheKey, args, kwargs):
+        start_time = time.perf_counter()
+        result = func(instance, *args, **kwargs)
+        elapsed = time.perf_counter() - start_time
+        stats.record_latency(elapsed)
+        logger.debug(f"Time to execute {func.__name__}: {elapsed:.2f} seconds")
+
+        store.put(key, result)
+        if remember:
+            _atomic_dump(os.path.join(CACHE_DIR, _digest(name, key)), result)
+        return result
+
+    def refresh(instance, store: _Store, key: CacheKey, args, kwargs):
+        try:
+            compute(instance, store, key, args, kwargs)
+        except Exception as ex:
+            logger.warning(f"Unable to refresh {name}: {ex}")
+        finally:
+            with store.lock:
+                store.refreshing.discard(key)
 
     @functools.wraps(func)
     def wrapped(instance, *args, **kwargs):
-        if not hasattr(instance, 'cache') or instance.cache is None:
-            instance.cache = {}
-        key = _make_key(func, args, kwargs)
-        cache_dir = 'cache'
-        cache_file = os.path.join(cache_dir, key)
-
-        if key in instance.cache:
-            logger.info(f"Cache hit for {key}")
-            return instance.cache[key]
-        elif remember and os.path.isfile(cache_file):
-            logger.info(f"Cache hit (file) for {key}")
-            with open(cache_file, 'rb') as f:
-                result = pickle.load(f)
-            instance.cache[key] = result
-            return result
-        else:
-            logger.info(f"Cache miss for {key}")
-            start_time = datetime.now()
-            result = func(instance, *args, **kwargs)
-            elapsed_time = datetime.now() - start_time
-            logger.info(f"Time to execute {func.__name__}: {elapsed_time.total_seconds():.2f} seconds")
-            instance.cache[key] = result
-
-            if remember:
-                if not os.path.exists(cache_dir):
-                    os.makedirs(cache_dir)
-                with open(cache_file, 'wb') as f:
-                    pickle.dump(result, f)
+        store = _store_for(instance, name, stats, ttl_seconds, max_size)
+        key = make_key(args, kwargs)
 
-            return result
+        entry = store.get(key)
+        if entry is not None and not entry.is_expired:
+            stats.record('hits')
+            return entry.value
+
+        if entry is not None and stale_while_revalidate:
+            stats.record('stale_hits')
+            with store.lock:
+                should_refresh = key not in store.refreshing
+                store.refreshing.add(key)
+            if should_refresh:
+                _refresher.submit(refresh, instance, store, key, args, kwargs)
+            return entry.value
+
+        return store.flights.do(key, lambda: populate(instance, store, key, args, kwargs))
+
+    def populate(instance, store: _Store, key: CacheKey, args, kwargs):
+        # Another caller may have filled the entry while this one was waiting
+        entry = store.get(key)
+        if entry is not None and not entry.is_expired:
+            stats.record('hits')
+            return entry.value
 
+        if not remember:
+            stats.record('misses')
+            return compute(instance, store, key, args, kwargs)
+
+        cache_file = os.path.join(CACHE_DIR, _digest(name, key))
+        with file_lock(cache_file):
+            _migrate_legacy(os.path.join(CACHE_DIR, _legacy_digest(func, args, kwargs)), cache_file)
+            found, result = _load_fresh(cache_file, ttl_seconds)
+            if found:
+                stats.record('disk_hits')
+                store.put(key, result)
+                return result
+
+            stats.record('misses')
+            return compute(instance, store, key, args, kwargs)
+
+    wrapped.cache_name = name
     return wrapped
 
 
 def invalidate_cache(instance, func=None, args=None, kwargs=None):
-    if hasattr(instance, 'cache') and instance.cache is not None:
-        if func and args is not None and kwargs is not None:
-            key = _make_key(func, args, kwargs)
-            if key in instance.cache:
-                del instance.cache[key]
-                logger.info(f"Cache invalidated for {key}")
-                cache_file = os.path.join('cache', key)
-                if os.path.isfile(cache_file):
-                    os.remove(cache_file)
-                    logger.info(f"Cache file removed for {key}")
-        else:
-            instance.cache.clear()
-            logger.info("Entire cache invalidated")
-            for file in os.listdir('cache'):
-                os.remove(os.path.join('cache', file))
-            logger.info("All cache files removed")
+    stores = getattr(instance, 'cache', None)
+    if stores is None:
+        return
 
+    if func and args is not None and kwargs is not None:
+        name = getattr(func, 'cache_name', f"{func.__module__}.{func.__qualname__}")
+        key = make_key(tuple(args), kwargs)
+        store = stores.get(name)
+        if store is not None:
+            store.pop(key)
+            logger.info(f"Cache invalidated for {name}")
+        cache_file = os.path.join(CACHE_DIR, _digest(name, key))
+        if os.path.isfile(cache_file):
+            os.remove(cache_file)
+            logger.info(f"Cache file removed for {name}")
+    else:
+        stores.clear()
+        logger.info("Entire cache invalidated")
+        if os.path.isdir(CACHE_DIR):
+            for file in os.listdir(CACHE_DIR):
+                os.remove(os.path.join(CACHE_DIR, file))
+        logger.info("All cache files removed")
 
-@staticmethod
-def memoize(key: str, func: Callable):
-    cache_dir = 'cache'
-    cache_file = os.path.join(cache_dir, f"{key}.cache")
 
-    if os.path.isfile(cache_file):
+# Pickled value of each memoized key with the mtime of its file; every hit
+# unpickles a fresh copy, so callers may mutate what they get
+_memoized: Dict[str, Tuple[float, bytes]] = {}
+_memoize_flights = SingleFlight()
+
+
+def _read_memoized(key: str, cache_file: str, stats: CacheStats, ttl: Optional[float]) -> Tuple[bool, Any]:
+    try:
+        mtime = os.path.getmtime(cache_file)
+    except OSError:
+        return False, None
+
+    if ttl is not None and time.time() - mtime > ttl:
+        return False, None
+
+    memoized = _memoized.get(key)
+    if memoized is not None and memoized[0] == mtime:
+        stats.record('hits')
+        return True, pickle.loads(memoized[1])
+
+    try:
         with open(cache_file, 'rb') as f:
-            return pickle.load(f)
-    
-    result = func()
-    
-    if not os.path.exists(cache_dir):
-        os.makedirs(cache_dir)
-        
-    with open(cache_file, 'wb') as f:
-        pickle.dump(result, f)
-        
-    return result
+            payload = f.read()
+    except FileNotFoundError:
+        return False, None
+
+    stats.record('disk_hits')
+    _memoized[key] = (mtime, payload)
+    return True, pickle.loads(payload)
+
+
+@staticmethod
+def memoize(key: str, func: Callable, ttl: Seconds = None):
+    cache_file = os.path.join(CACHE_DIR, f"{key}.cache")
+    stats = _stats_for(key, 'memoize')
+    ttl_seconds = _to_seconds(ttl)
+
+    found, result = _read_memoized(key, cache_file, stats, ttl_seconds)
+    if found:
+        return result
+
+    def populate():
+        with file_lock(cache_file):
+            found, result = _read_memoized(key, cache_file, stats, ttl_seconds)
+            if found:
+                return result
+
+            stats.record('misses')
+            start_time = time.perf_counter()
+            result = func()
+            stats.record_latency(time.perf_counter() - start_time)
+
+            _atomic_dump(cache_file, result)
+            with open(cache_file, 'rb') as f:
+                _memoized[key] = (os.path.getmtime(cache_file), f.read())
+            return result
+
+    return _memoize_flights.do(key, populate)
+
 
 @staticmethod
 def forget(key: str):
-    cache_dir = 'cache'
-    cache_file = os.path.join(cache_dir, f"{key}.cache")
+    _memoized.pop(key, None)
+    cache_file = os.path.join(CACHE_DIR, f"{key}.cache")
     if os.path.isfile(cache_file):
         os.remove(cache_file)
         logger.info(f"Cache file removed for {key}")
-        
+
+    for store in list(_stores.get(key, ())):
+        store.clear()
+        logger.info(f"Cache cleared for {key}")
+
+
 @staticmethod
 def list_cache():
-    cache_dir = 'cache'
     cache_files = []
-    for file in os.listdir(cache_dir):
-        if file.endswith('.cache'):
-            path = os.path.join(cache_dir, file)
-            created = datetime.fromtimestamp(os.path.getctime(path))
-            # Adjust for GMT-3 timezone
-            created = created + timedelta(hours=3)
-            cache_files.append({
-                'key': os.path.splitext(file)[0],
-                'created_at': created
-            })
+    listed = set()
+    if os.path.isdir(CACHE_DIR):
+        for file in os.listdir(CACHE_DIR):
+            if file.endswith('.cache'):
+                path = os.path.join(CACHE_DIR, file)
+                created = datetime.fromtimestamp(os.path.getctime(path))
+                # Adjust for GMT-3 timezone
+                created = created + timedelta(hours=3)
+                key = os.path.splitext(file)[0]
+                stats = _stats.get(key)
+                item = stats.to_dict() if stats else {'key': key, 'kind': 'memoize'}
+                item['created_at'] = created
+                cache_files.append(item)
+                listed.add(key)
+
+    for name, stats in list(_stats.items()):
+        if name in listed:
+            continue
+        item = stats.to_dict()
+        item['size'] = sum(len(store) for store in list(_stores.get(name, ())))
+        cache_files.append(item)
+
     return cache_files
-    
\ No newline at end of file
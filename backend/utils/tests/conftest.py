@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Lets the tests run from a checkout where omni_utils is not pip-installed
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
@@ -1,6 +1,6 @@
 import pytest
 from datetime import datetime
-from models.helpers.beauty import beautify, format_date_with_suffix, convert_to_label
+from omni_utils.helpers.beauty import beautify, format_date_with_suffix, convert_to_label
 
 def test_beautify():
     assert beautify(3.14159) == '3.1'
@@ -0,0 +1,214 @@
+import hashlib
+import os
+import pickle
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+from omni_utils.decorators import cache as cache_module
+from omni_utils.decorators.cache import SingleFlight, cache, forget, memoize
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_module, 'CACHE_DIR', str(tmp_path))
+    return tmp_path
+
+
+class Counter:
+    def __init__(self):
+        self.calls = []
+
+    @cache
+    def square(self, x):
+        self.calls.append(x)
+        return x * x
+
+    @cache(ttl=0.05)
+    def short_lived(self, x):
+        self.calls.append(x)
+        return len(self.calls)
+
+    @cache(max_size=2)
+    def bounded(self, x):
+        self.calls.append(x)
+        return x
+
+    @cache(remember=True)
+    def remembered(self, x):
+        self.calls.append(x)
+        return {'value': x}
+
+
+def test_cache_hits_per_instance():
+    counter = Counter()
+    assert counter.square(3) == 9
+    assert counter.square(3) == 9
+    assert counter.calls == [3]
+
+    other = Counter()
+    assert other.square(3) == 9
+    assert other.calls == [3]
+
+
+def test_cache_keys_on_argument_types():
+    counter = Counter()
+    counter.square(1)
+    counter.square(1.0)
+    assert counter.calls == [1, 1.0]
+
+
+def test_cache_rejects_arguments_it_cannot_key():
+    class Unhashable:
+        __hash__ = None
+
+    with pytest.raises(TypeError):
+        Counter().square(Unhashable())
+
+
+def test_cache_keys_on_nested_arguments():
+    assert cache_module.make_key(({'a': [1, {2}]},), {}) == cache_module.make_key(({'a': [1, {2}]},), {})
+
+
+def test_cache_expires_after_ttl():
+    counter = Counter()
+    assert counter.short_lived('a') == 1
+    assert counter.short_lived('a') == 1
+    time.sleep(0.1)
+    assert counter.short_lived('a') == 2
+
+
+def test_cache_evicts_least_recently_used():
+    counter = Counter()
+    counter.bounded(1)
+    counter.bounded(2)
+    counter.bounded(1)
+    counter.bounded(3)  # evicts 2, the least recently used
+    counter.bounded(1)
+    counter.bounded(2)
+    assert counter.calls == [1, 2, 3, 2]
+
+
+def test_cache_computes_concurrent_calls_once():
+    started = threading.Event()
+    release = threading.Event()
+
+    class Slow:
+        calls = 0
+
+        @cache
+        def value(self):
+            Slow.calls += 1
+            started.set()
+            release.wait(5)
+            return 'done'
+
+    slow = Slow()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(slow.value())) for _ in range(8)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == ['done'] * 8
+    assert Slow.calls == 1
+
+
+def test_single_flight_shares_exceptions():
+    flight = SingleFlight()
+    release = threading.Event()
+    errors = []
+
+    def fail():
+        release.wait(5)
+        raise ValueError('boom')
+
+    def call():
+        try:
+            flight.do('key', fail)
+        except ValueError as ex:
+            errors.append(str(ex))
+
+    threads = [threading.Thread(target=call) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert errors == ['boom'] * 4
+
+
+def test_remembered_results_are_shared_through_disk(cache_dir):
+    first = Counter()
+    assert first.remembered(5) == {'value': 5}
+    assert len(os.listdir(cache_dir)) == 1
+
+    second = Counter()
+    assert second.remembered(5) == {'value': 5}
+    assert second.calls == []
+
+
+def test_remembered_legacy_file_is_migrated(cache_dir):
+    legacy = hashlib.md5(f"{Counter.remembered.__module__}.remembered:(7,):{{}}".encode()).hexdigest()
+    with open(cache_dir / legacy, 'wb') as f:
+        pickle.dump({'value': 'legacy'}, f)
+
+    counter = Counter()
+    assert counter.remembered(7) == {'value': 'legacy'}
+    assert counter.calls == []
+    assert not (cache_dir / legacy).exists()
+    assert len(os.listdir(cache_dir)) == 1
+
+
+def test_forget_clears_stores_and_memoized_file(cache_dir):
+    counter = Counter()
+    counter.square(2)
+    forget(Counter.square.cache_name)
+    counter.square(2)
+    assert counter.calls == [2, 2]
+
+    memoize('answer', lambda: 42)
+    forget('answer')
+    assert not (cache_dir / 'answer.cache').exists()
+    assert memoize('answer', lambda: 43) == 43
+
+
+def test_memoize_returns_independent_copies(cache_dir):
+    calls = []
+
+    def load():
+        calls.append(1)
+        return {'items': [1]}
+
+    first = memoize('items', load)
+    first['items'].append(2)
+
+    assert memoize('items', load) == {'items': [1]}
+    assert calls == [1]
+    assert (cache_dir / 'items.cache').exists()
+
+
+def test_digest_does_not_depend_on_hash_seed():
+    script = (
+        "from omni_utils.decorators.cache import _digest, make_key;"
+        "print(_digest('name', make_key(({'alpha', 'beta', 'gamma', 'delta'},), {})))"
+    )
+    src = os.path.join(os.path.dirname(__file__), '..', 'src')
+    digests = {
+        subprocess.run(
+            [sys.executable, '-c', script],
+            env={**os.environ, 'PYTHONHASHSEED': seed, 'PYTHONPATH': src},
+            capture_output=True, text=True, check=True,
+        ).stdout
+        for seed in ('1', '2', '3', '4')
+    }
+    assert len(digests) == 1
@@ -1,5 +1,5 @@
 import pytest
-from models.helpers.dict import invert_dict
+from omni_utils.helpers.dict import invert_dict
 
 def test_invert_dict():
     input_dict = {
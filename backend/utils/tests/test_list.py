@@ -1,5 +1,5 @@
 import pytest
-from models.helpers.list import find_first_occurrence
+from omni_utils.helpers.list import find_first_occurrence
 
 @pytest.fixture
 def test_list():
@@ -1,5 +1,5 @@
 import pytest
-from models.helpers.numbers import can_convert_to_int
+from omni_utils.helpers.numbers import can_convert_to_int
 
 @pytest.mark.parametrize("input_str, expected", [
     ('123', True),
@@ -1,5 +1,5 @@
 import pytest
-from models.helpers.slug import generate
+from omni_utils.helpers.slug import generate
 
 @pytest.mark.parametrize("input_str, expected", [
     ('Hello World', 'hello-world'),
@@ -1,7 +1,7 @@
 import pytest
 from datetime import datetime, timedelta
 import re
-from models.helpers.weeks import Weeks
+from omni_utils.helpers.weeks import Weeks
 
 def test_get_week_dates():
     test_date = datetime(2023, 5, 10)  # Wednesday